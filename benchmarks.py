@@ -0,0 +1,328 @@
+"""
+Benchmarks for the bot's hot paths, run against the fake Highrise room (fake_highrise.py)
+Results are written as JSON so two versions can be compared:
+
+    python benchmarks.py --output before.json
+    python benchmarks.py --output after.json --compare before.json
+    python benchmarks.py --only chat_dispatch,join_storm
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict
+
+from config import Config
+from fake_highrise import FakeRoom
+from main import Bot, OutfitManager
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+OWNER = "bench_owner"
+
+BENCHMARKS: Dict[str, Callable] = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+class Clock:
+    """Wall and CPU time of one measured section"""
+
+    def __enter__(self):
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        self.wall = time.perf_counter() - self.wall_start
+        self.cpu = time.process_time() - self.cpu_start
+
+
+class LagProbe:
+    """Worst event-loop lag seen while a benchmark runs"""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.max_lag = 0.0
+        self.task = None
+
+    async def _run(self) -> None:
+        while True:
+            expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.max_lag = max(self.max_lag, time.perf_counter() - expected)
+
+    def __enter__(self):
+        self.task = asyncio.create_task(self._run())
+        return self
+
+    def __exit__(self, *exc):
+        self.task.cancel()
+
+
+async def new_session(latency: float = 0.0, users: int = 0):
+    """Fresh room and bot, connected and past on_start; stats reset"""
+    room = FakeRoom(latency=latency, rate_limits={})
+    for index in range(users):
+        room.add_user(f"user{index}")
+    bot = Bot()
+    await room.connect(bot)
+    await room.settle()
+    room.calls.clear()
+    room.transcript.clear()
+    return room, bot
+
+
+async def shutdown(bot) -> None:
+    """Stop the bot's background loops and cancel whatever is left"""
+    bot.random_movement_enabled = False
+    bot.following_user = None
+    bot.sessions.close_all()
+    await bot.tasks.shutdown()
+    tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def calls_total(room: FakeRoom) -> int:
+    return sum(room.calls.values())
+
+
+@benchmark
+async def chat_dispatch(args) -> dict:
+    """on_chat throughput for plain chat and cheap commands"""
+    room, bot = await new_session()
+    user = await room.join("chatter")
+    await room.settle()
+    room.calls.clear()
+
+    messages = ["hello everyone", "/stop", "nice room", "/unknown", "how are you?"]
+    with Clock() as clock:
+        for index in range(args.messages):
+            await room.say(user, messages[index % len(messages)])
+        await room.settle()
+    await shutdown(bot)
+    return {
+        "events": args.messages,
+        "events_per_second": round(args.messages / clock.wall, 1),
+        "cpu_us_per_event": round(clock.cpu / args.messages * 1e6, 1),
+        "api_calls_per_event": round(calls_total(room) / args.messages, 3),
+    }
+
+
+@benchmark
+async def join_storm(args) -> dict:
+    """N users arriving at once"""
+    room, bot = await new_session(latency=args.latency)
+    with Clock() as clock, LagProbe() as probe:
+        for index in range(args.joins):
+            await room.join(f"guest{index}")
+        await room.settle()
+        # greetings are batched - send them now so the welcome/VIP/whisper output is measured too
+        await bot.greeter.flush()
+    await shutdown(bot)
+    chats = sum(1 for channel, _, _ in room.transcript if channel == "chat")
+    whispers = sum(1 for channel, _, _ in room.transcript if channel == "whisper")
+    return {
+        "joins": args.joins,
+        "wall_seconds": round(clock.wall, 3),
+        "cpu_ms": round(clock.cpu * 1000, 1),
+        "api_calls": calls_total(room),
+        "api_calls_per_join": round(calls_total(room) / args.joins, 2),
+        "room_chat_lines": chats,
+        "whispers": whispers,
+        "max_loop_lag_ms": round(probe.max_lag * 1000, 1),
+    }
+
+
+@benchmark
+async def emote_loops(args) -> dict:
+    """Many users running numbered emote loops at the same time"""
+    room, bot = await new_session(latency=args.latency, users=args.loop_users)
+    users = [user for user, _ in room.users.values() if user.id != room.bot_user.id]
+    for user in users:
+        await room.say(user, "5")
+    await asyncio.sleep(0.5)
+    room.calls.clear()
+
+    with Clock() as clock, LagProbe() as probe:
+        await asyncio.sleep(args.seconds)
+    emotes = room.calls["EmoteRequest"]
+    await shutdown(bot)
+    return {
+        "loops": len(users),
+        "seconds": args.seconds,
+        "emotes_per_second": round(emotes / clock.wall, 2),
+        "cpu_percent": round(clock.cpu / clock.wall * 100, 2),
+        "max_loop_lag_ms": round(probe.max_lag * 1000, 1),
+    }
+
+
+@benchmark
+async def follow_mode(args) -> dict:
+    """API calls made while following a user who keeps moving"""
+    room, bot = await new_session(latency=args.latency)
+    owner = await room.join(OWNER)
+    target = await room.join("walker")
+    await room.settle()
+    await room.say(owner, "/follow @walker")
+    await asyncio.sleep(0.2)
+    room.calls.clear()
+
+    with Clock() as clock:
+        deadline = time.perf_counter() + args.seconds
+        while time.perf_counter() < deadline:
+            await room.move(target)
+            await asyncio.sleep(args.move_interval)
+    calls = dict(room.calls)
+    await shutdown(bot)
+    minutes = clock.wall / 60
+    return {
+        "seconds": args.seconds,
+        "api_calls_per_minute": round(sum(calls.values()) / minutes, 1),
+        "calls_per_minute": {name: round(count / minutes, 1) for name, count in sorted(calls.items())},
+        "cpu_percent": round(clock.cpu / clock.wall * 100, 2),
+    }
+
+
+@benchmark
+async def copy_outfit(args) -> dict:
+    """/copy end to end: time and number of API calls"""
+    room, bot = await new_session(latency=args.latency)
+    owner = await room.join(OWNER)
+    items = [f"shirt-n_bench{index}" for index in range(args.copy_items)]
+    await room.join("model", outfit=items)
+    await room.settle()
+    room.calls.clear()
+
+    with Clock() as clock:
+        await room.say(owner, "/copy @model")
+        await room.settle(timeout=600)
+    await shutdown(bot)
+    return {
+        "items": args.copy_items,
+        "wall_seconds": round(clock.wall, 3),
+        "cpu_ms": round(clock.cpu * 1000, 1),
+        "api_calls": calls_total(room),
+        "calls": dict(sorted(room.calls.items())),
+    }
+
+
+@benchmark
+async def outfit_parsing(args) -> dict:
+    """OutfitManager text parsing and code validation (no API calls)"""
+    manager = OutfitManager(None)
+    samples = [
+        "/on [https://high.rs/item?id=shirt-n_starteritems2019tankwhite&type=clothing]",
+        "/on [hair_front-n_malenew05]",
+        "/on high.rs/item?id=pants-n_starteritems2019cuffedjeansblue",
+        "/on [not an item at all]",
+        "/on just some words",
+    ]
+    codes = ["shirt-n_abc", "hat-n_xyz", "invalid", "bag-n_1", "unknown-n_type", ""]
+
+    with Clock() as clock:
+        for index in range(args.parses):
+            manager.extract_item_id_from_text(samples[index % len(samples)])
+            manager.is_valid_clothing_code(codes[index % len(codes)])
+    return {
+        "operations": args.parses * 2,
+        "operations_per_second": round(args.parses * 2 / clock.wall, 1),
+        "cpu_us_per_parse": round(clock.cpu / args.parses * 1e6, 2),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(previous: dict, current: dict) -> None:
+    """Print the change of every numeric metric against an earlier results file"""
+    for name, metrics in current["results"].items():
+        old = previous.get("results", {}).get(name)
+        if not old:
+            continue
+        print(f"\n{name} (vs {previous.get('meta', {}).get('revision', '?')})")
+        for key, value in metrics.items():
+            before = old.get(key)
+            if isinstance(value, (int, float)) and isinstance(before, (int, float)) and before:
+                change = (value - before) / before * 100
+                print(f"  {key:<24} {before:>12} -> {value:<12} {change:+.1f}%")
+
+
+async def run_all(args) -> dict:
+    selected = args.only.split(",") if args.only else list(BENCHMARKS)
+    results = {}
+    for name in selected:
+        if name not in BENCHMARKS:
+            raise SystemExit(f"Unknown benchmark: {name} (available: {', '.join(BENCHMARKS)})")
+        print(f"▶️ {name}...", flush=True)
+        results[name] = await BENCHMARKS[name](args)
+        print(f"   {json.dumps(results[name], ensure_ascii=False)}", flush=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Bot hot-path benchmarks against the fake Highrise room")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--only", help="comma separated benchmark names")
+    parser.add_argument("--with-logging", action="store_true", help="keep bot logging on (off by default)")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake server response time (seconds)")
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--joins", type=int, default=50)
+    parser.add_argument("--loop-users", type=int, default=50)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--move-interval", type=float, default=0.5)
+    parser.add_argument("--copy-items", type=int, default=5)
+    parser.add_argument("--parses", type=int, default=20000)
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    previous = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+
+    # إعدادات ثابتة حتى تكون النتائج قابلة للمقارنة
+    Config.ENABLE_LOGGING = args.with_logging
+    Config.ENABLE_RANDOM_MOVEMENT = False
+    Config.BOT_OWNER = OWNER
+    Config.OUTBOUND["per_second"] = 0  # the fake room has no rate limits here - do not pace chat either
+    os.chdir(tempfile.mkdtemp(prefix="bot-bench-"))  # moderators_data.json etc. stay out of the project
+
+    results = asyncio.run(run_all(args))
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "latency": args.latency,
+            "logging": args.with_logging,
+        },
+        "results": results,
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n📄 Results written to {output}")
+
+    if previous:
+        compare(previous, report)
+
+
+if __name__ == "__main__":
+    main()
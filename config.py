@@ -5,6 +5,7 @@ Contains all privacy-related settings and sensitive information
 """
 
 import os
+import json
 
 class Config:
     # === Bot Owner & Privacy Settings ===
@@ -18,23 +19,53 @@ class Config:
     ROOM_ID = os.getenv("ROOM_ID", "6897a0d92aa5825e0e244dd9") # id room here 
     BOT_TOKEN = os.getenv("BOT_TOKEN", "e2abeba5ea19b4fe0cf8d9e54e71b9e5e2c2b6f86df82580485ce88fde08c283") # token here
     
+    # === Multi-Room Deployment ===
+    # ROOMS='[{"room_id": "...", "token": "..."}, ...]' في Secrets أو ملف rooms.json بنفس الصيغة
+    ROOMS_FILE = "rooms.json"
+    MULTI_ROOM_PROCESSES = int(os.getenv("MULTI_ROOM_PROCESSES", "0"))  # 0 = عملية لكل غرفة
+    
     # === Privacy & Security Settings ===
     ENABLE_WELCOME_MESSAGES = True
     ENABLE_GOODBYE_MESSAGES = True
     ENABLE_COMMANDS_FOR_ALL = True  # السماح للجميع باستخدام الأوامر
     ENABLE_REACTIONS_FOR_ALL = True  # السماح للجميع بردود الفعل
-    MODERATOR_ONLY_COMMANDS = ["/admin", "/ban", "/unban", "/kick", "/bring", "/follow"]
+    MODERATOR_ONLY_COMMANDS = ["/admin", "/ban", "/unban", "/kick", "/bring", "/follow", "/all", "/sync"]
     
     # === Bot Behavior Settings ===
     MAX_EMOTE_LOOPS_PER_USER = 1  # عدد الحركات المتزامنة لكل مستخدم
     EMOTE_LOOP_INTERVAL = 3  # الفترة بين الحركات بالثواني
     AUTO_STOP_EMOTES_ON_LEAVE = True  # إيقاف الحركات عند مغادرة المستخدم
+    USER_SESSIONS = {
+        "idle_seconds": 1800,   # حذف حالة المستخدم بعد هذه المدة بدون نشاط
+        "game_timeout": 300,    # لعبة حجر ورقة مقص بدون حركة تنتهي بعدها
+        "sweep_interval": 60
+    }
+    MAX_MESSAGE_LENGTH = 256  # أقصى طول لرسالة الدردشة/الهمس في Highrise
+    OUTBOUND = {
+        "per_second": 4,      # معدل إرسال الدردشة/الهمس (السيرفر يسمح بحوالي 20 كل 5 ثوان) - 0 بدون حد
+        "burst": 20,          # رسائل يمكن إرسالها دفعة واحدة بعد فترة هدوء
+        "concurrency": 4,     # طلبات إرسال في نفس اللحظة
+        "shed_depth": 10,     # من هذا العمق: تُحذف الرسائل الترفيهية وتُدمج الإعلانات
+        "max_queue": 40,      # بعدها تُحذف الرسالة الأقل أولوية (40 رسالة = 10 ثوان تقريباً)
+        "max_wait": {         # رسالة انتظرت أكثر من هذا لا تُرسل (رسائل الإشراف تُرسل دائماً)
+            "reply": 8.0,
+            "announcement": 10.0,
+            "flavor": 5.0
+        },
+        "dedup_window": 10.0,  # نفس السطر لنفس القناة خلال هذه المدة لا يُرسل مرة ثانية - 0 لإيقافه
+        "dedup_size": 512      # عدد الأسطر المرسلة التي يتم تذكرها
+    }
+    EMOTES_PER_PAGE = 30  # عدد الحركات في كل صفحة من /emotes
+    SYNC_EMOTES = {
+        "concurrency": 10,   # أقصى عدد طلبات send_emote في نفس اللحظة لكل مجموعة
+        "max_seconds": 600   # مدة /all و /sync قبل أن تتوقف تلقائياً
+    }
     
     # === Message Filters & Moderation ===
     ENABLE_WORD_FILTER = False
-    BLOCKED_WORDS = []  # كلمات محظورة
-    SPAM_PROTECTION = True
-    MAX_MESSAGES_PER_MINUTE = 10
+    BLOCKED_WORDS = []  # كلمات محظورة - كلمة كاملة، و "*" في البداية/النهاية تسمح بما قبلها/بعدها مثل "*كلمة"
+    SPAM_PROTECTION = True  # تفعيل حدود RATE_LIMITS لكل مستخدم (المالك مستثنى)
+    MAX_MESSAGES_PER_MINUTE = 10  # رسائل الدردشة العادية (غير الأوامر) لكل مستخدم
     
     # === Bot Position & Movement ===
     BOT_SPAWN_POSITION = {
@@ -54,6 +85,12 @@ class Config:
     WEB_HOST = "0.0.0.0"
     WEB_PORT = 5000
     WEB_SECRET_KEY = os.getenv("WEB_SECRET_KEY", "your-secret-key-change-this-in-production")
+    WEB_THREADS = 4  # عدد خيوط خادم waitress
+    
+    # === Bot <-> Web IPC (local only) ===
+    IPC_HOST = "127.0.0.1"
+    IPC_PORT = int(os.getenv("IPC_PORT", "5001"))
+    IPC_AUTHKEY = os.getenv("IPC_AUTHKEY", "")  # فارغ = مفتاح عشوائي لكل تشغيل تولده main.py وتورثه للعمليات الفرعية
     
     # === File Management Settings ===
     BOT_FILE = "main"
@@ -73,6 +110,12 @@ class Config:
     LOG_CHAT_MESSAGES = True
     LOG_USER_ACTIONS = True
     LOG_BOT_ERRORS = True
+    LOG_BUFFER_SIZE = 2000  # عدد السجلات المحفوظة في الذاكرة لصفحة /logs
+    LOG_DIR = "logs"
+    LOG_MAX_BYTES = 5 * 1024 * 1024  # تدوير الملف عند 5MB
+    LOG_ROTATE_HOURS = 24            # أو كل يوم، أيهما أسبق (الأرشيف يُحذف بعد KEEP_BACKUP_DAYS)
+    STATUS_PUBLISH_INTERVAL = 1.0  # ثواني بين تحديثات صفحة الحالة
+    ENABLE_METRICS = True  # قياس زمن أوامر الشات واستدعاءات Highrise (/metrics)
     
     # === API Keys & External Services ===
     # يُنصح بوضع هذه في Secrets tool
@@ -94,11 +137,54 @@ class Config:
     
     # === Rate Limiting ===
     RATE_LIMITS = {
-        "commands_per_minute": 20,
-        "reactions_per_minute": 10,
-        "emote_changes_per_minute": 5
+        "commands_per_minute": 20,      # أوامر / والهمس
+        "reactions_per_minute": 10,     # /clap /heart /wink /thumbs /wave
+        "emote_changes_per_minute": 5   # أرقام الحركات، /e، /dance، /all، /sync
+    }
+    
+    # === Welcome & Goodbye Messages ===
+    GREETINGS = {
+        "window": 3.0,       # ثواني تجميع الدخول/الخروج قبل إرسال رسالة واحدة
+        "max_names": 10,     # بعدها: "and N more"
+        "line_delay": 1.0,   # توقيت بين رسائل الـ VIP
+        "rejoin_ttl": 300,   # من غادر وعاد خلال هذه المدة لا يُرحب به مرة أخرى
+        "remember_users": 5000
+    }
+    
+    # === Connection Supervisor ===
+    RECONNECT_SETTINGS = {
+        "base_delay": 1.0,          # أول انتظار بعد الانقطاع (ثواني)
+        "max_delay": 120.0,         # أقصى انتظار بين المحاولات
+        "multiplier": 2.0,
+        "jitter": 0.3,              # نسبة العشوائية في الانتظار
+        "breaker_threshold": 8,     # عدد الإخفاقات المتتالية قبل فتح القاطع
+        "breaker_cooldown": 300,    # مدة إيقاف المحاولات بعد فتح القاطع
+        "liveness_timeout": 180,    # ثواني بدون أحداث قبل فحص الجلسة
+        "probe_timeout": 10,
+        "stable_after": 60          # جلسة أطول من هذا تعيد ضبط العداد
+    }
+    
+    # === Event Loop Monitor ===
+    LOOP_MONITOR = {
+        "interval": 0.5,              # كل كم ثانية تقاس تأخيرات الحلقة
+        "lag_warning": 0.1,           # تأخير أكبر من هذا يُسجل كتحذير
+        "stall_after": 1.0,           # حلقة متوقفة أكثر من هذا: التقاط الـ stack
+        "slow_handler_seconds": 5.0,  # معالج حدث أبطأ من هذا يُسجل
+        "stack_depth": 8
     }
     
+    # === Profiling (معطل افتراضياً) ===
+    ENABLE_PROFILING = os.getenv("ENABLE_PROFILING", "false").lower() == "true"
+    PROFILE_DIR = "profiles"
+    PROFILE_MAX_SECONDS = 120
+    PROFILE_SAMPLE_INTERVAL = 0.005  # 200 عينة في الثانية
+    PROFILE_TRACEMALLOC_FRAMES = 10
+    PROFILE_TOP_ALLOCATIONS = 50
+    
+    # === Event Journal (record & replay) ===
+    RECORD_EVENTS = os.getenv("RECORD_EVENTS", "false").lower() == "true"
+    JOURNAL_DIR = "journals"
+    
     # === Notification Settings ===
     NOTIFICATIONS = {
         "new_user_join": True,
@@ -107,6 +193,32 @@ class Config:
         "error_alerts": True
     }
     
+    @classmethod
+    def get_rooms(cls):
+        """Return the list of (room_id, token) pairs to run"""
+        raw = os.getenv("ROOMS", "")
+        try:
+            if raw:
+                entries = json.loads(raw)
+            elif os.path.exists(cls.ROOMS_FILE):
+                with open(cls.ROOMS_FILE, 'r', encoding='utf-8') as f:
+                    entries = json.load(f)
+            else:
+                entries = []
+        except Exception as e:
+            print(f"Error reading rooms list: {e}")
+            entries = []
+
+        rooms = []
+        for entry in entries:
+            if isinstance(entry, dict):
+                room_id, token = entry.get("room_id"), entry.get("token", cls.BOT_TOKEN)
+            else:
+                room_id, token = entry[0], entry[1]
+            if room_id and token:
+                rooms.append((room_id, token))
+        return rooms or [(cls.ROOM_ID, cls.BOT_TOKEN)]
+    
     @classmethod
     def is_owner(cls, username):
         """Check if user is the bot owner"""
@@ -0,0 +1,90 @@
+"""
+Web command console - runs chat commands on the live bot without touching room chat
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Optional
+
+# Set inside a console command's task; Bot.highrise returns it instead of the real connection
+console_output: ContextVar[Optional["ConsoleHighrise"]] = ContextVar("console_output", default=None)
+
+
+class ConsoleJob:
+    """Output of one console command - written on the bot loop, read from the IPC thread"""
+
+    def __init__(self, command: str, username: str = ""):
+        self.id = uuid.uuid4().hex[:12]
+        self.command = command
+        self.username = username
+        self.lines = []
+        self.done = False
+        self.error = None
+        self.created_at = time.time()
+
+    def write(self, text: str, channel: str = "chat") -> None:
+        # list.append is atomic, so the reader never needs a lock
+        self.lines.append({"channel": channel, "text": text, "at": round(time.time() - self.created_at, 2)})
+
+    def read(self, since: int = 0) -> dict:
+        lines = self.lines[since:]
+        return {
+            "id": self.id,
+            "command": self.command,
+            "lines": lines,
+            "next": since + len(lines),
+            "done": self.done,
+            "error": self.error,
+        }
+
+
+class ConsoleJobs:
+    """Keeps the most recent console jobs so results can be polled"""
+
+    def __init__(self, limit: int = 50):
+        self.limit = limit
+        self.jobs = OrderedDict()
+
+    def add(self, job: ConsoleJob) -> ConsoleJob:
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.limit:
+            self.jobs.popitem(last=False)
+        return job
+
+    def read(self, job_id: str, since: int = 0) -> dict:
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise KeyError(f"Unknown console job: {job_id}")
+        return job.read(since)
+
+
+class ConsoleHighrise:
+    """Wraps the real Highrise connection: chat, whispers and DMs go to the console job,
+    every other call (teleport, react, set_outfit...) still reaches the server"""
+
+    def __init__(self, highrise, job: ConsoleJob):
+        self._highrise = highrise
+        self.job = job
+
+    # Background tasks started by a console command (emote loops, random movement) inherit
+    # this wrapper - once the command has finished their output goes to the room as usual
+
+    async def chat(self, message: str, **kwargs):
+        if self.job.done:
+            return await self._highrise.chat(message, **kwargs)
+        self.job.write(message, "chat")
+
+    async def send_whisper(self, user_id: str, message: str, **kwargs):
+        if self.job.done:
+            return await self._highrise.send_whisper(user_id, message, **kwargs)
+        self.job.write(message, "whisper")
+
+    async def send_message(self, conversation_id: str, content: str, *args, **kwargs):
+        if self.job.done:
+            return await self._highrise.send_message(conversation_id, content, *args, **kwargs)
+        self.job.write(content, "message")
+
+    def __getattr__(self, name):
+        return getattr(self._highrise, name)
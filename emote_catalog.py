@@ -0,0 +1,116 @@
+"""
+Emote catalog - lookup by name and category on top of the numbered emote list
+Numbers are positions in Bot.emotes_list and never change, so "5" keeps meaning what it
+meant before. Names are indexed in a prefix trie: /e float or /dance tiktok resolves in a
+handful of dict lookups, with a fuzzy match (difflib) only when no prefix fits.
+"""
+
+import difflib
+import re
+from typing import Dict, List, Optional, Tuple
+
+CATEGORIES = ("dance", "emote", "emoji", "idle", "sit")
+SEPARATORS = re.compile(r"[-_\s]+")
+
+
+def normalize(text: str) -> str:
+    """idle-dance-tiktok4, "Tik Tok 4" and tiktok4 all index the same way"""
+    return SEPARATORS.sub("", text.lower())
+
+
+def emote_category(emote_id: str) -> str:
+    parts = SEPARATORS.split(emote_id.lower())
+    if "dance" in parts:
+        return "dance"  # idle-dance-* are dances too
+    return parts[0] if parts[0] in CATEGORIES else "emote"
+
+
+def short_name(emote_id: str) -> str:
+    """Name without the category prefix: dance-tiktok11 -> tiktok11, idle-dance-casual -> casual"""
+    parts = [part for part in SEPARATORS.split(emote_id.lower()) if part]
+    while len(parts) > 1 and parts[0] in CATEGORIES + ("loop",):
+        parts.pop(0)
+    return "-".join(parts)
+
+
+class TrieNode:
+    __slots__ = ("children", "numbers")
+
+    def __init__(self):
+        self.children: Dict[str, "TrieNode"] = {}
+        self.numbers: List[int] = []  # every emote under this prefix, lowest number first
+
+
+class EmoteCatalog:
+    """Read-only index built once from the numbered list"""
+
+    def __init__(self, emotes: List[str]):
+        self.emotes = list(emotes)
+        self.root = TrieNode()
+        self.exact: Dict[str, int] = {}
+        self.categories: Dict[str, List[int]] = {category: [] for category in CATEGORIES}
+        self.category_of: Dict[int, str] = {}
+
+        for number, emote_id in enumerate(self.emotes, 1):
+            if normalize(emote_id) in self.exact:
+                continue  # listed twice - the first number wins, the duplicate still works by number
+            category = emote_category(emote_id)
+            self.category_of[number] = category
+            self.categories[category].append(number)
+            for key in {normalize(emote_id), normalize(short_name(emote_id))}:
+                self.exact.setdefault(key, number)
+                self._insert(key, number)
+        self.fuzzy_keys = list(self.exact)
+
+    def _insert(self, key: str, number: int) -> None:
+        node = self.root
+        for char in key:
+            node = node.children.setdefault(char, TrieNode())
+            if not node.numbers or node.numbers[-1] != number:
+                node.numbers.append(number)  # numbers arrive in increasing order
+
+    def name(self, number: int) -> str:
+        return self.emotes[number - 1]
+
+    def search(self, query: str, category: Optional[str] = None, limit: int = 10) -> List[int]:
+        """Numbers matching query: exact name, then prefix, then the closest spellings"""
+        key = normalize(query)
+        if not key:
+            return []
+        if key.isdigit():
+            number = int(key)
+            return [number] if 1 <= number <= len(self.emotes) else []
+
+        matches = []
+        exact = self.exact.get(key)
+        if exact is not None and self._in(exact, category):
+            matches.append(exact)
+
+        node = self.root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                break
+        else:
+            matches.extend(number for number in node.numbers
+                           if number not in matches and self._in(number, category))
+        if not matches:
+            for close in difflib.get_close_matches(key, self.fuzzy_keys, n=limit, cutoff=0.7):
+                number = self.exact[close]
+                if number not in matches and self._in(number, category):
+                    matches.append(number)
+        return matches[:limit]
+
+    def find(self, query: str, category: Optional[str] = None) -> Optional[int]:
+        matches = self.search(query, category, limit=1)
+        return matches[0] if matches else None
+
+    def _in(self, number: int, category: Optional[str]) -> bool:
+        return category is None or self.category_of.get(number) == category
+
+    def page(self, category: str, page: int, per_page: int) -> Tuple[List[int], int]:
+        """(numbers on the page, number of pages) - page is 1-based and clamped"""
+        numbers = self.categories.get(category, [])
+        pages = max(1, -(-len(numbers) // per_page))
+        page = min(max(page, 1), pages)
+        return numbers[(page - 1) * per_page:page * per_page], pages
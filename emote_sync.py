@@ -0,0 +1,149 @@
+"""
+Synchronized group emotes - /all <emote> and /sync <emote> @a @b
+One scheduler task per group sends the emote to every member on the same tick, fanned out
+concurrently under a limit, so a room full of dancers stays in step. Ticks are aligned to
+the group's start time rather than to the end of the previous round, so slow rounds do not
+drift the phase. Members come from Bot.room_users - no get_room_users call per tick.
+"""
+
+import asyncio
+import math
+import uuid
+from typing import Dict, Iterable, List, Optional, Set
+
+from config import Config
+from logger import log
+
+EVERYONE = "all"
+
+
+class EmoteGroup:
+    def __init__(self, group_id: str, emote_name: str, members: Optional[Set[str]], started_by: str):
+        self.id = group_id
+        self.emote_name = emote_name
+        self.members = members   # None = everyone in the room
+        self.excluded: Set[str] = set()  # opted out of an everyone group
+        self.started_by = started_by
+        self.task: Optional[asyncio.Task] = None
+        self.ticks = 0
+        self.failures = 0
+
+    def targets(self, room_users: dict, bot_user_id: Optional[str]) -> List[str]:
+        if self.members is None:
+            return [user_id for user_id in room_users if user_id != bot_user_id and user_id not in self.excluded]
+        return [user_id for user_id in self.members if user_id in room_users]
+
+
+class GroupEmotes:
+    """Owns every running group; a user is in at most one group at a time"""
+
+    def __init__(self, bot, settings: Optional[dict] = None):
+        settings = {**Config.SYNC_EMOTES, **(settings or {})}
+        self.bot = bot
+        self.concurrency = settings["concurrency"]
+        self.max_seconds = settings["max_seconds"]
+        self.groups: Dict[str, EmoteGroup] = {}
+        self.member_of: Dict[str, str] = {}  # user_id -> group id, explicit groups only
+
+    def start_everyone(self, emote_name: str, started_by: str) -> EmoteGroup:
+        self.stop(EVERYONE)
+        for user_id in list(self.member_of):
+            self.leave(user_id)
+        return self._start(EmoteGroup(EVERYONE, emote_name, None, started_by))
+
+    def start_group(self, emote_name: str, user_ids: Iterable[str], started_by: str) -> EmoteGroup:
+        members = set(user_ids)
+        for user_id in members:
+            self.leave(user_id)
+        group = EmoteGroup(uuid.uuid4().hex[:8], emote_name, members, started_by)
+        for user_id in members:
+            self.member_of[user_id] = group.id
+        return self._start(group)
+
+    def _start(self, group: EmoteGroup) -> EmoteGroup:
+        # A group replaces the members' own loops, otherwise they would emote twice
+        for session in self.bot.sessions:
+            if group.members is None or session.user_id in group.members:
+                session.stop_emote()
+        self.groups[group.id] = group
+        group.task = self.bot.tasks.spawn(self.run(group), f"group_emote:{group.id}", owner="feature:group_emotes")
+        return group
+
+    def leave(self, user_id: str) -> bool:
+        """Take a user out of whatever group they are in; True if they were in one"""
+        group_id = self.member_of.pop(user_id, None)
+        if group_id is not None:
+            group = self.groups.get(group_id)
+            if group is not None:
+                group.members.discard(user_id)
+            return True
+        everyone = self.groups.get(EVERYONE)
+        if everyone is not None and user_id not in everyone.excluded:
+            everyone.excluded.add(user_id)
+            return True
+        return False
+
+    def stop(self, group_id: str) -> bool:
+        group = self.groups.get(group_id)
+        if group is None:
+            return False
+        self._forget(group)
+        if group.task and not group.task.done():
+            group.task.cancel()
+        return True
+
+    def _forget(self, group: EmoteGroup) -> None:
+        if self.groups.get(group.id) is group:
+            del self.groups[group.id]
+        for user_id in list(group.members or ()):
+            if self.member_of.get(user_id) == group.id:
+                del self.member_of[user_id]
+
+    def stop_all(self) -> int:
+        stopped = 0
+        for group_id in list(self.groups):
+            stopped += self.stop(group_id)
+        return stopped
+
+    async def run(self, group: EmoteGroup) -> None:
+        loop = asyncio.get_running_loop()
+        interval = Config.EMOTE_LOOP_INTERVAL
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started = loop.time()
+        slot = 0  # position on the tick grid
+
+        async def send(user_id: str) -> None:
+            async with semaphore:
+                try:
+                    await self.bot.highrise.send_emote(group.emote_name, user_id)
+                except Exception as e:
+                    group.failures += 1
+                    log.debug("emote", f"Group emote failed for {user_id}: {e}")
+
+        try:
+            while True:
+                targets = group.targets(self.bot.room_users, self.bot.bot_user_id)
+                if not targets:
+                    break
+                await asyncio.gather(*(send(user_id) for user_id in targets))
+                group.ticks += 1
+
+                now = loop.time()
+                if now - started >= self.max_seconds:
+                    break
+                # next tick on the original grid; a round slower than the interval skips ticks
+                slot = max(slot + 1, math.ceil((now - started) / interval))
+                await asyncio.sleep(started + slot * interval - now)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            log.error("emote", f"Group emote loop error: {e}", group=group.id)
+        finally:
+            self._forget(group)
+            log.info("emote", f"⏹️ Group emote {group.emote_name} ended after {group.ticks} rounds",
+                     group=group.id, failures=group.failures)
+
+    def snapshot(self) -> list:
+        return [{"id": group.id, "emote": group.emote_name, "started_by": group.started_by,
+                 "members": len(group.targets(self.bot.room_users, self.bot.bot_user_id)), "rounds": group.ticks}
+                for group in list(self.groups.values())]
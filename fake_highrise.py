@@ -0,0 +1,530 @@
+"""
+Local stand-in for the Highrise server - offline testing and benchmarking
+FakeRoom simulates users, positions, outfits, privileges, conversations, server-side rate limits
+and latency. Bots reach it in two ways, both running the real SDK code unchanged:
+- in-process: room.connect(bot) gives the bot a real highrise.Highrise whose socket is a fake
+- websocket: FakeHighriseServer speaks the bot API protocol; start it and point the SDK at it with
+  HR_BOTAPI_URL=ws://127.0.0.1:8765/ - RunBot and main.py then run as they do in production
+
+    python fake_highrise.py --port 8765 --users 20 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from highrise import Highrise, Incoming, Outgoing, converter
+from highrise.models import (
+    AnchorHitRequest,
+    AnchorPosition,
+    ChangeRoomPrivilegeRequest,
+    ChatEvent,
+    ChatRequest,
+    Conversation,
+    CurrencyItem,
+    EmoteEvent,
+    EmoteRequest,
+    Error,
+    FloorHitRequest,
+    GetConversationsRequest,
+    GetMessagesRequest,
+    GetRoomPrivilegeRequest,
+    GetRoomUsersRequest,
+    GetUserOutfitRequest,
+    GetWalletRequest,
+    IndicatorRequest,
+    Item,
+    KeepaliveRequest,
+    Message,
+    MessageEvent,
+    ModerateRoomRequest,
+    Position,
+    ReactionEvent,
+    ReactionRequest,
+    RoomInfo,
+    RoomPermissions,
+    SendMessageRequest,
+    SessionMetadata,
+    SetOutfitRequest,
+    TeleportRequest,
+    TipReactionEvent,
+    User,
+    UserJoinedEvent,
+    UserLeftEvent,
+    UserMovedEvent,
+)
+
+from logger import log
+
+DEFAULT_OUTFIT = [
+    "body-flesh",
+    "eye-n_basic2018malesquaresleepy",
+    "eyebrow-n_basic2018newbrows07",
+    "nose-n_basic2018newnose05",
+    "mouth-basic2018chippermouth",
+    "hair_front-n_malenew05",
+    "hair_back-n_malenew05",
+    "shirt-n_starteritems2019tankwhite",
+    "pants-n_starteritems2019cuffedjeansblue",
+    "shoes-n_whitedans",
+]
+
+# نفس أسماء الاشتراكات التي يرسلها الـ SDK في ?events=
+EVENT_SUBSCRIPTIONS = {
+    ChatEvent: "chat",
+    EmoteEvent: "emote",
+    ReactionEvent: "reaction",
+    UserJoinedEvent: "user_joined",
+    UserLeftEvent: "user_left",
+    UserMovedEvent: "user_moved",
+    TipReactionEvent: "tip_reaction",
+    MessageEvent: "message",
+}
+
+DEFAULT_RATE_LIMITS = {"chat": (20, 5.0), "emote": (30, 5.0), "move": (20, 5.0)}
+
+RATE_LIMITED = {
+    ChatRequest: "chat",
+    EmoteRequest: "emote",
+    ReactionRequest: "emote",
+    FloorHitRequest: "move",
+    AnchorHitRequest: "move",
+    TeleportRequest: "move",
+}
+
+
+def make_outfit(item_ids: List[str]) -> List[Item]:
+    return [Item(type="clothing", amount=1, id=item_id) for item_id in item_ids]
+
+
+def event_handler(bot, event, bot_id: str):
+    """Same routing as the SDK's bot_runner - returns the handler coroutine or None"""
+    match event:
+        case ChatEvent(user=user, message=message, whisper=whisper):
+            if user.id == bot_id:
+                return None
+            return bot.on_whisper(user, message) if whisper else bot.on_chat(user, message)
+        case EmoteEvent(user=user, emote_id=emote_id, receiver=receiver):
+            return bot.on_emote(user, emote_id, receiver)
+        case ReactionEvent(user=user, reaction=reaction, receiver=receiver):
+            return bot.on_reaction(user, reaction, receiver)
+        case UserJoinedEvent(user=user, position=position):
+            return bot.on_user_join(user, position)
+        case UserLeftEvent(user=user):
+            return bot.on_user_leave(user)
+        case UserMovedEvent(user=user, position=position):
+            return bot.on_user_move(user, position)
+        case TipReactionEvent(sender=sender, receiver=receiver, item=item):
+            return bot.on_tip(sender, receiver, item)
+        case MessageEvent(user_id=user_id, conversation_id=conversation_id, is_new_conversation=is_new):
+            return bot.on_message(user_id, conversation_id, is_new)
+    return None
+
+
+class RateLimiter:
+    """Server-side token buckets: name -> (limit, period)"""
+
+    def __init__(self, limits: Dict[str, Tuple[int, float]]):
+        self.limits = limits
+        self.tokens = {name: float(limit) for name, (limit, _) in limits.items()}
+        self.updated = {name: time.monotonic() for name in limits}
+
+    def allow(self, name: Optional[str]) -> bool:
+        if name is None or name not in self.limits:
+            return True
+        limit, period = self.limits[name]
+        now = time.monotonic()
+        self.tokens[name] = min(limit, self.tokens[name] + (now - self.updated[name]) * limit / period)
+        self.updated[name] = now
+        if self.tokens[name] < 1:
+            return False
+        self.tokens[name] -= 1
+        return True
+
+
+class FakeRoom:
+    """Simulated room state plus the server's answer to every bot request"""
+
+    def __init__(self, room_id: str = "fake-room", bot_username: str = "FakeBot", latency: float = 0.0,
+                 jitter: float = 0.0, rate_limits: Optional[Dict[str, Tuple[int, float]]] = None,
+                 serialize: bool = True, bot_user_id: Optional[str] = None):
+        self.room_id = room_id
+        self.owner = User(id="owner-user", username="RoomOwner")
+        self.bot_user = User(id=bot_user_id or f"bot-{uuid.uuid4().hex[:8]}", username=bot_username)
+        self.latency = latency
+        self.jitter = jitter
+        self.serialize = serialize  # round-trip every message through JSON like the real socket
+        # None = limits close to the live server, {} = unlimited
+        self.rate_limits = DEFAULT_RATE_LIMITS if rate_limits is None else rate_limits
+        self.limiter = RateLimiter(self.rate_limits)
+
+        self.users: Dict[str, Tuple[User, Position | AnchorPosition]] = {
+            self.bot_user.id: (self.bot_user, Position(10.0, 0.0, 10.0))}
+        self.outfits: Dict[str, List[Item]] = {self.bot_user.id: make_outfit(DEFAULT_OUTFIT)}
+        self.privileges: Dict[str, RoomPermissions] = {}
+        self.unavailable_items = set()  # items the bot does not own - set_outfit fails with them
+        self.conversations: Dict[str, List[Message]] = {}
+        self.gold = 1000
+
+        self.connections = []
+        self.pending = set()
+        self.handler_errors = []
+        self.calls = Counter()          # requests by type
+        self.rate_limited = Counter()
+        self.transcript = []            # (channel, target, text) sent by the bot
+
+    # === Simulated users ===
+
+    def add_user(self, username: str, position: Optional[Position] = None, moderator: bool = False,
+                 outfit: Optional[List[str]] = None, user_id: Optional[str] = None) -> User:
+        """Put a user in the room without an event (already there when the bot connects)"""
+        user = User(id=user_id or f"user-{uuid.uuid4().hex[:12]}", username=username)
+        self.users[user.id] = (user, position or self.random_position())
+        self.outfits[user.id] = make_outfit(outfit or DEFAULT_OUTFIT)
+        if moderator:
+            self.privileges[user.id] = RoomPermissions(moderator=True, designer=False)
+        return user
+
+    def find_user(self, username: str) -> Optional[User]:
+        for user, _ in self.users.values():
+            if user.username.lower() == username.lower():
+                return user
+        return None
+
+    @staticmethod
+    def random_position() -> Position:
+        return Position(round(random.uniform(0, 20), 1), 0.0, round(random.uniform(0, 20), 1),
+                        random.choice(["FrontRight", "FrontLeft", "BackRight", "BackLeft"]))
+
+    async def join(self, username: str, **kwargs) -> User:
+        user = self.add_user(username, **kwargs)
+        await self.emit(UserJoinedEvent(user=user, position=self.users[user.id][1]))
+        return user
+
+    async def leave(self, user: User) -> None:
+        self.users.pop(user.id, None)
+        await self.emit(UserLeftEvent(user=user))
+
+    async def move(self, user: User, position: Optional[Position] = None) -> None:
+        position = position or self.random_position()
+        self.users[user.id] = (user, position)
+        await self.emit(UserMovedEvent(user=user, position=position))
+
+    async def say(self, user: User, message: str) -> None:
+        await self.emit(ChatEvent(user=user, message=message, whisper=False))
+
+    async def whisper(self, user: User, message: str) -> None:
+        await self.emit(ChatEvent(user=user, message=message, whisper=True))
+
+    async def tip(self, sender: User, amount: int = 5) -> None:
+        await self.emit(TipReactionEvent(sender=sender, receiver=self.bot_user,
+                                         item=CurrencyItem(type="gold", amount=amount)))
+
+    async def direct_message(self, user: User, text: str) -> str:
+        conversation_id = f"conv-{user.id}"
+        is_new = conversation_id not in self.conversations
+        self.conversations.setdefault(conversation_id, []).append(Message(
+            message_id=uuid.uuid4().hex, conversation_id=conversation_id, createdAt=datetime.now(),
+            content=text, sender_id=user.id, category="text"))
+        await self.emit(MessageEvent(user_id=user.id, conversation_id=conversation_id, is_new_conversation=is_new))
+        return conversation_id
+
+    async def replay_event(self, event, content: Optional[str] = None) -> None:
+        """Apply a recorded event to the room state, then deliver it (journal.py)"""
+        match event:
+            case UserJoinedEvent(user=user, position=position) | UserMovedEvent(user=user, position=position):
+                self.users[user.id] = (user, position)
+                self.outfits.setdefault(user.id, make_outfit(DEFAULT_OUTFIT))
+            case UserLeftEvent(user=user):
+                self.users.pop(user.id, None)
+            case MessageEvent(user_id=user_id, conversation_id=conversation_id):
+                self.conversations.setdefault(conversation_id, []).append(Message(
+                    message_id=uuid.uuid4().hex, conversation_id=conversation_id, createdAt=datetime.now(),
+                    content=content or "", sender_id=user_id, category="text"))
+        await self.emit(event)
+
+    # === Event delivery ===
+
+    async def emit(self, event) -> None:
+        for connection in list(self.connections):
+            await connection.deliver(event)
+
+    def track(self, coroutine) -> None:
+        """Run a bot handler as its own task, like the SDK's TaskGroup does"""
+        task = asyncio.ensure_future(coroutine)
+        self.pending.add(task)
+        task.add_done_callback(self._handler_done)
+
+    def _handler_done(self, task: asyncio.Task) -> None:
+        self.pending.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.handler_errors.append(task.exception())
+            log.error("fake", f"Bot handler raised: {task.exception()!r}")
+
+    async def settle(self, timeout: float = 30.0) -> None:
+        """Wait until every handler started by emitted events has finished"""
+        deadline = time.monotonic() + timeout
+        while self.pending and time.monotonic() < deadline:
+            await asyncio.wait(set(self.pending), timeout=max(0.0, deadline - time.monotonic()))
+
+    def session_metadata(self) -> SessionMetadata:
+        return SessionMetadata(
+            user_id=self.bot_user.id,
+            room_info=RoomInfo(owner_id=self.owner.id, room_name=self.room_id),
+            rate_limits={name: (limit, period) for name, (limit, period) in self.rate_limits.items()},
+            connection_id=uuid.uuid4().hex,
+            sdk_version=None,
+        )
+
+    async def connect(self, bot, start: bool = True) -> Highrise:
+        """Attach a bot in-process; bot.highrise becomes a real SDK client on a fake socket"""
+        connection = InProcessConnection(self, bot)
+        self.connections.append(connection)
+        if start:
+            self.track(bot.on_start(connection.metadata))
+            await asyncio.sleep(0)
+        return connection.highrise
+
+    def disconnect(self, bot) -> None:
+        self.connections = [c for c in self.connections if getattr(c, "bot", None) is not bot]
+
+    # === Server side ===
+
+    async def respond(self, request):
+        """Apply latency, then answer a decoded request"""
+        delay = self.latency + (random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+        return self.handle(request)
+
+    def handle(self, request):
+        kind = type(request)
+        self.calls[kind.__name__] += 1
+        rid = getattr(request, "rid", None)
+
+        if not self.limiter.allow(RATE_LIMITED.get(kind)):
+            self.rate_limited[kind.__name__] += 1
+            return Error(message="Rate limit exceeded", rid=rid)
+
+        match request:
+            case KeepaliveRequest():
+                return KeepaliveRequest.Response(rid=rid)
+            case ChatRequest(message=message, whisper_target_id=target):
+                if target and target not in self.users:
+                    return Error(message="Target user is not in the room", rid=rid)
+                self.transcript.append(("whisper" if target else "chat", target, message))
+                return ChatRequest.Response(rid=rid)
+            case EmoteRequest(target_user_id=target) | ReactionRequest(target_user_id=target):
+                if target and target not in self.users:
+                    return Error(message="Target user is not in the room", rid=rid)
+                return kind.Response(rid=rid)
+            case FloorHitRequest(destination=destination):
+                self.users[self.bot_user.id] = (self.bot_user, destination)
+                return FloorHitRequest.Response(rid=rid)
+            case AnchorHitRequest(anchor=anchor):
+                self.users[self.bot_user.id] = (self.bot_user, anchor)
+                return AnchorHitRequest.Response(rid=rid)
+            case TeleportRequest(user_id=user_id, destination=destination):
+                if user_id not in self.users:
+                    return Error(message="User is not in the room", rid=rid)
+                user = self.users[user_id][0]
+                self.users[user_id] = (user, destination)
+                for connection in self.connections:
+                    connection.queue_event(UserMovedEvent(user=user, position=destination))
+                return TeleportRequest.Response(rid=rid)
+            case GetRoomUsersRequest():
+                return GetRoomUsersRequest.Response(content=list(self.users.values()), rid=rid)
+            case GetRoomPrivilegeRequest(user_id=user_id):
+                if user_id == self.owner.id:
+                    permissions = RoomPermissions(moderator=True, designer=True)
+                else:
+                    permissions = self.privileges.get(user_id, RoomPermissions(moderator=False, designer=False))
+                return GetRoomPrivilegeRequest.Response(content=permissions, rid=rid)
+            case ChangeRoomPrivilegeRequest(user_id=user_id, permissions=permissions):
+                self.privileges[user_id] = permissions
+                return ChangeRoomPrivilegeRequest.Response(rid=rid)
+            case GetUserOutfitRequest(user_id=user_id):
+                if user_id not in self.outfits:
+                    return Error(message="User not found", rid=rid)
+                return GetUserOutfitRequest.Response(outfit=list(self.outfits[user_id]), rid=rid)
+            case SetOutfitRequest(outfit=outfit):
+                missing = [item.id for item in outfit if item.id in self.unavailable_items]
+                if missing:
+                    return Error(message=f"Item not owned: {missing[0]}", rid=rid)
+                self.outfits[self.bot_user.id] = list(outfit)
+                return SetOutfitRequest.Response(rid=rid)
+            case SendMessageRequest(conversation_id=conversation_id, content=content, type=category):
+                self.conversations.setdefault(conversation_id, []).append(Message(
+                    message_id=uuid.uuid4().hex, conversation_id=conversation_id, createdAt=datetime.now(),
+                    content=content, sender_id=self.bot_user.id, category=category))
+                self.transcript.append(("message", conversation_id, content))
+                return SendMessageRequest.Response(rid=rid)
+            case GetMessagesRequest(conversation_id=conversation_id):
+                messages = list(reversed(self.conversations.get(conversation_id, [])))[:20]
+                return GetMessagesRequest.Response(messages=messages, rid=rid)
+            case GetConversationsRequest():
+                conversations = [
+                    Conversation(id=conversation_id, did_join=True, unread_count=0,
+                                 last_message=messages[-1] if messages else None, muted=False)
+                    for conversation_id, messages in self.conversations.items()]
+                return GetConversationsRequest.Response(conversations=conversations[:20], not_joined=0, rid=rid)
+            case ModerateRoomRequest(user_id=user_id, moderation_action=action):
+                if action in ("kick", "ban") and user_id in self.users:
+                    user = self.users.pop(user_id)[0]
+                    for connection in self.connections:
+                        connection.queue_event(UserLeftEvent(user=user))
+                return ModerateRoomRequest.Response(rid=rid)
+            case IndicatorRequest():
+                return IndicatorRequest.Response(rid=rid)
+            case GetWalletRequest():
+                return GetWalletRequest.Response(content=[CurrencyItem(type="gold", amount=self.gold)], rid=rid)
+        return Error(message=f"{kind.__name__} is not supported by the fake server", rid=rid)
+
+
+class FakeSocket:
+    """Takes the place of the SDK's websocket inside an in-process connection"""
+
+    def __init__(self, connection: "InProcessConnection"):
+        self.connection = connection
+        self.closed = False
+
+    async def send_str(self, data: str) -> None:
+        request = converter.loads(data, Outgoing)
+        asyncio.ensure_future(self.connection.reply(request))
+
+    async def send_json(self, data: dict) -> None:
+        pass  # keepalives
+
+
+class InProcessConnection:
+    def __init__(self, room: FakeRoom, bot):
+        self.room = room
+        self.bot = bot
+        self.metadata = room.session_metadata()
+        self.highrise = Highrise()
+        self.highrise.my_id = room.bot_user.id
+        self.highrise.ws = FakeSocket(self)
+        bot.highrise = self.highrise
+
+    async def reply(self, request) -> None:
+        response = await self.room.respond(request)
+        if self.room.serialize:
+            response = converter.loads(converter.dumps(response, Incoming), Incoming)
+        queue = self.highrise._req_id_registry.pop(response.rid, None)
+        if queue is not None:
+            queue.put_nowait(response)
+
+    async def deliver(self, event) -> None:
+        if self.room.serialize:
+            event = converter.loads(converter.dumps(event, Incoming), Incoming)
+        handler = event_handler(self.bot, event, self.room.bot_user.id)
+        if handler is not None:
+            self.room.track(handler)
+
+    def queue_event(self, event) -> None:
+        """Server-originated event caused by a request (teleport, kick)"""
+        asyncio.ensure_future(self.deliver(event))
+
+
+class WebSocketConnection:
+    def __init__(self, room: FakeRoom, ws, subscriptions: set):
+        self.room = room
+        self.ws = ws
+        self.subscriptions = subscriptions
+
+    async def reply(self, request) -> None:
+        response = await self.room.respond(request)
+        if not self.ws.closed:
+            await self.ws.send_str(converter.dumps(response, Incoming))
+
+    async def deliver(self, event) -> None:
+        if self.subscriptions and EVENT_SUBSCRIPTIONS.get(type(event)) not in self.subscriptions:
+            return
+        if not self.ws.closed:
+            await self.ws.send_str(converter.dumps(event, Incoming))
+
+    def queue_event(self, event) -> None:
+        asyncio.ensure_future(self.deliver(event))
+
+
+class FakeHighriseServer:
+    """Bot API over a local websocket - set HR_BOTAPI_URL to url and run the bot as usual"""
+
+    def __init__(self, room: FakeRoom, host: str = "127.0.0.1", port: int = 8765):
+        self.room = room
+        self.host = host
+        self.port = port
+        self.runner = None
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}/"
+
+    async def start(self) -> None:
+        from aiohttp import web  # installed with the Highrise SDK
+        app = web.Application()
+        app.router.add_get("/", self.handle_socket)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        await web.TCPSite(self.runner, self.host, self.port).start()
+        log.info("fake", f"🧪 Fake Highrise server on {self.url} (export HR_BOTAPI_URL={self.url})")
+
+    async def stop(self) -> None:
+        if self.runner:
+            await self.runner.cleanup()
+
+    async def handle_socket(self, request):
+        from aiohttp import WSMsgType, web
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        events = request.query.get("events", "")
+        connection = WebSocketConnection(self.room, ws, set(filter(None, events.split(","))))
+        await ws.send_str(converter.dumps(self.room.session_metadata(), SessionMetadata | Error))
+        self.room.connections.append(connection)
+        log.info("fake", f"🤖 Bot connected to room {request.headers.get('room-id')}")
+
+        try:
+            async for frame in ws:
+                if frame.type != WSMsgType.TEXT:
+                    continue
+                try:
+                    message = converter.loads(frame.data, Outgoing)
+                except Exception as e:
+                    await ws.send_str(converter.dumps(Error(message=f"Invalid request: {e}"), Incoming))
+                    continue
+                asyncio.ensure_future(connection.reply(message))
+        finally:
+            self.room.connections.remove(connection)
+            log.info("fake", "🔌 Bot disconnected")
+        return ws
+
+
+async def serve(args) -> None:
+    room = FakeRoom(room_id=args.room, latency=args.latency, jitter=args.jitter)
+    for index in range(args.users):
+        room.add_user(f"user{index}", moderator=index < args.moderators)
+    server = FakeHighriseServer(room, args.host, args.port)
+    await server.start()
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local fake Highrise bot API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--room", default="fake-room")
+    parser.add_argument("--users", type=int, default=10, help="users already in the room")
+    parser.add_argument("--moderators", type=int, default=1, help="how many of them are moderators")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    asyncio.run(serve(parser.parse_args()))
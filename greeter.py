@@ -0,0 +1,152 @@
+"""
+Coalesced welcome and goodbye announcements
+Joins and leaves are buffered for a short window and announced together, so a group of
+20 arriving costs a handful of chat lines instead of 80+. The VIP promo goes out once per
+window, not once per user. Someone who joins and leaves (or leaves and comes back) inside
+the same window is not announced at all, and PresenceCache remembers who was here recently
+so flaky connections rejoining every few seconds are not greeted again.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from highrise.models import User
+
+from config import Config
+from logger import log
+from outbound import ANNOUNCEMENT, FLAVOR
+
+VIP_PROMO = [
+    "<#FFD700> 💎 Get VIP membership for only 5 Gold! 💰",
+    "<#FF69B4> 🎮 VIP Commands: /game (Rock Paper Scissors), /follow users! ✨",
+    "<#87CEEB> 📋 Type /list to see all commands! Tip 5G to become VIP! 💎",
+]
+WELCOME_WHISPER = "<#0099FF> Welcome! Type /list in private chat to see all available commands 📋"
+
+
+def mention_list(names: List[str], max_names: int) -> str:
+    """@a, @b and @c - anything past max_names is folded into "and N more" """
+    shown = [f"@{name}" for name in names[:max_names]]
+    hidden = len(names) - len(shown)
+    if hidden:
+        return f"{', '.join(shown)} and {hidden} more"
+    if len(shown) == 1:
+        return shown[0]
+    return f"{', '.join(shown[:-1])} and {shown[-1]}"
+
+
+class PresenceCache:
+    """user id -> last time seen in the room; entries expire after ttl, least recently
+    seen users are evicted once max_size is reached"""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.entries: "OrderedDict[str, float]" = OrderedDict()
+
+    def seen_recently(self, user_id: str) -> bool:
+        seen_at = self.entries.get(user_id)
+        if seen_at is None:
+            return False
+        if time.monotonic() - seen_at > self.ttl:
+            del self.entries[user_id]
+            return False
+        return True
+
+    def touch(self, user_id: str) -> None:
+        self.entries[user_id] = time.monotonic()
+        self.entries.move_to_end(user_id)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def forget(self, user_id: str) -> None:
+        self.entries.pop(user_id, None)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+class GreetingBatcher:
+    """Buffers presence changes on the bot loop; one flush task per window"""
+
+    def __init__(self, bot, settings: Optional[dict] = None):
+        settings = {**Config.GREETINGS, **(settings or {})}
+        self.bot = bot
+        self.window = settings["window"]
+        self.max_names = settings["max_names"]
+        self.line_delay = settings["line_delay"]
+        self.joined: Dict[str, User] = {}  # insertion order = arrival order
+        self.left: Dict[str, User] = {}
+        self.task: Optional[asyncio.Task] = None
+
+    def user_joined(self, user: User) -> None:
+        if self.left.pop(user.id, None) is not None:
+            return  # back within the window - neither goodbye nor welcome
+        if not Config.ENABLE_WELCOME_MESSAGES:
+            return
+        self.joined[user.id] = user
+        self._schedule()
+
+    def user_returned(self, user: User) -> None:
+        """Rejoin that is not greeted again - a goodbye still waiting for the flush is dropped"""
+        self.left.pop(user.id, None)
+
+    def user_left(self, user: User) -> bool:
+        """False if the user left before their welcome went out (so they get no goodbye either)"""
+        if self.joined.pop(user.id, None) is not None:
+            return False
+        if Config.ENABLE_GOODBYE_MESSAGES:
+            self.left[user.id] = user
+            self._schedule()
+        return True
+
+    def _schedule(self) -> None:
+        if self.task is None or self.task.done():
+            self.task = self.bot.tasks.spawn(self._flush_later(), "greetings", owner="feature:greetings")
+
+    async def _flush_later(self) -> None:
+        while self.joined or self.left:  # arrivals during a flush get their own window
+            await asyncio.sleep(self.window)
+            await self.flush()
+
+    async def flush(self) -> None:
+        joined, self.joined = list(self.joined.values()), {}
+        left, self.left = list(self.left.values()), {}
+        try:
+            if left:
+                names = mention_list([user.username for user in left], self.max_names)
+                await self.bot.highrise.chat(f"<#FF6B6B> 👋 Goodbye {names}! See you soon!", priority=ANNOUNCEMENT)
+            if joined:
+                await self.welcome(joined)
+        except Exception as e:
+            log.error("presence", f"❌ Failed to send greetings: {e}", joined=len(joined), left=len(left))
+
+    async def welcome(self, users: List[User]) -> None:
+        highrise = self.bot.highrise
+        names = mention_list([user.username for user in users], self.max_names)
+        await highrise.chat(f"<#00FF00> 🌟 Welcome {names}! 👋", priority=ANNOUNCEMENT)
+        for line in VIP_PROMO:
+            await asyncio.sleep(self.line_delay)  # توقيت بين الرسائل
+            await highrise.chat(line, priority=FLAVOR)
+
+        # The whisper is private, so every newcomer still gets their own
+        unreachable = []
+        for user in users:
+            try:
+                await highrise.send_whisper(user.id, WELCOME_WHISPER, priority=ANNOUNCEMENT)
+            except Exception as e:
+                log.error("presence", f"❌ Failed to send welcome whisper to {user.username}: {e}", user=user)
+                unreachable.append(user.username)
+        if unreachable:
+            names = mention_list(unreachable, self.max_names)
+            await highrise.chat(f"<#FFFF00> {names} Type /list to see available commands! 📋", priority=ANNOUNCEMENT)
+
+    def cancel(self) -> None:
+        """Drop anything buffered - used when the session restarts"""
+        if self.task and not self.task.done():
+            self.task.cancel()
+        self.task = None
+        self.joined.clear()
+        self.left.clear()
@@ -0,0 +1,111 @@
+"""
+Local IPC channel between the bot process and the management web server
+Request/response messages over an authenticated localhost connection
+"""
+
+import os
+import secrets
+import threading
+from multiprocessing.connection import Client, Listener
+from typing import Callable, Dict
+
+from config import Config
+from logger import log
+
+
+class IPCError(Exception):
+    """Raised by IPCClient when the bot is unreachable or the request failed"""
+
+
+def ensure_authkey() -> str:
+    """Random key for this run unless IPC_AUTHKEY is set - exported to the environment so the
+    spawned web server and room workers read the same key when they import config"""
+    if not Config.IPC_AUTHKEY:
+        Config.IPC_AUTHKEY = secrets.token_hex(32)
+        os.environ["IPC_AUTHKEY"] = Config.IPC_AUTHKEY
+    return Config.IPC_AUTHKEY
+
+
+def configured_authkey() -> bytes:
+    if not Config.IPC_AUTHKEY:
+        raise IPCError("IPC_AUTHKEY is not set - start the bot with main.py or set it for every process")
+    return Config.IPC_AUTHKEY.encode()
+
+
+class IPCServer:
+    """Runs inside the bot process - answers requests from the web server on its own threads"""
+
+    def __init__(self, address=None, authkey: bytes = None):
+        self.address = address or (Config.IPC_HOST, Config.IPC_PORT)
+        self.authkey = authkey or configured_authkey()
+        self.handlers: Dict[str, Callable] = {}
+        self.listener = None
+
+    def register(self, op: str, handler: Callable) -> None:
+        """handler(**args) runs on an IPC thread and must not touch the event loop directly"""
+        self.handlers[op] = handler
+
+    def start(self) -> None:
+        try:
+            self.listener = Listener(self.address, authkey=self.authkey)
+        except OSError as e:
+            log.error("system", f"❌ Could not start IPC server on {self.address}: {e}")
+            return
+        threading.Thread(target=self._serve, name="ipc-server", daemon=True).start()
+        log.info("system", f"🔌 IPC server listening on {self.address[0]}:{self.address[1]}")
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                conn = self.listener.accept()
+            except OSError:
+                break  # listener closed
+            except Exception as e:
+                log.warning("system", f"IPC connection rejected: {e}")
+                continue
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn) -> None:
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+
+                handler = self.handlers.get(request.get("op"))
+                try:
+                    if handler is None:
+                        raise IPCError(f"Unknown operation: {request.get('op')}")
+                    conn.send({"ok": True, "result": handler(**request.get("args", {}))})
+                except Exception as e:
+                    conn.send({"ok": False, "error": str(e)})
+
+    def close(self) -> None:
+        if self.listener:
+            self.listener.close()
+
+
+class IPCClient:
+    """Used by the web server - one short connection per call"""
+
+    def __init__(self, address=None, authkey: bytes = None, timeout: float = 5.0):
+        self.address = address or (Config.IPC_HOST, Config.IPC_PORT)
+        self.authkey = authkey or configured_authkey()
+        self.timeout = timeout
+
+    def call(self, op: str, timeout: float = None, **args):
+        try:
+            conn = Client(self.address, authkey=self.authkey)
+        except (OSError, EOFError) as e:
+            raise IPCError(f"Bot process is not reachable: {e}") from e
+
+        with conn:
+            conn.send({"op": op, "args": args})
+            if not conn.poll(timeout or self.timeout):
+                raise IPCError(f"Bot did not answer '{op}' in time")
+            response = conn.recv()
+
+        if not response.get("ok"):
+            raise IPCError(response.get("error", "Unknown error"))
+        return response.get("result")
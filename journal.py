@@ -0,0 +1,204 @@
+"""
+Record and replay of room event streams
+With RECORD_EVENTS on, every inbound event (chat, whisper, join, leave, move, tip, message) is appended
+to JOURNAL_DIR/<room>-<time>.jsonl in the SDK's own JSON form. The first line holds the users that were
+already in the room. A journal can be fed back into Bot against the fake room (fake_highrise.py):
+
+    python journal.py info journals/room-20260101-120000.jsonl
+    python journal.py replay journals/room-20260101-120000.jsonl            # real time
+    python journal.py replay journals/room-20260101-120000.jsonl --speed 10
+    python journal.py replay journals/room-20260101-120000.jsonl --fast     # as fast as possible
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from typing import Iterator, Tuple
+
+from highrise import Incoming, converter
+from highrise.models import AnchorPosition, Position, User
+
+from config import Config
+from logger import log
+
+JOURNAL_VERSION = 1
+
+
+def _dumps(data: dict) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class EventRecorder:
+    """Append-only journal written on the bot loop - buffered, flushed at most once a second"""
+
+    def __init__(self, path: str, room_id: str, bot_user_id: str, users: list):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.file = _open(path, "a")
+        self.started = time.monotonic()
+        self.flushed_at = self.started
+        self.count = 0
+        self.file.write(_dumps({
+            "journal": JOURNAL_VERSION,
+            "room_id": room_id,
+            "bot_user_id": bot_user_id,
+            "started_at": time.time(),
+            "users": [[converter.unstructure(user), converter.unstructure(position)] for user, position in users],
+        }))
+
+    @classmethod
+    def create(cls, room_id: str, bot_user_id: str, users: list) -> "EventRecorder":
+        path = os.path.join(Config.JOURNAL_DIR, f"{room_id}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl")
+        recorder = cls(path, room_id, bot_user_id, users)
+        log.info("system", f"🎙️ Recording room events to {path}")
+        return recorder
+
+    def record(self, event, **extra) -> None:
+        if self.file is None:
+            return
+        now = time.monotonic()
+        self.file.write(_dumps({"t": round(now - self.started, 3), "e": converter.unstructure(event, Incoming),
+                                **extra}))
+        self.count += 1
+        if now - self.flushed_at >= 1.0:
+            self.file.flush()
+            self.flushed_at = now
+
+    def close(self) -> None:
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def read_journal(path: str) -> Tuple[dict, Iterator[Tuple[float, object, dict]]]:
+    """Header plus a lazy stream of (t, event, extra) - large journals are never loaded whole"""
+    f = _open(path, "r")
+    header = json.loads(f.readline())
+    if header.get("journal") != JOURNAL_VERSION:
+        f.close()
+        raise ValueError(f"{path} is not a version {JOURNAL_VERSION} event journal")
+
+    def events():
+        with f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                event = converter.structure(entry.pop("e"), Incoming)
+                yield entry.pop("t"), event, entry
+    return header, events()
+
+
+def journal_users(header: dict) -> list:
+    return [(converter.structure(user, User), converter.structure(position, Position | AnchorPosition))
+            for user, position in header.get("users", [])]
+
+
+async def replay(path: str, bot=None, speed: float = 1.0, latency: float = 0.0, room=None) -> dict:
+    """Feed a journal into a bot on the fake room; speed 0 means as fast as possible"""
+    from fake_highrise import FakeRoom  # only needed for replays
+    if bot is None:
+        from main import Bot
+        bot = Bot()
+
+    header, events = read_journal(path)
+    room = room or FakeRoom(room_id=header["room_id"], latency=latency, rate_limits={},
+                            bot_user_id=header["bot_user_id"])
+    for user, position in journal_users(header):
+        if user.id != room.bot_user.id:
+            room.add_user(user.username, position=position, user_id=user.id)
+
+    await room.connect(bot)
+    await room.settle()
+    room.calls.clear()
+
+    count = 0
+    kinds = Counter()
+    max_behind = 0.0
+    started = time.monotonic()
+    for t, event, extra in events:
+        if speed > 0:
+            delay = started + t / speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                max_behind = max(max_behind, -delay)
+        await room.replay_event(event, **extra)
+        count += 1
+        kinds[type(event).__name__] += 1
+        if speed <= 0 and count % 100 == 0:
+            await asyncio.sleep(0)  # let handlers run between batches
+    await room.settle()
+    wall = time.monotonic() - started
+
+    return {
+        "journal": os.path.basename(path),
+        "events": count,
+        "events_by_type": dict(kinds),
+        "speed": speed if speed > 0 else "fast",
+        "wall_seconds": round(wall, 3),
+        "events_per_second": round(count / wall, 1) if wall else None,
+        "max_behind_schedule_ms": round(max_behind * 1000, 1),
+        "api_calls": sum(room.calls.values()),
+        "api_calls_by_type": dict(room.calls),
+        "handler_errors": len(room.handler_errors),
+    }
+
+
+def journal_info(path: str) -> dict:
+    header, events = read_journal(path)
+    kinds = Counter()
+    last = 0.0
+    for t, event, _ in events:
+        kinds[type(event).__name__] += 1
+        last = t
+    return {
+        "room_id": header["room_id"],
+        "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(header["started_at"])),
+        "users_at_start": len(header.get("users", [])),
+        "duration_seconds": last,
+        "events": sum(kinds.values()),
+        "events_by_type": dict(kinds),
+    }
+
+
+async def _replay_cli(args) -> None:
+    Config.ENABLE_LOGGING = args.with_logging
+    Config.ENABLE_RANDOM_MOVEMENT = False
+    Config.OUTBOUND["per_second"] = 0  # replay room has no rate limits
+    path = os.path.abspath(args.journal)
+    os.chdir(tempfile.mkdtemp(prefix="bot-replay-"))  # the replayed bot must not touch real data files
+    result = await replay(path, speed=0 if args.fast else args.speed, latency=args.latency)
+    for task in [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]:
+        task.cancel()
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or replay a recorded room event journal")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info")
+    info.add_argument("journal")
+    play = commands.add_parser("replay")
+    play.add_argument("journal")
+    play.add_argument("--speed", type=float, default=1.0, help="1 = real time, 10 = ten times faster")
+    play.add_argument("--fast", action="store_true", help="no waiting between events")
+    play.add_argument("--latency", type=float, default=0.02, help="fake server response time (seconds)")
+    play.add_argument("--with-logging", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "info":
+        print(json.dumps(journal_info(args.journal), indent=2, ensure_ascii=False))
+    else:
+        asyncio.run(_replay_cli(args))
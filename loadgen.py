@@ -0,0 +1,360 @@
+"""
+Synthetic load against the fake Highrise room (fake_highrise.py)
+Simulated users join, pick numbered emotes, send /clap @user, chat, tip the bot and leave, each
+at its own rate (events per second across the room). The report shows handler latency
+percentiles, requests waiting on the server, memory growth and API calls per event, per window
+and for the whole run, so it is easy to see the population at which Bot starts to fall behind:
+
+    python loadgen.py --users 300 --seconds 60
+    python loadgen.py --users 500 --join-rate 50 --emote-rate 20 --clap-rate 30 --output load.json
+    python loadgen.py --no-rate-limits --tracemalloc
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+from typing import Dict, List
+
+from benchmarks import OWNER, Clock, git_revision, shutdown
+from config import Config
+from fake_highrise import FakeRoom
+from main import Bot
+from outbound import Outbox
+
+PLAIN_CHAT = ["hello", "nice room!", "who wants to dance?", "lol", "brb", "مرحبا", "😂😂"]
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(p / 100 * len(values)) - 1))]
+
+
+def latency_summary(values: List[float]) -> dict:
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0.0,
+    }
+
+
+def rss_bytes() -> int:
+    """Current resident set size (peak RSS where /proc is missing)"""
+    try:
+        with open("/proc/self/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class TimedRoom(FakeRoom):
+    """FakeRoom that times every bot handler from event delivery to completion"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.completed: List[float] = []  # every handler in completion order, for windows
+
+    def track(self, coroutine) -> None:
+        super().track(self._timed(coroutine.__qualname__.rsplit(".", 1)[-1], coroutine))
+
+    async def _timed(self, handler: str, coroutine):
+        started = time.perf_counter()
+        try:
+            return await coroutine
+        finally:
+            elapsed = time.perf_counter() - started
+            self.latencies[handler].append(elapsed)
+            self.completed.append(elapsed)
+
+
+class LoadGenerator:
+    """Drives the simulated users - every action runs as a Poisson process at its own rate"""
+
+    def __init__(self, room: TimedRoom, bot, args):
+        self.room = room
+        self.bot = bot
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.present = []           # users in the room, swap-removed so picks stay O(1)
+        self.index = {}
+        self.joined = 0
+        self.events = Counter()
+        self.samples = []           # (time, handlers in flight, requests in flight, tasks)
+        self.timeline = []
+        self.running = True
+
+    # === Population ===
+
+    def pick(self):
+        return self.present[self.rng.randrange(len(self.present))] if self.present else None
+
+    async def join(self) -> None:
+        if len(self.present) >= self.args.users:
+            return
+        self.joined += 1
+        user = await self.room.join(f"load{self.joined}")
+        self.index[user.id] = len(self.present)
+        self.present.append(user)
+        self.events["join"] += 1
+
+    async def leave(self) -> None:
+        user = self.pick()
+        if user is None:
+            return
+        position = self.index.pop(user.id)
+        last = self.present.pop()
+        if last.id != user.id:
+            self.present[position] = last
+            self.index[last.id] = position
+        await self.room.leave(user)
+        self.events["leave"] += 1
+
+    # === Actions ===
+
+    async def emote(self) -> None:
+        user = self.pick()
+        if user is not None:
+            await self.room.say(user, str(self.rng.randint(1, len(self.bot.emotes_list))))
+            self.events["emote"] += 1
+
+    async def clap(self) -> None:
+        user, target = self.pick(), self.pick()
+        if user is not None:
+            await self.room.say(user, f"/clap @{target.username}")
+            self.events["clap"] += 1
+
+    async def chat(self) -> None:
+        user = self.pick()
+        if user is not None:
+            await self.room.say(user, self.rng.choice(PLAIN_CHAT))
+            self.events["chat"] += 1
+
+    async def tip(self) -> None:
+        user = self.pick()
+        if user is not None:
+            await self.room.tip(user, 5)
+            self.events["tip"] += 1
+
+    async def drive(self, action, rate: float) -> None:
+        if rate <= 0:
+            return
+        while self.running:
+            await asyncio.sleep(self.rng.expovariate(rate))
+            if self.running:
+                await action()
+
+    # === Sampling ===
+
+    def in_flight_requests(self) -> int:
+        registry = getattr(self.bot.highrise, "_req_id_registry", None)
+        return len(registry) if registry is not None else 0
+
+    def outbox_depth(self) -> int:
+        outbox = self.bot._highrise
+        return len(outbox.queue) if isinstance(outbox, Outbox) else 0
+
+    async def sample(self) -> None:
+        started = time.perf_counter()
+        window_start = started
+        window_events = sum(self.events.values())
+        window_calls = sum(self.room.calls.values())
+        window_latency = len(self.room.completed)
+        while self.running:
+            await asyncio.sleep(self.args.sample_interval)
+            now = time.perf_counter()
+            self.samples.append((now - started, len(self.room.pending), self.in_flight_requests(),
+                                 len(asyncio.all_tasks()), self.outbox_depth()))
+            if now - window_start >= self.args.window:
+                events = sum(self.events.values())
+                calls = sum(self.room.calls.values())
+                count = len(self.room.completed)
+                recent = sorted(self.room.completed[window_latency:count])
+                window = [s for s in self.samples if s[0] >= window_start - started]
+                self.timeline.append({
+                    "t": round(now - started, 1),
+                    "users": len(self.present),
+                    "events_per_second": round((events - window_events) / (now - window_start), 1),
+                    "api_calls_per_event": round((calls - window_calls) / max(1, events - window_events), 2),
+                    "handler_p95_ms": round(percentile(recent, 95) * 1000, 1),
+                    "max_handlers_in_flight": max((s[1] for s in window), default=0),
+                    "max_requests_in_flight": max((s[2] for s in window), default=0),
+                    "max_outbox_depth": max((s[4] for s in window), default=0),
+                    "rss_mb": round(rss_bytes() / 2 ** 20, 1),
+                })
+                if not self.args.quiet:
+                    print(f"   {json.dumps(self.timeline[-1], ensure_ascii=False)}", flush=True)
+                window_start, window_events, window_calls, window_latency = now, events, calls, count
+
+    async def run(self) -> None:
+        args = self.args
+        drivers = [
+            self.drive(self.join, args.join_rate),
+            self.drive(self.leave, args.leave_rate),
+            self.drive(self.emote, args.emote_rate),
+            self.drive(self.clap, args.clap_rate),
+            self.drive(self.chat, args.chat_rate),
+            self.drive(self.tip, args.tip_rate),
+            self.sample(),
+        ]
+        tasks = [asyncio.create_task(driver) for driver in drivers]
+        await asyncio.sleep(args.seconds)
+        self.running = False
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def bot_state(bot) -> dict:
+    """Sizes of the per-user structures Bot keeps - these should follow the population"""
+    return {
+        "room_users": len(bot.room_users),
+        "user_sessions": len(bot.sessions),
+        "emote_loops": sum(1 for _ in bot.sessions.emote_loops()),
+        "games": bot.sessions.games(),
+    }
+
+
+async def run_load(args) -> dict:
+    room = TimedRoom(latency=args.latency, jitter=args.jitter, rate_limits={} if args.no_rate_limits else None)
+    for index in range(args.initial_users):
+        room.add_user(f"early{index}")
+    bot = Bot()
+    await room.connect(bot)
+    await room.settle()
+    room.calls.clear()
+    room.latencies.clear()
+    room.completed.clear()
+
+    generator = LoadGenerator(room, bot, args)
+    gc.collect()
+    objects_before = len(gc.get_objects())
+    rss_before = rss_bytes()
+    if args.tracemalloc:
+        tracemalloc.start(10)
+        heap_before = tracemalloc.take_snapshot()
+
+    with Clock() as clock:
+        await generator.run()
+        drained = time.perf_counter()
+        await room.settle(timeout=args.drain)
+        drain_seconds = time.perf_counter() - drained
+
+    state = bot_state(bot)
+    gc.collect()
+    memory = {
+        "rss_before_mb": round(rss_before / 2 ** 20, 1),
+        "rss_after_mb": round(rss_bytes() / 2 ** 20, 1),
+        "rss_growth_mb": round((rss_bytes() - rss_before) / 2 ** 20, 1),
+        "gc_objects_growth": len(gc.get_objects()) - objects_before,
+    }
+    if args.tracemalloc:
+        growth = tracemalloc.take_snapshot().compare_to(heap_before, "lineno")
+        tracemalloc.stop()
+        memory["top_growth"] = [str(stat) for stat in growth[:10]]
+    unfinished = len(room.pending)
+    await shutdown(bot)
+
+    events = sum(generator.events.values())
+    calls = sum(room.calls.values())
+    return {
+        "events": events,
+        "events_by_type": dict(generator.events),
+        "events_per_second": round(events / args.seconds, 1),
+        "peak_users": max((entry["users"] for entry in generator.timeline), default=len(generator.present)),
+        "handler_latency": latency_summary(room.completed),
+        "handler_latency_by_handler": {name: latency_summary(values)
+                                       for name, values in sorted(room.latencies.items())},
+        "queue": {
+            "max_handlers_in_flight": max((s[1] for s in generator.samples), default=0),
+            "max_requests_in_flight": max((s[2] for s in generator.samples), default=0),
+            "mean_requests_in_flight": round(sum(s[2] for s in generator.samples) / len(generator.samples), 1)
+            if generator.samples else 0.0,
+            "max_tasks": max((s[3] for s in generator.samples), default=0),
+            "max_outbox_depth": max((s[4] for s in generator.samples), default=0),
+            "outbox": bot._highrise.snapshot() if isinstance(bot._highrise, Outbox) else None,
+            "unfinished_after_drain": unfinished,
+            "drain_seconds": round(drain_seconds, 2),
+        },
+        "memory": memory,
+        "api_calls": calls,
+        "api_calls_per_event": round(calls / events, 2) if events else 0.0,
+        "api_calls_by_type": dict(sorted(room.calls.items())),
+        "rate_limited": dict(room.rate_limited),
+        "handler_errors": len(room.handler_errors),
+        "cpu_percent": round(clock.cpu / clock.wall * 100, 1),
+        "bot_state_after": state,
+        "timeline": generator.timeline,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic user load against the fake Highrise room")
+    parser.add_argument("--users", type=int, default=200, help="population the joins ramp up to")
+    parser.add_argument("--initial-users", type=int, default=0, help="users already in the room")
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--join-rate", type=float, default=20.0, help="joins per second")
+    parser.add_argument("--leave-rate", type=float, default=2.0)
+    parser.add_argument("--emote-rate", type=float, default=10.0, help="numbered emote requests per second")
+    parser.add_argument("--clap-rate", type=float, default=10.0, help="/clap @user per second")
+    parser.add_argument("--chat-rate", type=float, default=10.0, help="plain chat lines per second")
+    parser.add_argument("--tip-rate", type=float, default=0.5)
+    parser.add_argument("--latency", type=float, default=0.02, help="fake server response time (seconds)")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--no-rate-limits", action="store_true", help="turn off the fake server's rate limits")
+    parser.add_argument("--window", type=float, default=5.0, help="seconds per timeline entry")
+    parser.add_argument("--sample-interval", type=float, default=0.1)
+    parser.add_argument("--drain", type=float, default=30.0, help="seconds to wait for handlers at the end")
+    parser.add_argument("--tracemalloc", action="store_true", help="report the top Python heap growth sites")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="loadgen_results.json")
+    parser.add_argument("--with-logging", action="store_true")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output)
+    # نفس إعدادات benchmarks.py حتى تكون النتائج قابلة للمقارنة
+    Config.ENABLE_LOGGING = args.with_logging
+    Config.ENABLE_RANDOM_MOVEMENT = False
+    Config.BOT_OWNER = OWNER
+    if args.no_rate_limits:
+        Config.OUTBOUND["per_second"] = 0
+    os.chdir(tempfile.mkdtemp(prefix="bot-load-"))  # tips rewrite config.py, keep that out of the project
+
+    print(f"▶️ {args.users} users for {args.seconds:.0f}s", flush=True)
+    result = asyncio.run(run_load(args))
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": sys.version.split()[0],
+            "args": vars(args),
+        },
+        "results": result,
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    summary = {key: result[key] for key in ("events", "events_per_second", "handler_latency", "queue",
+                                            "api_calls_per_event", "handler_errors", "bot_state_after")}
+    summary["memory"] = {key: value for key, value in result["memory"].items() if key != "top_growth"}
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    print(f"\n📄 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
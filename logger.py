@@ -0,0 +1,316 @@
+"""
+Structured bot logging
+Records are handed to a background thread (QueueHandler/QueueListener), so handlers never
+wait on stdout or disk. The last LOG_BUFFER_SIZE records stay in memory for the /logs page,
+and every record is also written as a JSON line to a rotating, gzip-archived file.
+"""
+
+import atexit
+import glob
+import gzip
+import itertools
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from config import Config
+
+LEVELS = {"debug": logging.DEBUG, "info": logging.INFO, "warning": logging.WARNING, "error": logging.ERROR}
+
+
+def record_to_dict(record: logging.LogRecord) -> dict:
+    return {
+        "id": getattr(record, "seq", 0),
+        "ts": record.created,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record.created)),
+        "level": record.levelname.lower(),
+        "event": getattr(record, "event", "system"),
+        "user_id": getattr(record, "user_id", None),
+        "username": getattr(record, "username", None),
+        "message": record.getMessage(),
+        "fields": getattr(record, "fields", None) or {},
+    }
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the newest records in memory - written by the listener thread, read by IPC threads"""
+
+    def __init__(self, capacity: int):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+        self.buffer_lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord) -> None:
+        entry = record_to_dict(record)
+        with self.buffer_lock:
+            self.records.append(entry)
+
+    def query(self, level: Optional[str] = None, event: Optional[str] = None, user: Optional[str] = None,
+              search: Optional[str] = None, after: float = 0, limit: int = 200) -> list:
+        """Newest-last list of records matching every given filter; after is a unix timestamp"""
+        with self.buffer_lock:
+            entries = list(self.records)
+
+        min_level = LEVELS.get((level or "").lower(), 0)
+        user = (user or "").lstrip("@").lower()
+        search = (search or "").lower()
+        result = []
+        for entry in reversed(entries):
+            if entry["ts"] <= after:
+                break
+            if min_level and LEVELS.get(entry["level"], 0) < min_level:
+                continue
+            if event and entry["event"] != event:
+                continue
+            if user and user not in ((entry["username"] or "").lower(), (entry["user_id"] or "").lower()):
+                continue
+            if search and search not in entry["message"].lower():
+                continue
+            result.append(entry)
+            if len(result) >= limit:
+                break
+        result.reverse()
+        return result
+
+    def clear(self) -> None:
+        with self.buffer_lock:
+            self.records.clear()
+
+
+class ConsoleFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        username = getattr(record, "username", None)
+        who = f" @{username}" if username else ""
+        stamp = time.strftime("%H:%M:%S", time.localtime(record.created))
+        return f"[{stamp}] {record.levelname:<7} {getattr(record, 'event', 'system')}{who}: {record.getMessage()}"
+
+
+class JsonLinesFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        return json.dumps(record_to_dict(record), ensure_ascii=False, default=str)
+
+
+class ArchivingFileHandler(logging.FileHandler):
+    """JSON-lines file rotated by size or age; old files are gzipped and pruned after keep_days.
+    Runs on the listener thread, so compression never delays the bot"""
+
+    def __init__(self, path: str, max_bytes: int, max_age: float, keep_days: float):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        super().__init__(path, encoding='utf-8')
+        self.setFormatter(JsonLinesFormatter())
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.keep_days = keep_days
+        self.opened_at = time.time()
+        self.prune_archives()
+
+    def should_rollover(self) -> bool:
+        if self.stream is None or self.stream.tell() == 0:
+            return False
+        return self.stream.tell() >= self.max_bytes or time.time() - self.opened_at >= self.max_age
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            if self.should_rollover():
+                self.rollover()
+        except Exception:
+            self.handleError(record)
+        super().emit(record)
+
+    def rollover(self) -> None:
+        self.stream.close()
+        self.stream = None
+
+        base = self.baseFilename[:-len(".log")] if self.baseFilename.endswith(".log") else self.baseFilename
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        archive = f"{base}-{stamp}.log.gz"
+        suffix = itertools.count(1)
+        while os.path.exists(archive):  # several rollovers in the same second
+            archive = f"{base}-{stamp}-{next(suffix)}.log.gz"
+        rotated = f"{self.baseFilename}.rotating"
+        os.replace(self.baseFilename, rotated)
+        with open(rotated, 'rb') as source, gzip.open(archive, 'wb') as target:
+            shutil.copyfileobj(source, target)
+        os.remove(rotated)
+
+        self.stream = self._open()
+        self.opened_at = time.time()
+        self.prune_archives()
+
+    def prune_archives(self) -> None:
+        """Retention tied to Config.KEEP_BACKUP_DAYS"""
+        cutoff = time.time() - self.keep_days * 86400
+        for archive in glob.glob(os.path.join(os.path.dirname(self.baseFilename), "*.log.gz")):
+            try:
+                if os.path.getmtime(archive) < cutoff:
+                    os.remove(archive)
+            except OSError:
+                pass
+
+
+def list_log_files(directory: Optional[str] = None) -> list:
+    """Current logs and archives, newest first"""
+    directory = directory or Config.LOG_DIR
+    paths = glob.glob(os.path.join(directory, "*.log")) + glob.glob(os.path.join(directory, "*.log.gz"))
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def parse_line(line: str) -> dict:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return {"message": line.rstrip("\n"), "level": "info", "event": "raw"}
+
+
+def tail_log(path: str, count: int = 100, block_size: int = 8192) -> list:
+    """Last count records, reading backwards from the end instead of loading the whole file"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        data = b""
+        while position > 0 and data.count(b"\n") <= count:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            data = f.read(step) + data
+    lines = data.splitlines()[-count:]
+    return [parse_line(line.decode('utf-8', 'replace')) for line in lines if line.strip()]
+
+
+def search_logs(text: str = "", user: str = "", event: str = "", level: str = "",
+                limit: int = 500, directory: Optional[str] = None):
+    """Yield matching records from current logs and gzip archives, one line at a time"""
+    text = (text or "").lower()
+    user = (user or "").lstrip("@").lower()
+    min_level = LEVELS.get((level or "").lower(), 0)
+    found = 0
+    for path in list_log_files(directory):
+        opener = gzip.open if path.endswith(".gz") else open
+        try:
+            with opener(path, 'rt', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    lowered = line.lower()
+                    # فحص سريع على النص الخام قبل تحليل JSON
+                    if (text and text not in lowered) or (user and user not in lowered):
+                        continue
+                    entry = parse_line(line)
+                    if user and user not in ((entry.get("username") or "").lower(), (entry.get("user_id") or "").lower()):
+                        continue
+                    if event and entry.get("event") != event:
+                        continue
+                    if min_level and LEVELS.get(entry.get("level"), 0) < min_level:
+                        continue
+                    if text and text not in (entry.get("message") or "").lower():
+                        continue
+                    yield {**entry, "file": os.path.basename(path)}
+                    found += 1
+                    if found >= limit:
+                        return
+        except OSError as e:
+            yield {"level": "error", "event": "system", "message": f"Could not read {path}: {e}"}
+
+
+class BotLogger:
+    """Structured logger - level, event type and user on every record"""
+
+    def __init__(self, name: str = "bot"):
+        self.logger = logging.getLogger(name)
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.propagate = False
+        self.ring = RingBufferHandler(Config.LOG_BUFFER_SIZE)
+        self.queue = queue.SimpleQueue()
+        self.listener = None
+        self.seq = itertools.count(1)  # next() is atomic - no lock on the bot loop
+
+    def start(self, *handlers: logging.Handler) -> None:
+        """Start the background writer; extra handlers (files...) run on the same thread"""
+        if self.listener:
+            return
+        console = logging.StreamHandler(sys.stdout)
+        console.setFormatter(ConsoleFormatter())
+        self.logger.addHandler(logging.handlers.QueueHandler(self.queue))
+        self.listener = logging.handlers.QueueListener(self.queue, self.ring, console, *handlers,
+                                                       respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.stop)  # flush queued records on exit
+
+    def add_file(self, name: str) -> None:
+        """Also write this process's records to LOG_DIR/<name>.log (one file per process)"""
+        handler = ArchivingFileHandler(
+            os.path.join(Config.LOG_DIR, f"{name}.log"),
+            max_bytes=Config.LOG_MAX_BYTES,
+            max_age=Config.LOG_ROTATE_HOURS * 3600,
+            keep_days=Config.KEEP_BACKUP_DAYS)
+        if self.listener is None:
+            self.start(handler)
+        else:
+            self.listener.handlers = self.listener.handlers + (handler,)
+
+    def stop(self) -> None:
+        if self.listener:
+            self.listener.stop()
+            self.listener = None
+
+    def enabled(self, level: int, event: str) -> bool:
+        """Config toggles are checked before any record is built"""
+        if not Config.ENABLE_LOGGING:
+            return False
+        if level >= logging.ERROR:
+            return Config.LOG_BOT_ERRORS
+        if event in ("chat", "whisper", "message"):
+            return Config.LOG_CHAT_MESSAGES
+        if event == "user_action":
+            return Config.LOG_USER_ACTIONS
+        return True
+
+    def log(self, level: int, event: str, message: str, user=None, **fields) -> None:
+        if not self.enabled(level, event):
+            return
+        if self.listener is None:
+            self.start()
+        self.logger.log(level, message, extra={
+            "event": event,
+            "seq": next(self.seq),
+            "user_id": getattr(user, "id", None),
+            "username": getattr(user, "username", None),
+            "fields": fields,
+        })
+
+    def debug(self, event: str, message: str, user=None, **fields) -> None:
+        self.log(logging.DEBUG, event, message, user, **fields)
+
+    def info(self, event: str, message: str, user=None, **fields) -> None:
+        self.log(logging.INFO, event, message, user, **fields)
+
+    def warning(self, event: str, message: str, user=None, **fields) -> None:
+        self.log(logging.WARNING, event, message, user, **fields)
+
+    def error(self, event: str, message: str, user=None, **fields) -> None:
+        self.log(logging.ERROR, event, message, user, **fields)
+
+    def chat(self, user, message: str, channel: str = "chat", **fields) -> None:
+        """Incoming chat/whisper/DM text - honors LOG_CHAT_MESSAGES"""
+        self.log(logging.INFO, channel, message, user, **fields)
+
+    def action(self, user, message: str, **fields) -> None:
+        """Something a user did (command, tip, join...) - honors LOG_USER_ACTIONS"""
+        self.log(logging.INFO, "user_action", message, user, **fields)
+
+    def query(self, **filters) -> list:
+        return self.ring.query(**filters)
+
+    def clear(self) -> int:
+        count = len(self.ring.records)
+        self.ring.clear()
+        return count
+
+
+log = BotLogger()
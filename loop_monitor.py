@@ -0,0 +1,130 @@
+"""
+Event-loop lag monitor and slow-handler detector
+A loop task measures how late its own wake-ups are; a watchdog thread captures the stack of
+whatever is blocking the loop, so synchronous file I/O in a handler shows up by name
+"""
+
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+from config import Config
+from logger import log
+from metrics import metrics
+
+THIS_FILE = os.path.abspath(__file__)
+PROJECT_DIR = os.path.dirname(THIS_FILE)
+
+
+def describe_frame(frame) -> Optional[str]:
+    """Innermost function of this project in a stack (skips stdlib and the SDK)"""
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if filename.startswith(PROJECT_DIR) and "site-packages" not in filename and filename != THIS_FILE:
+            return getattr(frame.f_code, "co_qualname", frame.f_code.co_name)
+        frame = frame.f_back
+    return None
+
+
+class LoopMonitor:
+    """One per RunBot - run() is started with every session's event loop"""
+
+    def __init__(self, settings: Optional[dict] = None):
+        settings = {**Config.LOOP_MONITOR, **(settings or {})}
+        self.interval = settings["interval"]
+        self.lag_warning = settings["lag_warning"]
+        self.stall_after = settings["stall_after"]
+        self.stack_depth = settings["stack_depth"]
+
+        self.running = False
+        self.loop_thread_id = None
+        self.heartbeat = time.monotonic()
+        self.reported_heartbeat = None
+        self.blocked_in = None  # آخر دالة كانت توقف الحلقة
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.stalls = 0
+        self.watchdog = None
+
+    async def run(self) -> None:
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.running = True
+        if self.watchdog is None or not self.watchdog.is_alive():
+            self.watchdog = threading.Thread(target=self.watch, name="loop-watchdog", daemon=True)
+            self.watchdog.start()
+
+        try:
+            while True:
+                expected = time.monotonic() + self.interval
+                await asyncio.sleep(self.interval)
+                now = time.monotonic()
+                self.heartbeat = now
+                self.record_lag(max(0.0, now - expected))
+        finally:
+            self.running = False
+
+    def record_lag(self, lag: float) -> None:
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        metrics.observe("event_loop_lag_seconds", lag)
+        metrics.set("event_loop_lag_max_seconds", self.max_lag)
+        if lag >= self.lag_warning:
+            culprit = self.blocked_in or "unknown"
+            log.warning("performance", f"🐢 Event loop was blocked for {lag * 1000:.0f}ms (in {culprit})",
+                        lag_ms=round(lag * 1000), handler=culprit)
+        self.blocked_in = None
+
+    def watch(self) -> None:
+        """Watchdog thread - samples the loop thread's stack while it is stuck"""
+        while True:
+            time.sleep(self.stall_after / 2)
+            heartbeat = self.heartbeat
+            if not self.running or heartbeat == self.reported_heartbeat:
+                continue
+            stalled_for = time.monotonic() - heartbeat - self.interval
+            if stalled_for < self.stall_after:
+                continue
+
+            frame = sys._current_frames().get(self.loop_thread_id)
+            if frame is None:
+                continue
+            self.reported_heartbeat = heartbeat
+            self.stalls += 1
+            self.blocked_in = describe_frame(frame) or frame.f_code.co_name
+            stack = "".join(traceback.format_stack(frame)[-self.stack_depth:])
+            metrics.inc("event_loop_stalls_total", handler=self.blocked_in)
+            log.warning("performance", f"🧱 Event loop stuck for {stalled_for:.1f}s in {self.blocked_in}",
+                        handler=self.blocked_in, stalled_for=round(stalled_for, 2), stack=stack)
+
+    def snapshot(self) -> dict:
+        return {
+            "last_lag_ms": round(self.last_lag * 1000, 1),
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "stalls": self.stalls,
+        }
+
+
+def watch_handler(func):
+    """Time an event handler; handlers slower than LOOP_MONITOR["slow_handler_seconds"] are logged"""
+    name = func.__name__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            metrics.observe("bot_handler_seconds", elapsed, handler=name)
+            if elapsed >= Config.LOOP_MONITOR["slow_handler_seconds"]:
+                metrics.inc("bot_slow_handlers_total", handler=name)
+                log.warning("performance", f"🐌 {name} took {elapsed:.2f}s", handler=name,
+                            seconds=round(elapsed, 3))
+
+    return wrapper
@@ -1,21 +1,37 @@
 import sys
 import os
-import shutil
 import time
 import random
 import asyncio
 import json
-from datetime import datetime
+import hashlib
+import multiprocessing
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-from flask import Flask, render_template, request, redirect, url_for, send_file, flash, jsonify
 from threading import Thread
-from werkzeug.utils import secure_filename
 from highrise import *
 from highrise.models import *
 from asyncio import run as arun
 from highrise.__main__ import *
 from config import Config
+from supervisor import ConnectionSupervisor
+from store import SharedStore
+from ipc import IPCServer, IPCClient, ensure_authkey
+from console import ConsoleHighrise, ConsoleJob, ConsoleJobs, console_output
+from logger import log
+from metrics import instrument, label_snapshot, merge_snapshots, metrics
+from loop_monitor import LoopMonitor, watch_handler
+from profiling import Profiler
+from journal import EventRecorder
+from greeter import GreetingBatcher, PresenceCache
+from message_packer import send_packed
+from emote_catalog import CATEGORIES, EmoteCatalog, short_name
+from emote_sync import GroupEmotes
+from sessions import UserSessions
+from tasks import TaskRegistry, user_owner
+import ratelimit
+from word_filter import WordFilter
+from outbound import ANNOUNCEMENT, FLAVOR, MODERATION, PRIORITY_NAMES, Outbox
 import re
 from typing import Dict, List, Optional
 
@@ -61,19 +77,19 @@ class OutfitManager:
             return False
 
         except Exception as e:
-            print(f"خطأ في فحص كود الملابس {item_id}: {e}")
+            log.error("outfit", f"خطأ في فحص كود الملابس {item_id}: {e}")
             return False
 
     def extract_item_id_from_text(self, text: str) -> Optional[str]:
         """استخراج معرف القطعة من النص أو الرابط"""
         try:
-            print(f"🔍 بدء استخراج معرف القطعة من النص: {text}")
+            log.debug("outfit", f"🔍 بدء استخراج معرف القطعة من النص: {text}")
 
             # البحث عن النص بين القوسين أولاً
             bracket_match = re.search(r'\[([^\]]+)\]', text)
             if bracket_match:
                 bracket_content = bracket_match.group(1).strip()
-                print(f"🔍 تم العثور على نص بين القوسين: {bracket_content}")
+                log.debug("outfit", f"🔍 تم العثور على نص بين القوسين: {bracket_content}")
 
                 # فحص إذا كان الرابط يحتوي على معرف القطعة
                 if 'high.rs/item?id=' in bracket_content:
@@ -81,7 +97,7 @@ class OutfitManager:
                     id_match = re.search(r'id=([^&\s]+)', bracket_content)
                     if id_match:
                         item_id = id_match.group(1)
-                        print(f"✅ تم استخراج معرف القطعة من الرابط: {item_id}")
+                        log.info("outfit", f"✅ تم استخراج معرف القطعة من الرابط: {item_id}")
                         return item_id
 
                 # البحث عن أنماط معرفات الملابس في النص
@@ -95,23 +111,23 @@ class OutfitManager:
                     match = re.search(pattern, bracket_content)
                     if match:
                         potential_id = match.group(1)
-                        print(f"🔍 تم العثور على معرف محتمل: {potential_id}")
+                        log.debug("outfit", f"🔍 تم العثور على معرف محتمل: {potential_id}")
                         if self.is_valid_clothing_code(potential_id):
-                            print(f"✅ تم التعرف على معرف قطعة صالح: {potential_id}")
+                            log.info("outfit", f"✅ تم التعرف على معرف قطعة صالح: {potential_id}")
                             return potential_id
 
             # إذا لم نجد نص بين القوسين، ابحث عن رابط في النص كاملاً
             url_match = re.search(r'high\.rs/item\?id=([^&\s]+)', text)
             if url_match:
                 item_id = url_match.group(1)
-                print(f"✅ تم استخراج معرف القطعة من الرابط المباشر: {item_id}")
+                log.info("outfit", f"✅ تم استخراج معرف القطعة من الرابط المباشر: {item_id}")
                 return item_id
 
-            print(f"❌ لم يتم العثور على معرف قطعة صالح في النص")
+            log.debug("outfit", f"❌ لم يتم العثور على معرف قطعة صالح في النص")
             return None
 
         except Exception as e:
-            print(f"❌ خطأ في استخراج معرف القطعة: {e}")
+            log.error("outfit", f"❌ خطأ في استخراج معرف القطعة: {e}")
             return None
 
     def get_item_category(self, item_id: str) -> str:
@@ -156,7 +172,7 @@ class OutfitManager:
             return categories.get(prefix, f'other_{prefix}')
 
         except Exception as e:
-            print(f"خطأ في تصنيف القطعة {item_id}: {e}")
+            log.error("outfit", f"خطأ في تصنيف القطعة {item_id}: {e}")
             return f'unknown_{item_id}'
 
     async def add_outfit_item_command(self, user, message_content: str) -> str:
@@ -178,7 +194,7 @@ class OutfitManager:
             extracted_id = self.extract_item_id_from_text(codes_text)
             if extracted_id:
                 item_code = extracted_id
-                print(f"🎯 تم استخراج وتطبيق معرف القطعة: {extracted_id}")
+                log.info("outfit", f"🎯 تم استخراج وتطبيق معرف القطعة: {extracted_id}")
             else:
                 # استخدام الكود مباشرة
                 item_code = codes_text.strip()
@@ -196,11 +212,11 @@ class OutfitManager:
                         # تصنيف القطع حسب النوع
                         item_type = self.get_item_category(item.id)
                         current_outfit_items[item_type] = item
-                    print(f"🔍 الزي الحالي: {len(current_outfit.outfit)} قطعة")
+                    log.debug("outfit", f"🔍 الزي الحالي: {len(current_outfit.outfit)} قطعة")
                 else:
-                    print("🔍 لا يوجد زي حالي للبوت")
+                    log.debug("outfit", "🔍 لا يوجد زي حالي للبوت")
             except Exception as e:
-                print(f"خطأ في الحصول على الزي الحالي: {e}")
+                log.error("outfit", f"خطأ في الحصول على الزي الحالي: {e}")
 
             # إنشاء القطعة الجديدة
             try:
@@ -218,10 +234,10 @@ class OutfitManager:
                 # إضافة القطعة الجديدة للزي الحالي (استبدال إذا كانت من نفس النوع)
                 current_outfit_items[item_type] = new_item
                 
-                print(f"✅ تم إضافة {item_type}: {item_code}")
+                log.info("outfit", f"✅ تم إضافة {item_type}: {item_code}")
 
             except Exception as e:
-                print(f"❌ فشل في إنشاء العنصر {item_code}: {e}")
+                log.error("outfit", f"❌ فشل في إنشاء العنصر {item_code}: {e}")
                 return f"<#FF6B6B> ❌ Failed to create item: {str(e)}"
 
             # تحويل إلى قائمة
@@ -244,14 +260,14 @@ class OutfitManager:
                             active_palette=-1
                         )
                         outfit_items.append(basic_item)
-                        print(f"✅ تم إضافة {basic_type} الأساسي: {basic_id}")
+                        log.info("outfit", f"✅ تم إضافة {basic_type} الأساسي: {basic_id}")
                     except Exception as e:
-                        print(f"⚠️ فشل في إضافة {basic_type} الأساسي: {e}")
+                        log.warning("outfit", f"⚠️ فشل في إضافة {basic_type} الأساسي: {e}")
 
             # تطبيق الزي المحدث
             try:
                 await self.bot.highrise.set_outfit(outfit=outfit_items)
-                print(f"🎨 تم تطبيق {len(outfit_items)} قطعة ملابس")
+                log.info("outfit", f"🎨 تم تطبيق {len(outfit_items)} قطعة ملابس")
                 
                 # إرسال رسالة في الروم
                 await self.bot.highrise.chat(f"<#9370DB> 👔 New outfit item added to bot!")
@@ -259,51 +275,28 @@ class OutfitManager:
                 return f"✅ Outfit item added successfully!\n👔 {item_type}: {item_code}\n📊 Total items: {len(outfit_items)}"
 
             except Exception as outfit_error:
-                print(f"❌ فشل في تطبيق الزي: {outfit_error}")
+                log.error("outfit", f"❌ فشل في تطبيق الزي: {outfit_error}")
                 return f"<#FF6B6B> ❌ Failed to apply outfit: {str(outfit_error)}"
 
         except Exception as e:
             error_msg = f"<#FF6B6B> ❌ Error processing /on command: {str(e)}"
-            print(error_msg)
+            log.error("outfit", error_msg)
             return error_msg
 
     async def show_current_outfit_numbered(self, user) -> str:
-        """Display current outfit with numbering for /off command - split into safe-sized messages"""
+        """Display current outfit with numbering for /off command - packed into as few whispers as fit"""
         try:
             current_outfit = await self.bot.highrise.get_my_outfit()
             if current_outfit and current_outfit.outfit:
                 items = current_outfit.outfit
-                total_items = len(items)
                 
-                # Send header message
-                header_message = f"<#9370DB> 👔 Current Bot Outfit ({total_items} items):\n"
-                header_message += "═" * 30
-                await self.bot.highrise.send_whisper(user.id, header_message)
-                await asyncio.sleep(1)
-                
-                # Send items in small batches of 3 items max per message
-                batch_size = 3
-                for i in range(0, total_items, batch_size):
-                    batch_message = ""
-                    
-                    for j in range(min(batch_size, total_items - i)):
-                        item = items[i + j]
-                        item_number = i + j + 1
-                        category = self.get_item_category(item.id)
-                        # Keep item ID short to avoid long messages
-                        item_id = item.id[:30] + "..." if len(item.id) > 30 else item.id
-                        batch_message += f"{item_number}. {category}: {item_id}\n"
-                    
-                    # Send the batch message
-                    await self.bot.highrise.send_whisper(user.id, f"<#9370DB>{batch_message.rstrip()}")
-                    
-                    # Small delay between batches
-                    if i + batch_size < total_items:
-                        await asyncio.sleep(1.2)
-                
-                # Send summary message
-                await asyncio.sleep(1)
-                await self.bot.highrise.send_whisper(user.id, f"<#40E0D0> 💡 Use /off [number] to remove item")
+                lines = [f"<#9370DB> 👔 Current Bot Outfit ({len(items)} items):"]
+                for item_number, item in enumerate(items, 1):
+                    category = self.get_item_category(item.id)
+                    item_id = item.id[:30] + "..." if len(item.id) > 30 else item.id
+                    lines.append(f"{item_number}. {category}: {item_id}")
+                lines.append("<#40E0D0> 💡 Use /off [number] to remove item")
+                await send_packed(lambda text: self.bot.highrise.send_whisper(user.id, text), lines)
                 
                 return "<#00FF7F> ✅ Outfit list sent to your private messages!"
                 
@@ -377,7 +370,7 @@ class OutfitManager:
                         )
                         outfit_items.append(basic_item)
                     except Exception as e:
-                        print(f"⚠️ فشل في إضافة {basic_type} الأساسي: {e}")
+                        log.warning("outfit", f"⚠️ فشل في إضافة {basic_type} الأساسي: {e}")
 
             # تطبيق الزي المحدث مع فحص دقيق للأخطاء
             try:
@@ -439,7 +432,7 @@ class OutfitManager:
                 return "❌ Usage: /copy @username\n💡 Example: /copy @john_doe"
 
             target_username = parts[1][1:]  # إزالة @ من بداية الاسم
-            print(f"🔍 محاولة نسخ زي المستخدم: {target_username}")
+            log.debug("outfit", f"🔍 محاولة نسخ زي المستخدم: {target_username}")
 
             # البحث عن المستخدم في الغرفة
             try:
@@ -453,14 +446,14 @@ class OutfitManager:
                             target_user = room_user
                             break
                 else:
-                    print(f"Error: Could not get room users for copy command")
+                    log.error("outfit", f"Error: Could not get room users for copy command")
                     return f"❌ Error getting room users list!"
 
                 if not target_user:
                     return f"❌ User @{target_username} not found in the room!"
 
             except Exception as e:
-                print(f"خطأ في البحث عن المستخدم: {e}")
+                log.error("outfit", f"خطأ في البحث عن المستخدم: {e}")
                 return f"❌ Error finding user @{target_username}!"
 
             # الحصول على زي المستخدم المستهدف
@@ -470,10 +463,10 @@ class OutfitManager:
                 if not target_outfit or not target_outfit.outfit:
                     return f"❌ @{target_username} has no outfit or outfit is empty!"
 
-                print(f"✅ تم الحصول على زي {target_username}: {len(target_outfit.outfit)} قطعة")
+                log.info("outfit", f"✅ تم الحصول على زي {target_username}: {len(target_outfit.outfit)} قطعة")
 
             except Exception as e:
-                print(f"خطأ في الحصول على زي المستخدم: {e}")
+                log.error("outfit", f"خطأ في الحصول على زي المستخدم: {e}")
                 return f"❌ Cannot access @{target_username}'s outfit! Error: {str(e)}"
 
             # تحليل وعرض زي المستخدم
@@ -500,7 +493,7 @@ class OutfitManager:
                     copyable_items.append(test_item)
                 except Exception as e:
                     failed_items.append(item.id)
-                    print(f"❌ فشل في نسخ القطعة {item.id}: {e}")
+                    log.error("outfit", f"❌ فشل في نسخ القطعة {item.id}: {e}")
 
             # عرض القطع المكتشفة بالتدريج - رسالة واحدة فقط للإجمال
             await self.bot.highrise.chat(f"<#00BFFF> 🔍 Discovered {len(target_outfit.outfit)} outfit items")
@@ -531,9 +524,9 @@ class OutfitManager:
                             active_palette=-1
                         )
                         copyable_items.append(basic_item)
-                        print(f"✅ تم إضافة {basic_type} الأساسي: {basic_id}")
+                        log.info("outfit", f"✅ تم إضافة {basic_type} الأساسي: {basic_id}")
                     except Exception as e:
-                        print(f"⚠️ فشل في إضافة {basic_type} الأساسي: {e}")
+                        log.warning("outfit", f"⚠️ فشل في إضافة {basic_type} الأساسي: {e}")
 
             # تطبيق القطع بشكل فردي باستخدام نفس منطق /on
             await self.bot.highrise.chat("<#FFA500> 🔄 Starting individual item testing...")
@@ -556,11 +549,11 @@ class OutfitManager:
                         if result["success"]:
                             successfully_added.append(item)
                             await self.bot.highrise.chat(f"<#32CD32> ✅ Item {i}/{len(copyable_items)}: {item.id}")
-                            print(f"✅ تم إضافة بنجاح: {item.id}")
+                            log.info("outfit", f"✅ تم إضافة بنجاح: {item.id}")
                         else:
                             final_failed_items.append(item.id)
                             await self.bot.highrise.chat(f"<#FF6B6B> ❌ Item {i}/{len(copyable_items)}: Failed - {result['error'][:50]}")
-                            print(f"❌ فشل في إضافة: {item.id} - {result['error']}")
+                            log.error("outfit", f"❌ فشل في إضافة: {item.id} - {result['error']}")
                         
                         await asyncio.sleep(2)  # فترة زمنية أطول بين كل محاولة
                         
@@ -570,7 +563,7 @@ class OutfitManager:
                         await self.bot.highrise.chat(f"<#DC143C> ❌ Item {i} error")
                         await asyncio.sleep(1.5)
                         
-                        print(f"❌ خطأ في إضافة: {item.id} - {str(e)}")
+                        log.error("outfit", f"❌ خطأ في إضافة: {item.id} - {str(e)}")
 
                 # تقرير نهائي منفصل
                 await asyncio.sleep(2)
@@ -591,12 +584,12 @@ class OutfitManager:
 
             # لا نعرض القطع الفاشلة في الشات العام لتجنب الازدحام
 
-            print(f"👔 تم تنفيذ أمر /copy للمطور {user.username} - نسخ من {target_username}")
+            log.info("outfit", f"👔 تم تنفيذ أمر /copy للمطور {user.username} - نسخ من {target_username}", user=user)
             return f"✅ Copy command completed! Check the public chat for details."
 
         except Exception as e:
             error_msg = f"❌ خطأ في معالجة أمر /copy: {str(e)}"
-            print(error_msg)
+            log.error("outfit", error_msg)
             return error_msg
 
     async def remove_outfit_item_by_number(self, user, message_content: str) -> str:
@@ -621,11 +614,11 @@ class OutfitManager:
                 current_outfit = await self.bot.highrise.get_my_outfit()
                 if current_outfit and current_outfit.outfit:
                     current_outfit_items = current_outfit.outfit
-                    print(f"🔍 الزي الحالي يحتوي على {len(current_outfit_items)} قطعة")
+                    log.debug("outfit", f"🔍 الزي الحالي يحتوي على {len(current_outfit_items)} قطعة")
                 else:
                     return "<#FFA500> ⚠️ No current outfit on bot"
             except Exception as e:
-                print(f"خطأ في الحصول على الزي الحالي: {e}")
+                log.error("outfit", f"خطأ في الحصول على الزي الحالي: {e}")
                 return f"<#FF6B6B> ❌ Error getting outfit: {str(e)}"
 
             # التحقق من صحة الرقم
@@ -643,7 +636,7 @@ class OutfitManager:
 
             # إزالة العنصر من الزي
             updated_outfit = [item for i, item in enumerate(current_outfit_items) if i != (item_number - 1)]
-            print(f"🔄 الزي الجديد سيحتوي على {len(updated_outfit)} قطعة")
+            log.info("outfit", f"🔄 الزي الجديد سيحتوي على {len(updated_outfit)} قطعة")
 
             # تطبيق الزي الجديد
             try:
@@ -656,12 +649,12 @@ class OutfitManager:
                 result_message += f"🗑️ Removed item: {item_code}\n"
                 result_message += f"📊 Remaining items: {len(updated_outfit)}"
                 
-                print(f"🗑️ تم حذف القطعة {item_code} من الزي بنجاح للمطور {user.username}")
+                log.info("outfit", f"🗑️ تم حذف القطعة {item_code} من الزي بنجاح للمطور {user.username}", user=user)
                 return result_message
 
             except Exception as outfit_error:
                 error_details = str(outfit_error)
-                print(f"❌ فشل في تطبيق الزي الجديد: {outfit_error}")
+                log.error("outfit", f"❌ فشل في تطبيق الزي الجديد: {outfit_error}")
 
                 if "not owned" in error_details or "not free" in error_details:
                     return f"<#FF6B6B> ❌ Cannot apply new outfit - item ownership issue"
@@ -670,14 +663,19 @@ class OutfitManager:
 
         except Exception as e:
             error_msg = f"<#FF6B6B> ❌ Error processing /off command: {str(e)}"
-            print(error_msg)
+            log.error("outfit", error_msg)
             return error_msg
 
 class Bot(BaseBot):
     def __init__(self):
         super().__init__()
+        self.loop = None  # event loop of the session, used by the web console
+        self._highrise = None  # set by the SDK once the websocket is connected
+        self.tasks = TaskRegistry()  # every background task, by name and owner
         # Moderators data storage
         self.moderators_data_file = "moderators_data.json"
+        self.shared_store = SharedStore(self.moderators_data_file)  # shared between room processes
+        self.roles_checked_at = 0.0
         self.detected_moderators = set()
         self.load_moderators_data()
         
@@ -739,8 +737,14 @@ class Bot(BaseBot):
             "emoji-celebrate", "emoji-cursing", "idle-space", "dance-popularvibe"
         ]
 
-        # Active loops for each user
-        self.active_loops = {}
+        # Name/category index over the numbered list - numbers stay as they are
+        self.emote_catalog = EmoteCatalog(self.emotes_list)
+
+        # Per-user state: emote loop, game, rate-limit buckets, cooldowns
+        self.sessions = UserSessions()
+        self.sessions_task = None
+        self.word_filter = WordFilter(Config.BLOCKED_WORDS)  # ENABLE_WORD_FILTER
+        self.group_emotes = GroupEmotes(self)  # /all and /sync
         self.random_movement_enabled = False
         self.random_movement_task = None
 
@@ -749,61 +753,212 @@ class Bot(BaseBot):
         self.follow_task = None     # Follow task reference
         self.bot_user_id = None     # Bot's own user ID
 
-        # Rock Paper Scissors game state
-        self.active_games = {}
-
+        # Connection supervisor (set by RunBot) - tracks liveness of the session
+        self.supervisor: Optional[ConnectionSupervisor] = None
+
+        # Room state kept up to date from join/leave/move events
+        self.room_users = {}  # user_id -> (User, position)
+
+        # Status snapshot for the web UI: (etag, data). Replaced as a whole, never mutated,
+        # so other threads can read it without locks
+        self.status_snapshot = (None, {})
+        self.status_task = None
+        self.room_id = None   # set by RunBot
+        self.recorder = None  # EventRecorder when Config.RECORD_EVENTS is on
+
+        # Welcome/goodbye announcements, merged per window
+        self.greeter = GreetingBatcher(self)
+        self.presence = PresenceCache(Config.GREETINGS["rejoin_ttl"], Config.GREETINGS["remember_users"])
+
+    @property
+    def highrise(self):
+        """Real connection, or the console stand-in while a web console command runs"""
+        return console_output.get() or self._highrise
+
+    @highrise.setter
+    def highrise(self, value) -> None:
+        # chat and whispers are queued by priority; the timed calls sit underneath the queue
+        if isinstance(self._highrise, Outbox):
+            self._highrise.close()  # the SDK reconnected - the old socket's queue goes nowhere
+        self._highrise = Outbox(instrument(value), self.tasks.spawn) if value is not None else None
+
+    def mark_alive(self) -> None:
+        """Record that an inbound event arrived from the server"""
+        if self.supervisor:
+            self.supervisor.record_event()
+
+    @watch_handler
     async def on_start(self, session_metadata: SessionMetadata) -> None:
-        print("Bot started successfully!")
+        log.info("system", "Bot started successfully!")
+        self.loop = asyncio.get_running_loop()
+        if self.supervisor:
+            self.supervisor.on_session_start()
         self.bot_user_id = session_metadata.user_id
+        self.greeter.cancel()  # greetings buffered by the previous session
+        if self.word_filter.update(Config.BLOCKED_WORDS):
+            log.info("moderation", f"🚫 Word filter rebuilt with {len(self.word_filter)} terms")
         await self.highrise.teleport(
             session_metadata.user_id, Position(8.50, 0.00, 5.00, "FrontRight"))
 
+        # Room state for the status page
+        await self.refresh_room_state()
+        for user_id in self.room_users:
+            self.presence.touch(user_id)  # already here - not greeted if they drop and rejoin
+        if Config.RECORD_EVENTS:
+            if self.recorder:
+                self.recorder.close()
+            self.recorder = EventRecorder.create(self.room_id or "room", session_metadata.user_id,
+                                                 list(self.room_users.values()))
+        # bot_runner calls on_start again after every internal reconnect - loops still running carry on
+        if self.status_task is None or self.status_task.done():
+            self.status_task = self.tasks.spawn(self.status_publisher_loop(), "status_publisher")
+        if self.sessions_task is None or self.sessions_task.done():
+            self.sessions_task = self.tasks.spawn(self.sessions.sweeper_loop(), "session_sweeper")
+
         # Auto-detect moderators on startup
         await self.detect_room_moderators()
 
         # Start random movement if enabled in config
-        if Config.ENABLE_RANDOM_MOVEMENT:
+        if Config.ENABLE_RANDOM_MOVEMENT and (self.random_movement_task is None or self.random_movement_task.done()):
             self.random_movement_enabled = True
-            self.random_movement_task = asyncio.create_task(self.random_movement_loop())
-            print("🚶‍♂️ Random movement started automatically!")
+            self.random_movement_task = self.tasks.spawn(self.random_movement_loop(), "random_movement",
+                                                         owner="feature:movement")
+            log.info("system", "🚶‍♂️ Random movement started automatically!")
 
+    @watch_handler
     async def on_user_join(self, user: User, position: Position | AnchorPosition) -> None:
-        await self.highrise.chat(f"<#00FF00> 🌟 Welcome @{user.username}! 👋")
-        await asyncio.sleep(1)  # توقيت بين الرسائل
-        
-        await self.highrise.chat(f"<#FFD700> 💎 Get VIP membership for only 5 Gold! 💰")
-        await asyncio.sleep(1)
-        
-        await self.highrise.chat(f"<#FF69B4> 🎮 VIP Commands: /game (Rock Paper Scissors), /follow users! ✨")
-        await asyncio.sleep(1)
-        
-        await self.highrise.chat(f"<#87CEEB> 📋 Type /list to see all commands! Tip 5G to become VIP! 💎")
-
-        # Send private message with commands instructions
-        try:
-            print(f"🔄 Attempting to send welcome whisper to {user.username} (ID: {user.id})")
-            await self.highrise.send_whisper(user.id, "<#0099FF> Welcome! Type /list in private chat to see all available commands 📋")
-            print(f"✅ Welcome whisper sent successfully to {user.username}")
-        except Exception as e:
-            print(f"❌ Failed to send welcome whisper to {user.username}: {e}")
-            # Send public message as fallback
-            await self.highrise.chat(f"<#FFFF00> @{user.username} Type /list to see available commands! 📋")
+        self.mark_alive()
+        if self.recorder:
+            self.recorder.record(UserJoinedEvent(user=user, position=position))
+        self.room_users[user.id] = (user, position)
+        log.action(user, f"{user.username} joined the room")
+        if self.presence.seen_recently(user.id):
+            # Flaky connection rejoining - already greeted and checked
+            self.presence.touch(user.id)
+            self.greeter.user_returned(user)
+            metrics.inc("bot_rejoins_suppressed_total")
+            log.debug("presence", f"🔁 {user.username} rejoined, greeting skipped", user=user)
+            return
+        self.presence.touch(user.id)
+        # Welcome, VIP promo and the /list whisper go out with everyone else who joined this window
+        self.greeter.user_joined(user)
 
         # Check if new user is a moderator
         await self.check_user_moderator_status(user)
 
+    @watch_handler
     async def on_user_leave(self, user: User):
-        await self.highrise.chat(f"<#FF6B6B> 👋 Goodbye @{user.username}! See you soon!")
+        self.mark_alive()
+        if self.recorder:
+            self.recorder.record(UserLeftEvent(user=user))
+        self.room_users.pop(user.id, None)
+        log.action(user, f"{user.username} left the room")
+        self.sessions.left(user.id)  # stops their loop and game (AUTO_STOP_EMOTES_ON_LEAVE)
+        if Config.AUTO_STOP_EMOTES_ON_LEAVE:
+            self.tasks.cancel_owner(user_owner(user.id))
+        if self.greeter.user_left(user):
+            self.presence.touch(user.id)
+        else:
+            self.presence.forget(user.id)  # never welcomed - a quick return is greeted as a first join
 
         # Stop following if the target user leaves
         if self.following_user == user.id:
             await self.stop_following_internal()
             await self.highrise.chat(f"<#FF9500> ⏹️ Stopped following @{user.username} (user left room)!")
 
+    @watch_handler
+    async def on_user_move(self, user: User, pos: Position | AnchorPosition) -> None:
+        """Movement events are the most frequent traffic - keep positions and liveness only"""
+        self.mark_alive()
+        if self.recorder:
+            self.recorder.record(UserMovedEvent(user=user, position=pos))
+        self.room_users[user.id] = (user, pos)
+
+    @watch_handler
     async def on_chat(self, user: User, message: str) -> None:
         """Message handler - ready for new commands"""
-        print(f"{user.username}: {message}")
+        self.mark_alive()
+        if self.recorder:
+            self.recorder.record(ChatEvent(user=user, message=message, whisper=False))
+        self.sync_shared_roles()
+        log.chat(user, message)
+        # the filter comes first - a flood over the rate limit is still moderated (its warning has its own cooldown)
+        if await self.blocked_by_word_filter(user, message, "chat"):
+            return
+        if not self.within_rate_limit(user, ratelimit.request_kind(message)):
+            return
+        await self.dispatch_chat_command(user, message)
+
+    def within_rate_limit(self, user: User, kind: str) -> bool:
+        """Per-user token bucket for this kind of request (SPAM_PROTECTION) - the owner is never limited"""
+        if Config.is_owner(user.username) or user.id == self.bot_user_id:
+            return True
+        if ratelimit.allow(self.sessions.get(user), kind):
+            return True
+        log.debug("command", f"🚦 Dropped {kind} from {user.username} (rate limit)", user=user)
+        return False
+
+    async def blocked_by_word_filter(self, user: User, message: str, source: str) -> bool:
+        """True if the message has a BLOCKED_WORDS term - it is ignored and the user warned (once a minute)"""
+        if not Config.ENABLE_WORD_FILTER or user.id == self.bot_user_id:
+            return False
+        term = self.word_filter.check(message)
+        if term is None:
+            return False
+
+        metrics.inc("bot_blocked_messages_total", source=source)
+        log.warning("moderation", f"🚫 Blocked word from {user.username}", user=user, term=term, source=source)
+        session = self.sessions.get(user)
+        now = time.monotonic()
+        if session.cooldowns.get("word_filter", 0) <= now:
+            session.cooldowns["word_filter"] = now + 60
+            try:
+                await self.highrise.send_whisper(user.id, "<#FF6B6B> ⚠️ Please keep the chat respectful - that message was ignored",
+                                                 priority=MODERATION)
+            except Exception as e:
+                log.error("moderation", f"Error sending word filter warning: {e}", user=user)
+        return True
+
+    # أسماء الأوامر المسموح بها كـ label في المقاييس (حتى لا يصنع أي نص عشوائي سلسلة جديدة)
+    METRIC_COMMANDS = {
+        "/stop", "stop", "/توقف", "توقف", "/list", "list", "/قائمة", "قائمة", "/follow", "/تابع",
+        "/unfollow", "/توقف_عن_التابع", "unfollow", "/bring", "/إحضار", "/moderators", "/مشرفين", "/mods",
+        "/detect_mods", "/اكتشاف_مشرفين", "/toggle_movement", "/تحريك_عشوائي", "/game",
+        "rock", "paper", "scissors", "حجر", "ورقة", "مقص", "/on", "/off", "/copy",
+        "/clap", "/heart", "/wink", "/thumbs", "/wave", "/e", "/dance", "/emotes", "/all", "/sync",
+    }
+
+    def command_label(self, message: str) -> Optional[str]:
+        """Bounded metric label for a chat message, None for plain chat"""
+        if message.isdigit():
+            return "emote"
+        parts = message.split()
+        if not parts:
+            return None
+        command = parts[0].lower()
+        if command in self.METRIC_COMMANDS:
+            return command
+        return "other" if command.startswith("/") else None
+
+    async def dispatch_chat_command(self, user: User, message: str) -> None:
+        """Route a chat command to its handler, timing routed commands for /metrics"""
+        command = self.command_label(message) if Config.ENABLE_METRICS else None
+        if command is None:
+            await self.route_chat_command(user, message)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.route_chat_command(user, message)
+        except Exception:
+            metrics.inc("bot_command_errors_total", command=command)
+            raise
+        finally:
+            metrics.observe("bot_command_latency_seconds", time.perf_counter() - started, command=command)
 
+    async def route_chat_command(self, user: User, message: str) -> None:
+        """Route a chat command to its handler - shared by room chat and the web console"""
+        command = (message.lower().split() or [""])[0]
         # Handle numbered emote commands
         if message.isdigit():
             await self.handle_numbered_emote(user, int(message))
@@ -837,6 +992,16 @@ class Bot(BaseBot):
         # Handle Rock Paper Scissors moves
         elif message.lower() in ['rock', 'paper', 'scissors', 'حجر', 'ورقة', 'مقص']:
             await self.handle_rps_move(user, message.lower())
+        # Emotes by name and the paged catalog
+        elif message.lower().startswith("/e "):
+            await self.handle_emote_by_name(user, message[3:])
+        elif message.lower().startswith("/dance "):
+            await self.handle_emote_by_name(user, message[7:], category="dance")
+        elif command == "/emotes":
+            await self.show_emote_catalog(user, message)
+        # Synchronized group emotes
+        elif command in ("/all", "/sync"):
+            await self.handle_group_emote_command(user, message)
         # Handle outfit commands
         elif message.lower().startswith("/on "):
             await self.handle_outfit_add_command(user, message)
@@ -898,7 +1063,7 @@ class Bot(BaseBot):
 
             except Exception as e:
                 await self.highrise.chat("<#FF0000> ❌ Failed to send reaction!")
-                print(f"Reaction error: {e}")
+                log.error("command", f"Reaction error: {e}")
 
     async def handle_numbered_emote(self, user: User, number: int) -> None:
         """Handle numbered emote commands"""
@@ -908,84 +1073,146 @@ class Bot(BaseBot):
 
         emote_name = self.emotes_list[number - 1]
 
-        # Stop any existing loop for this user
-        if user.id in self.active_loops:
-            self.active_loops[user.id] = False
+        # Their own dance replaces any group they were in
+        self.group_emotes.leave(user.id)
 
-        # Start new loop
-        self.active_loops[user.id] = True
+        # Replace any existing loop for this user - the old one is cancelled, never left running
+        session = self.sessions.get(user)
+        session.stop_emote()
+        session.emote_name = emote_name
+        session.emote_task = self.tasks.spawn(self.emote_loop(user, emote_name), f"emote_loop:{user.username}",
+                                              owner=user_owner(user.id))
         await self.highrise.chat(f"<#FF69B4> 💃 @{user.username} is now doing #{number}: {emote_name}! 🕺✨")
 
-        # Create the emote loop
-        asyncio.create_task(self.emote_loop(user, emote_name))
+    async def handle_emote_by_name(self, user: User, query: str, category: Optional[str] = None) -> None:
+        """/e float, /dance tiktok - start the best match as if its number was typed"""
+        query = query.strip()
+        number = self.emote_catalog.find(query, category)
+        if number is None:
+            await self.highrise.chat(f"<#FF6347> 🔎 @{user.username} No emote matches \"{query}\" - try /emotes")
+            return
+        await self.handle_numbered_emote(user, number)
+
+    async def show_emote_catalog(self, user: User, message: str) -> None:
+        """/emotes lists the categories, /emotes dance 2 shows a page of one category"""
+        catalog = self.emote_catalog
+        category, page = None, 1
+        for part in message.lower().split()[1:]:  # /emotes dances 2 and /emotes 2 dance both work
+            if part.isdigit():
+                page = int(part)
+            elif category is None:
+                category = part if part in CATEGORIES else part.removesuffix("s")
+        if category not in CATEGORIES:
+            counts = " - ".join(f"{name} ({len(catalog.categories[name])})" for name in CATEGORIES)
+            await send_packed(self.highrise.chat, [
+                f"<#00BFFF> 🔎 @{user.username} Emote categories: {counts}",
+                "<#87CEEB> Use /emotes <category> <page>, /e <name> or /dance <name>",
+            ])
+            return
+
+        numbers, pages = catalog.page(category, page, Config.EMOTES_PER_PAGE)
+        page = min(max(page, 1), pages)
+        listing = " · ".join(f"{number}.{short_name(catalog.name(number))}" for number in numbers)
+        await send_packed(self.highrise.chat, [
+            f"<#FF69B4> 💃 {category.title()} emotes, page {page}/{pages}:",
+            f"<#FFFFFF>{listing}",
+        ])
+
+    async def handle_group_emote_command(self, user: User, message: str) -> None:
+        """/all <emote> | /all stop | /sync <emote> @a @b - one phase-aligned loop for many users"""
+        parts = message.split()
+        command = parts[0].lower()
+        # Config admins/owner, plus the room's own moderators found by /detect_mods or on join
+        allowed = Config.can_use_command(user.username, command) or (
+            user.username in self.detected_moderators and not Config.is_banned(user.username))
+        if not allowed:
+            await self.highrise.chat(f"<#FF6B6B> ❌ @{user.username} You don't have permission to use this command!")
+            return
+        if len(parts) < 2:
+            await self.highrise.chat(f"<#FFA500> 📝 @{user.username} Usage: /all <emote> - /all stop - /sync <emote> @user1 @user2")
+            return
+        if parts[1].lower() == "stop":
+            stopped = self.group_emotes.stop_all()
+            await self.highrise.chat(f"<#FF4444> ⏹️ @{user.username} stopped {stopped} group emote(s)!")
+            return
+
+        mentions = [part[1:] for part in parts[2:] if part.startswith("@")]
+        query = " ".join(part for part in parts[1:] if not part.startswith("@"))
+        number = self.emote_catalog.find(query)
+        if number is None:
+            await self.highrise.chat(f"<#FF6347> 🔎 @{user.username} No emote matches \"{query}\" - try /emotes")
+            return
+        emote_name = self.emotes_list[number - 1]
+
+        if command == "/all":
+            self.group_emotes.start_everyone(emote_name, user.username)
+            await self.highrise.chat(f"<#FF69B4> 💃 Everyone is now doing #{number}: {emote_name}! Type /stop to sit it out 🕺✨")
+            return
+
+        by_name = {room_user.username.lower(): room_user for room_user, _ in self.room_users.values()}
+        members = [by_name[name.lower()] for name in mentions if name.lower() in by_name]
+        missing = [name for name in mentions if name.lower() not in by_name]
+        if not members:
+            await self.highrise.chat(f"<#FF6B6B> ❌ @{user.username} Mention the users to sync: /sync <emote> @user1 @user2")
+            return
+        self.group_emotes.start_group(emote_name, [member.id for member in members], user.username)
+        lines = [f"<#FF69B4> 💃 {' '.join('@' + member.username for member in members)} now doing #{number}: {emote_name} together! 🕺✨"]
+        if missing:
+            lines.append(f"<#FFA500> Not in the room: {', '.join('@' + name for name in missing)}")
+        await send_packed(self.highrise.chat, lines)
 
     async def emote_loop(self, user: User, emote_name: str) -> None:
-        """Loop an emote continuously for a user"""
+        """Loop an emote continuously for a user - runs until its session cancels it"""
         try:
-            while self.active_loops.get(user.id, False):
+            while True:
                 try:
                     await self.highrise.send_emote(emote_name, user.id)
-                    await asyncio.sleep(3)  # Wait 3 seconds between loops
+                    await asyncio.sleep(Config.EMOTE_LOOP_INTERVAL)
+                except asyncio.CancelledError:
+                    raise
                 except Exception as e:
-                    print(f"Emote error for {user.username}: {e}")
+                    log.error("emote", f"Emote error for {user.username}: {e}", user=user)
                     await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            pass
         except Exception as e:
-            print(f"Loop error for {user.username}: {e}")
+            log.error("emote", f"Loop error for {user.username}: {e}", user=user)
         finally:
-            # Clean up
-            if user.id in self.active_loops:
-                del self.active_loops[user.id]
+            session = self.sessions.peek(user.id)
+            if session is not None and session.emote_task is asyncio.current_task():
+                session.emote_task = None
+                session.emote_name = None
 
     async def stop_user_emote(self, user: User) -> None:
-        """Stop emote loop for a user"""
-        if user.id in self.active_loops:
-            self.active_loops[user.id] = False
+        """Stop emote loop for a user, or take them out of a group emote"""
+        in_group = self.group_emotes.leave(user.id)
+        session = self.sessions.peek(user.id)
+        stopped = session.stop_emote() if session else False
+        if stopped or in_group:
             await self.highrise.chat(f"<#FF4444> ⏹️ @{user.username} stopped their emote!")
         else:
             await self.highrise.chat(f"<#FFA500> 🤷‍♂️ @{user.username} no active emote to stop!")
 
     async def show_emotes_list(self, user: User) -> None:
-        """Show available commands list in separate messages with English, emojis, and colors"""
-        
-        # Welcome message
-        await self.highrise.chat(f"<#00BFFF> 📋 @{user.username} Commands List:")
-        await asyncio.sleep(1)
-        
-        # Dance Commands
-        await self.highrise.chat(f"<#FF69B4> 💃 Dance Commands: Type numbers 1-{len(self.emotes_list)} to dance!")
-        await asyncio.sleep(1)
-        
-        # Reaction Commands
-        await self.highrise.chat("<#9370DB> 💫 Reaction Commands: /clap - /heart - /wink - /thumbs - /wave")
-        await asyncio.sleep(1)
-        
-        # Admin Commands
-        await self.highrise.chat("<#32CD32> 🛡️ Admin Commands: /bring @username - /moderators - /detect_mods")
-        await asyncio.sleep(1)
-        
-        # VIP Commands
-        await self.highrise.chat("<#FFD700> 💎 VIP Commands: /follow @username - /game (Rock Paper Scissors)")
-        await asyncio.sleep(1)
-        
-        # Outfit Commands
-        await self.highrise.chat("<#FF6347> 👔 Outfit Commands (VIP/MOD/ADMIN): /on [code] - /off [number] - /copy @user")
-        await asyncio.sleep(1)
-        
-        # Control Commands
-        await self.highrise.chat("<#FF1493> ⏹️ Control Commands: Type /stop to stop current dance!")
-        await asyncio.sleep(1)
-        
-        # Info Commands
-        await self.highrise.chat("<#87CEEB> 📊 Info Commands: /list - /toggle_movement")
-        await asyncio.sleep(1)
-        
-        # VIP Membership
-        await self.highrise.chat("<#00FF00> 💰 Become VIP: Tip 5 Gold to unlock exclusive features! ✨")
+        """Show available commands list with English, emojis, and colors - packed into as few chats as fit"""
+        await send_packed(self.highrise.chat, [
+            f"<#00BFFF> 📋 @{user.username} Commands List:",
+            f"<#FF69B4> 💃 Dance Commands: Type numbers 1-{len(self.emotes_list)} to dance!",
+            "<#9370DB> 💫 Reaction Commands: /clap - /heart - /wink - /thumbs - /wave",
+            "<#32CD32> 🛡️ Admin Commands: /bring @username - /moderators - /detect_mods",
+            "<#FFD700> 💎 VIP Commands: /follow @username - /game (Rock Paper Scissors)",
+            "<#FF6347> 👔 Outfit Commands (VIP/MOD/ADMIN): /on [code] - /off [number] - /copy @user",
+            "<#FF1493> ⏹️ Control Commands: Type /stop to stop current dance!",
+            "<#FF69B4> 🔎 Emotes by name: /e float - /dance tiktok - /emotes dance 2",
+            "<#32CD32> 👯 Group Emotes (MOD/ADMIN): /all <emote> - /sync <emote> @user1 @user2 - /all stop",
+            "<#87CEEB> 📊 Info Commands: /list - /toggle_movement",
+            "<#00FF00> 💰 Become VIP: Tip 5 Gold to unlock exclusive features! ✨",
+        ])
 
     async def send_private_commands_whisper(self, user: User) -> None:
         """Send commands list via whisper only"""
         try:
-            print(f"ArchiveAction: Sending commands list via whisper to {user.username}")
+            log.info("messaging", f"ArchiveAction: Sending commands list via whisper to {user.username}", user=user)
 
             # Check if user is moderator/admin
             is_moderator = (Config.is_admin(user.username) or 
@@ -1017,7 +1244,7 @@ class Bot(BaseBot):
 • /clap @username (تصفيق لمستخدم)"""
 
             await self.highrise.send_whisper(user.id, user_commands)
-            print(f"✅ User commands sent via whisper to {user.username}")
+            log.info("messaging", f"✅ User commands sent via whisper to {user.username}", user=user)
 
             # Send moderator commands if applicable
             if is_moderator:
@@ -1040,21 +1267,21 @@ class Bot(BaseBot):
 🎖️ لديك صلاحيات مشرف!"""
 
                 await self.highrise.send_whisper(user.id, moderator_commands)
-                print(f"✅ Moderator commands sent via whisper to {user.username}")
+                log.info("messaging", f"✅ Moderator commands sent via whisper to {user.username}", user=user)
 
-            print(f"📋 Commands list sent successfully via whisper to {user.username}")
+            log.info("messaging", f"📋 Commands list sent successfully via whisper to {user.username}", user=user)
 
         except Exception as e:
-            print(f"❌ Error sending whisper commands to {user.username}: {e}")
+            log.error("messaging", f"❌ Error sending whisper commands to {user.username}: {e}", user=user)
             try:
                 await self.highrise.send_whisper(user.id, "<#FF6B6B> ❌ Error sending commands list. Try /list in public chat.")
             except Exception as e2:
-                print(f"❌ Failed to send error message to {user.username}: {e2}")
+                log.error("messaging", f"❌ Failed to send error message to {user.username}: {e2}", user=user)
 
     async def show_private_commands_list(self, user: User) -> None:
         """Show commands list in private messages using send_message with conversation_id"""
         try:
-            print(f"🚀 Attempting to send private commands to {user.username} (ID: {user.id})")
+            log.info("messaging", f"🚀 Attempting to send private commands to {user.username} (ID: {user.id})", user=user)
 
             # Try to get user's conversation ID first
             conversation_id = user.id  # Use user ID as conversation ID
@@ -1093,7 +1320,7 @@ class Bot(BaseBot):
             try:
                 success = await self.send_message_to_conversation(conversation_id, user_commands)
                 if success:
-                    print(f"✅ Successfully sent user commands via send_message to {user.username}")
+                    log.info("messaging", f"✅ Successfully sent user commands via send_message to {user.username}", user=user)
                 else:
                     raise Exception("send_message failed")
 
@@ -1101,13 +1328,13 @@ class Bot(BaseBot):
                 await asyncio.sleep(0.5)
 
             except Exception as e:
-                print(f"❌ send_message failed for {user.username}: {e}")
+                log.error("messaging", f"❌ send_message failed for {user.username}: {e}", user=user)
                 # Fallback to send_whisper
                 try:
                     await self.highrise.send_whisper(user.id, user_commands)
-                    print(f"✅ Fallback: sent user commands via send_whisper to {user.username}")
+                    log.info("messaging", f"✅ Fallback: sent user commands via send_whisper to {user.username}", user=user)
                 except Exception as e2:
-                    print(f"❌ Both send_message and send_whisper failed for {user.username}: {e2}")
+                    log.error("messaging", f"❌ Both send_message and send_whisper failed for {user.username}: {e2}", user=user)
                     raise e2
 
             # Check if user is moderator/admin and send moderator commands
@@ -1135,26 +1362,26 @@ class Bot(BaseBot):
                 try:
                     success = await self.send_message_to_conversation(conversation_id, moderator_commands)
                     if success:
-                        print(f"✅ Successfully sent moderator commands via send_message to {user.username}")
+                        log.info("messaging", f"✅ Successfully sent moderator commands via send_message to {user.username}", user=user)
                     else:
                         # Fallback to send_whisper
                         await self.highrise.send_whisper(user.id, moderator_commands)
-                        print(f"✅ Fallback: sent moderator commands via send_whisper to {user.username}")
+                        log.info("messaging", f"✅ Fallback: sent moderator commands via send_whisper to {user.username}", user=user)
                 except Exception as e:
-                    print(f"❌ Failed to send moderator commands to {user.username}: {e}")
+                    log.error("messaging", f"❌ Failed to send moderator commands to {user.username}: {e}", user=user)
                     # Continue anyway, user commands were sent
 
-            print(f"📋 Private commands list sent successfully to {user.username}")
+            log.info("messaging", f"📋 Private commands list sent successfully to {user.username}", user=user)
 
         except Exception as e:
-            print(f"💥 Critical error sending private commands to {user.username}: {e}")
+            log.error("messaging", f"💥 Critical error sending private commands to {user.username}: {e}", user=user)
 
             # Final fallback: Public chat notification
             try:
                 await self.highrise.chat(f"<#FFA500> ⚠️ @{user.username} Cannot send private messages! Use /list here in public chat.")
-                print(f"✅ Sent public fallback to {user.username}")
+                log.info("messaging", f"✅ Sent public fallback to {user.username}", user=user)
             except Exception as e2:
-                print(f"❌ All communication methods failed for {user.username}: {e2}")
+                log.error("messaging", f"❌ All communication methods failed for {user.username}: {e2}", user=user)
 
     async def handle_follow_command(self, user: User, message: str) -> None:
         """Handle follow command"""
@@ -1162,7 +1389,8 @@ class Bot(BaseBot):
         if not Config.is_vip(user.username) and not Config.is_admin(user.username) and not Config.is_owner(user.username):
             await self.highrise.chat(f"<#FF6B6B> 💎 @{user.username} Follow command is for VIP members only! ✨")
             await asyncio.sleep(1)
-            await self.highrise.chat(f"<#FFD700> 💰 Tip 5 Gold to become VIP and unlock /follow command! 🎮")
+            await self.highrise.chat(f"<#FFD700> 💰 Tip 5 Gold to become VIP and unlock /follow command! 🎮",
+                                     priority=FLAVOR)
             return
 
         parts = message.split()
@@ -1199,7 +1427,8 @@ class Bot(BaseBot):
 
         # Start following the target user
         self.following_user = target_user.id
-        self.follow_task = asyncio.create_task(self.follow_user_loop(target_user))
+        self.follow_task = self.tasks.spawn(self.follow_user_loop(target_user), f"follow:{target_user.username}",
+                                            owner="feature:follow")
 
         await self.highrise.chat(f"<#00FF7F> 🚶‍♂️ Now following @{target_user.username}! Use /unfollow to stop.")
 
@@ -1288,13 +1517,13 @@ class Bot(BaseBot):
 
                 except Exception as e:
                     await self.highrise.chat(f"<#FF0000> ❌ @{user.username} Failed to bring @{target_user.username}!")
-                    print(f"Bring command error: {e}")
+                    log.error("movement", f"Bring command error: {e}")
             else:
                 await self.highrise.chat(f"@{user.username} Could not determine valid position! ❌")
 
         except Exception as e:
             await self.highrise.chat(f"@{user.username} Error executing bring command! ❌")
-            print(f"Bring command error: {e}")
+            log.error("movement", f"Bring command error: {e}")
 
     async def follow_user_loop(self, target_user: User) -> None:
         """Continuously follow a user using walking instead of teleporting"""
@@ -1314,7 +1543,7 @@ class Bot(BaseBot):
                             elif room_user.id == target_user.id:
                                 target_position = position
                     else:
-                        print(f"Follow error: Could not get room users")
+                        log.error("movement", f"Follow error: Could not get room users")
                         continue
 
                     if not target_position:
@@ -1348,23 +1577,23 @@ class Bot(BaseBot):
                                     # Use walk_to instead of teleport for smooth movement
                                     await self.highrise.walk_to(destination)
                                 except Exception as e:
-                                    print(f"Follow walk error: {e}")
+                                    log.error("movement", f"Follow walk error: {e}")
                                     # If walking fails, try teleport as fallback
                                     try:
                                         await self.highrise.teleport(self.bot_user_id, destination)
                                     except Exception as e2:
-                                        print(f"Follow teleport fallback error: {e2}")
+                                        log.error("movement", f"Follow teleport fallback error: {e2}")
 
                     await asyncio.sleep(0.5)  # Check every 2 seconds for smoother movement
 
                 except Exception as e:
-                    print(f"Follow loop error: {e}")
+                    log.error("movement", f"Follow loop error: {e}")
                     await asyncio.sleep(2)
 
         except asyncio.CancelledError:
-            print("Follow task cancelled")
+            log.debug("movement", "Follow task cancelled")
         except Exception as e:
-            print(f"Follow error: {e}")
+            log.error("movement", f"Follow error: {e}")
         finally:
             self.following_user = None
             self.follow_task = None
@@ -1373,30 +1602,47 @@ class Bot(BaseBot):
         """Load moderators data from JSON file"""
         try:
             if os.path.exists(self.moderators_data_file):
-                with open(self.moderators_data_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.detected_moderators = set(data.get('auto_detected', []))
-                    print(f"Loaded {len(self.detected_moderators)} detected moderators from file")
+                self.apply_shared_roles(self.shared_store.load())
+                log.info("system", f"Loaded {len(self.detected_moderators)} detected moderators from file")
             else:
                 self.detected_moderators = set()
                 self.save_moderators_data()
         except Exception as e:
-            print(f"Error loading moderators data: {e}")
+            log.error("system", f"Error loading moderators data: {e}")
             self.detected_moderators = set()
 
+    def apply_shared_roles(self, data: dict) -> None:
+        """Merge roles written by any room process into this process"""
+        self.detected_moderators = set(data.get('auto_detected', []))
+        for vip in data.get('vip_users', []):
+            if vip not in Config.VIP_USERS:
+                Config.VIP_USERS.append(vip)
+
+    def sync_shared_roles(self) -> None:
+        """Pick up roles changed by other rooms - at most one stat call every few seconds"""
+        now = time.time()
+        if now - self.roles_checked_at < 5:
+            return
+        self.roles_checked_at = now
+        try:
+            if self.shared_store.changed():
+                self.apply_shared_roles(self.shared_store.load())
+        except Exception as e:
+            log.error("system", f"Error syncing shared roles: {e}")
+
     def save_moderators_data(self) -> None:
         """Save moderators data to JSON file"""
         try:
-            data = {
-                "moderators": list(Config.ADMIN_USERS),
-                "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "auto_detected": list(self.detected_moderators)
-            }
-            with open(self.moderators_data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-            print(f"Saved moderators data: {len(self.detected_moderators)} detected")
+            def merge(data):
+                # دمج مع ما كتبته الغرف الأخرى بدل الكتابة فوقه
+                data["moderators"] = sorted(set(data.get("moderators", [])) | {u for u in Config.ADMIN_USERS if u})
+                data["auto_detected"] = sorted(set(data.get("auto_detected", [])) | self.detected_moderators)
+                data["vip_users"] = sorted(set(data.get("vip_users", [])) | {u for u in Config.VIP_USERS if u})
+
+            self.apply_shared_roles(self.shared_store.update(merge))
+            log.info("system", f"Saved moderators data: {len(self.detected_moderators)} detected")
         except Exception as e:
-            print(f"Error saving moderators data: {e}")
+            log.error("system", f"Error saving moderators data: {e}")
 
     async def check_user_moderator_status(self, user: User) -> None:
         """Check if a user is a moderator and add them to detected list"""
@@ -1413,11 +1659,11 @@ class Bot(BaseBot):
                     if user.username not in Config.ADMIN_USERS:
                         Config.ADMIN_USERS.append(user.username)
 
-                    print(f"🛡️ Detected new moderator: {user.username}")
-                    await self.highrise.chat(f"<#FFD700> 🛡️ Moderator detected: @{user.username}")
+                    log.info("moderation", f"🛡️ Detected new moderator: {user.username}", user=user)
+                    await self.highrise.chat(f"<#FFD700> 🛡️ Moderator detected: @{user.username}", priority=ANNOUNCEMENT)
 
         except Exception as e:
-            print(f"Error checking moderator status for {user.username}: {e}")
+            log.error("moderation", f"Error checking moderator status for {user.username}: {e}", user=user)
 
     async def detect_room_moderators(self) -> None:
         """Detect all moderators currently in the room"""
@@ -1439,14 +1685,14 @@ class Bot(BaseBot):
                                 Config.ADMIN_USERS.append(room_user.username)
 
                 except Exception as e:
-                    print(f"Error checking privileges for {room_user.username}: {e}")
+                    log.error("moderation", f"Error checking privileges for {room_user.username}: {e}", user=room_user)
 
             if new_moderators:
                 self.save_moderators_data()
-                print(f"🛡️ Detected {len(new_moderators)} new moderators: {', '.join(new_moderators)}")
+                log.info("moderation", f"🛡️ Detected {len(new_moderators)} new moderators: {', '.join(new_moderators)}")
 
         except Exception as e:
-            print(f"Error detecting room moderators: {e}")
+            log.error("moderation", f"Error detecting room moderators: {e}")
 
     async def detect_room_moderators_command(self, user: User) -> None:
         """Command to manually detect moderators"""
@@ -1476,21 +1722,20 @@ class Bot(BaseBot):
                                 Config.ADMIN_USERS.append(room_user.username)
 
                 except Exception as e:
-                    print(f"Error checking privileges for {room_user.username}: {e}")
+                    log.error("moderation", f"Error checking privileges for {room_user.username}: {e}", user=room_user)
 
             if new_moderators:
                 self.save_moderators_data()
-                await self.highrise.chat(f"<#32CD32> ✅ Found {len(new_moderators)} new moderators!")
-                for mod in new_moderators:
-                    await self.highrise.chat(f"<#FFD700> 🛡️ @{mod}")
+                lines = [f"<#32CD32> ✅ Found {len(new_moderators)} new moderators!",
+                         "<#FFD700> 🛡️ " + " ".join(f"@{mod}" for mod in new_moderators)]
             else:
-                await self.highrise.chat(f"<#87CEEB> ✅ Scan complete! No new moderators found.")
-
-            await self.highrise.chat(f"<#40E0D0> 📊 Checked {total_checked} users, Total detected moderators: {len(self.detected_moderators)}")
+                lines = ["<#87CEEB> ✅ Scan complete! No new moderators found."]
+            lines.append(f"<#40E0D0> 📊 Checked {total_checked} users, Total detected moderators: {len(self.detected_moderators)}")
+            await send_packed(self.highrise.chat, lines)
 
         except Exception as e:
             await self.highrise.chat(f"<#FF0000> ❌ @{user.username} Error during scan!")
-            print(f"Error in detect command: {e}")
+            log.error("moderation", f"Error in detect command: {e}")
 
     async def show_moderators_list(self, user: User) -> None:
         """Show list of detected moderators"""
@@ -1513,14 +1758,18 @@ class Bot(BaseBot):
         """Send message to a specific conversation using conversation_id"""
         try:
             await self.highrise.send_message(conversation_id, message)
-            print(f"✅ Message sent to conversation {conversation_id}: {message}")
+            log.info("messaging", f"✅ Message sent to conversation {conversation_id}: {message}")
             return True
         except Exception as e:
-            print(f"❌ Failed to send message to conversation {conversation_id}: {e}")
+            log.error("messaging", f"❌ Failed to send message to conversation {conversation_id}: {e}")
             return False
 
+    @watch_handler
     async def on_tip(self, sender: User, receiver: User, tip: CurrencyItem | Item) -> None:
         """Handle tips - upgrade to VIP for 5 gold"""
+        self.mark_alive()
+        if self.recorder:
+            self.recorder.record(TipReactionEvent(sender=sender, receiver=receiver, item=tip))
         try:
             # Check if tip is to the bot and is 5 gold
             if receiver.id == self.bot_user_id and hasattr(tip, 'amount') and tip.amount == 5:
@@ -1535,17 +1784,21 @@ class Bot(BaseBot):
                     
                     # Save to config file (you might want to implement a save function)
                     await self.save_vip_to_config(sender.username)
+                    # Share with the other rooms
+                    self.save_moderators_data()
                     
                     await self.highrise.chat(f"<#00FF00> 🎉 Congratulations @{sender.username}! You are now a VIP member! 💎")
                     await asyncio.sleep(1)
-                    await self.highrise.chat(f"<#FF69B4> 🎮 VIP perks unlocked: /game & /follow commands! ✨")
+                    await self.highrise.chat(f"<#FF69B4> 🎮 VIP perks unlocked: /game & /follow commands! ✨",
+                                             priority=FLAVOR)
                     await asyncio.sleep(1)
-                    await self.highrise.chat(f"<#87CEEB> 💫 Thank you for supporting the bot! Enjoy your VIP status! 🌟")
+                    await self.highrise.chat(f"<#87CEEB> 💫 Thank you for supporting the bot! Enjoy your VIP status! 🌟",
+                                             priority=FLAVOR)
                     
-                    print(f"💎 New VIP member: {sender.username}")
+                    log.action(sender, f"💎 New VIP member: {sender.username}", amount=tip.amount)
                 
         except Exception as e:
-            print(f"Error handling tip: {e}")
+            log.error("vip", f"Error handling tip: {e}")
 
     async def save_vip_to_config(self, username: str) -> None:
         """Save new VIP user to config file"""
@@ -1570,19 +1823,28 @@ class Bot(BaseBot):
             with open('config.py', 'w', encoding='utf-8') as f:
                 f.write(config_content)
                 
-            print(f"✅ VIP user {username} saved to config file")
+            log.info("vip", f"✅ VIP user {username} saved to config file")
             
         except Exception as e:
-            print(f"❌ Error saving VIP to config: {e}")
+            log.error("vip", f"❌ Error saving VIP to config: {e}")
 
+    @watch_handler
     async def on_whisper(self, user: User, message: str) -> None:
         """Private message handler"""
-        print(f"📩 Whisper received from {user.username}: {message}")
+        self.mark_alive()
+        if self.recorder:
+            self.recorder.record(ChatEvent(user=user, message=message, whisper=True))
+        self.sync_shared_roles()
+        log.chat(user, message, "whisper")
+        if await self.blocked_by_word_filter(user, message, "whisper"):
+            return
+        if not self.within_rate_limit(user, "command"):
+            return
 
         try:
             # Handle list command in private messages
             if message.lower().strip() in ["/list", "list", "/قائمة", "قائمة"]:
-                print(f"🔍 Processing /list command for {user.username}")
+                log.info("messaging", f"🔍 Processing /list command for {user.username}", user=user)
                 await self.send_private_commands_whisper(user)
 
             # Test send_message function
@@ -1625,17 +1887,19 @@ class Bot(BaseBot):
                 await self.highrise.send_whisper(user.id, response)
 
         except Exception as e:
-            print(f"❌ Error in whisper handler for {user.username}: {e}")
+            log.error("messaging", f"❌ Error in whisper handler for {user.username}: {e}", user=user)
             # Try to send error message back to user
             try:
                 await self.highrise.send_whisper(user.id, "❌ Sorry, there was an error processing your message. Try /list in public chat.")
             except:
                 pass
 
+    @watch_handler
     async def on_message(self, user_id: str, conversation_id: str, is_new_conversation: bool) -> None:
         """Handle private messages - main handler for direct messages"""
+        self.mark_alive()
         try:
-            print(f"📨 Private message received from user_id: {user_id}")
+            log.info("messaging", f"📨 Private message received from user_id: {user_id}")
 
             # Get messages from the conversation
             response = await self.highrise.get_messages(conversation_id)
@@ -1644,8 +1908,13 @@ class Bot(BaseBot):
                 # Latest message
                 latest_message = response.messages[0]
                 message_content = latest_message.content.strip()
+                if self.recorder:
+                    # the event itself carries no text - keep it so a replay can rebuild the conversation
+                    self.recorder.record(MessageEvent(user_id=user_id, conversation_id=conversation_id,
+                                                      is_new_conversation=is_new_conversation),
+                                         content=latest_message.content)
 
-                print(f"💬 Message content: {message_content}")
+                log.chat(None, message_content, "message", user_id=user_id)
 
                 # Get user info for better handling
                 try:
@@ -1658,17 +1927,17 @@ class Bot(BaseBot):
                                 user = room_user
                                 break
                     else:
-                        print(f"Error: Could not get room users for message handling")
+                        log.error("messaging", f"Error: Could not get room users for message handling")
                         await self.highrise.send_message(conversation_id, "❌ خطأ في الحصول على قائمة المستخدمين.")
                         return
 
                     if not user:
-                        print(f"❌ User with ID {user_id} not found in room")
+                        log.error("messaging", f"❌ User with ID {user_id} not found in room")
                         await self.highrise.send_message(conversation_id, "❌ مشكلة في التعرف على هويتك. تأكد من وجودك في الغرفة.")
                         return
 
                 except Exception as e:
-                    print(f"❌ Error getting user info: {e}")
+                    log.error("messaging", f"❌ Error getting user info: {e}")
                     await self.highrise.send_message(conversation_id, "❌ حدث خطأ في النظام.")
                     return
 
@@ -1677,10 +1946,10 @@ class Bot(BaseBot):
 
                 if reply:
                     await self.highrise.send_message(conversation_id, reply)
-                    print(f"✅ Reply sent to {user.username}: {reply[:50]}...")
+                    log.info("messaging", f"✅ Reply sent to {user.username}: {reply[:50]}...", user=user)
 
         except Exception as e:
-            print(f"❌ Error in private message handler: {e}")
+            log.error("messaging", f"❌ Error in private message handler: {e}")
             try:
                 await self.highrise.send_message(conversation_id, "❌ عذراً، حدث خطأ في معالجة رسالتك. جرب مرة أخرى.")
             except:
@@ -1870,6 +2139,91 @@ class Bot(BaseBot):
         user_privileges = await self.highrise.get_room_privilege(user.id)
         return user_privileges.moderator or user.username in ["VECTOR000"]
 
+    def resolve_console_user(self, username: Optional[str]) -> User:
+        """User the console acts as - the owner by default, or a named admin/moderator"""
+        username = username or Config.BOT_OWNER
+        if not username:
+            raise PermissionError("Set BOT_OWNER in config.py to use the web console")
+        if not (Config.is_owner(username) or Config.is_admin(username) or username in self.detected_moderators):
+            raise PermissionError(f"@{username} is not an owner, admin or moderator")
+
+        # Use the real user when present so position-based commands (/bring) work
+        for room_user, _ in self.room_users.values():
+            if room_user.username.lower() == username.lower():
+                return room_user
+        return User(id=self.bot_user_id, username=username)
+
+    async def run_console_command(self, job: ConsoleJob, message: str, username: Optional[str] = None) -> None:
+        """Run a chat command from the web console; replies go to the job, not the room"""
+        console_output.set(ConsoleHighrise(self._highrise, job))
+        try:
+            user = self.resolve_console_user(username)
+            job.username = user.username
+            log.action(user, f"🖥️ Console command from web as {user.username}: {message}", source="console")
+            await self.dispatch_chat_command(user, message)
+            if not job.lines:
+                job.write("✅ Done (no output)", "console")
+        except Exception as e:
+            job.error = str(e)
+        finally:
+            job.done = True
+
+    async def refresh_room_state(self) -> None:
+        """Load the full user list once - events keep it current afterwards"""
+        try:
+            response = await self.highrise.get_room_users()
+            if hasattr(response, 'content') and response.content:
+                self.room_users = {room_user.id: (room_user, position) for room_user, position in response.content}
+        except Exception as e:
+            log.error("system", f"Error loading room state: {e}")
+
+    def build_status(self) -> dict:
+        """Collect the live state shown on the dashboard"""
+        users = []
+        for room_user, position in self.room_users.values():
+            entry = {"id": room_user.id, "username": room_user.username}
+            if isinstance(position, Position):
+                entry.update(x=round(position.x, 1), y=round(position.y, 1), z=round(position.z, 1))
+            users.append(entry)
+
+        following = None
+        if self.following_user:
+            target = self.room_users.get(self.following_user)
+            following = {"user_id": self.following_user, "username": target[0].username if target else None}
+
+        return {
+            "bot_user_id": self.bot_user_id,
+            "user_count": len(users),
+            "users": sorted(users, key=lambda u: u["username"].lower()),
+            "emote_loops": [{"user_id": session.user_id, "username": session.username, "emote": session.emote_name}
+                            for session in self.sessions.emote_loops()],
+            "emote_groups": self.group_emotes.snapshot(),
+            "following": following,
+            "random_movement": self.random_movement_enabled,
+            "active_games": self.sessions.games(),
+            "user_sessions": len(self.sessions),
+            "detected_moderators": len(self.detected_moderators),
+            "pending_tasks": len(asyncio.all_tasks()),
+            "background_tasks": self.tasks.snapshot(),
+            "outbox": self._highrise.snapshot() if isinstance(self._highrise, Outbox) else None,
+        }
+
+    def publish_status(self) -> None:
+        """Swap in a new snapshot only when something changed, so the etag stays stable"""
+        data = self.build_status()
+        etag = hashlib.md5(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+        if etag != self.status_snapshot[0]:
+            self.status_snapshot = (etag, data)
+
+    async def status_publisher_loop(self) -> None:
+        """Publish the status snapshot periodically - web requests never wait on the bot"""
+        while True:
+            try:
+                self.publish_status()
+            except Exception as e:
+                log.error("system", f"Error publishing status: {e}")
+            await asyncio.sleep(Config.STATUS_PUBLISH_INTERVAL)
+
     async def run(self, room_id, token) -> None:
         await __main__.main(self, room_id, token)
 
@@ -1879,18 +2233,20 @@ class Bot(BaseBot):
         if not Config.is_vip(user.username) and not Config.is_admin(user.username) and not Config.is_owner(user.username):
             await self.highrise.chat(f"<#FF6B6B> 💎 @{user.username} This game is for VIP members only! ✨")
             await asyncio.sleep(1)
-            await self.highrise.chat(f"<#FFD700> 💰 Tip 5 Gold to become VIP and unlock exclusive features! 🎮")
+            await self.highrise.chat(f"<#FFD700> 💰 Tip 5 Gold to become VIP and unlock exclusive features! 🎮",
+                                     priority=FLAVOR)
             return
 
         # Check if user already has an active game
-        if user.id in self.active_games:
+        session = self.sessions.get(user)
+        if session.game:
             await self.highrise.chat(f"<#FFA500> 🎮 @{user.username} You already have an active game! Make your move: rock, paper, or scissors!")
             return
 
-        # Start new game
-        self.active_games[user.id] = {
+        # Start new game - the session sweeper ends it after USER_SESSIONS["game_timeout"]
+        session.game = {
             'username': user.username,
-            'started_at': time.time()
+            'started_at': time.monotonic()
         }
 
         await self.highrise.chat(f"<#00FF7F> 🎮 @{user.username} Rock Paper Scissors game started! 💎")
@@ -1899,7 +2255,8 @@ class Bot(BaseBot):
     async def handle_rps_move(self, user: User, move: str) -> None:
         """Handle Rock Paper Scissors move"""
         # Check if user has an active game
-        if user.id not in self.active_games:
+        session = self.sessions.peek(user.id)
+        if session is None or not session.game:
             # Only respond if user is VIP
             if Config.is_vip(user.username) or Config.is_admin(user.username) or Config.is_owner(user.username):
                 await self.highrise.chat(f"<#FFB6C1> 🎮 @{user.username} Start a game first with /game! 💎")
@@ -1919,6 +2276,9 @@ class Bot(BaseBot):
         if move not in ['rock', 'paper', 'scissors']:
             return
 
+        # End the game now so a second move can't be played against it
+        session.game = None
+
         # Bot makes random choice
         import random
         bot_moves = ['rock', 'paper', 'scissors']
@@ -1950,9 +2310,6 @@ class Bot(BaseBot):
         else:
             await self.highrise.chat(f"<#FFD700> 🤝 It's a TIE! Great minds think alike @{user.username}! ⚡")
 
-        # End the game
-        del self.active_games[user.id]
-
         # Suggest another game
         await asyncio.sleep(1)
         await self.highrise.chat(f"<#00BFFF> 💎 Want to play again @{user.username}? Type /game! 🎮")
@@ -1984,7 +2341,8 @@ class Bot(BaseBot):
         if self.random_movement_enabled:
             await self.highrise.chat(f"<#32CD32> 🚶‍♂️ Random movement enabled! I will now move randomly every minute.")
             if self.random_movement_task is None or self.random_movement_task.done():
-                self.random_movement_task = asyncio.create_task(self.random_movement_loop())
+                self.random_movement_task = self.tasks.spawn(self.random_movement_loop(), "random_movement",
+                                                             owner="feature:movement")
         else:
             await self.highrise.chat(f"<#FF8C00> 🚶‍♂️ Random movement disabled.")
             if self.random_movement_task and not self.random_movement_task.done():
@@ -2056,16 +2414,16 @@ class Bot(BaseBot):
                         ]
 
                         random_message = random.choice(funny_messages)
-                        await self.highrise.chat(random_message)
+                        await self.highrise.chat(random_message, priority=FLAVOR)
 
                 # Wait for specified interval before moving again
                 await asyncio.sleep(Config.RANDOM_MOVEMENT_INTERVAL)
 
             except asyncio.CancelledError:
-                print("Random movement task cancelled.")
+                log.info("movement", "Random movement task cancelled.")
                 break
             except Exception as e:
-                print(f"Error in random movement loop: {e}")
+                log.error("movement", f"Error in random movement loop: {e}")
                 await asyncio.sleep(5) # Wait before retrying
 
     async def handle_outfit_add_command(self, user: User, message: str) -> None:
@@ -2083,10 +2441,10 @@ class Bot(BaseBot):
         try:
             result = await self.outfit_manager.add_outfit_item_command(user, message)
             await self.highrise.send_whisper(user.id, result)
-            print(f"👔 /on command executed by {user.username}")
+            log.action(user, f"👔 /on command executed by {user.username}", command="/on")
         except Exception as e:
             await self.highrise.chat(f"<#FF0000> ❌ Error in outfit command!")
-            print(f"Error in /on command: {e}")
+            log.error("outfit", f"Error in /on command: {e}", user=user)
 
     async def handle_outfit_remove_command(self, user: User, message: str) -> None:
         """Handle /off command to remove outfit item"""
@@ -2103,10 +2461,10 @@ class Bot(BaseBot):
         try:
             result = await self.outfit_manager.remove_outfit_item_by_number(user, message)
             await self.highrise.send_whisper(user.id, result)
-            print(f"👔 /off command executed by {user.username}")
+            log.action(user, f"👔 /off command executed by {user.username}", command="/off")
         except Exception as e:
             await self.highrise.chat(f"<#FF0000> ❌ Error in outfit command!")
-            print(f"Error in /off command: {e}")
+            log.error("outfit", f"Error in /off command: {e}", user=user)
 
     async def handle_copy_outfit_command(self, user: User, message: str) -> None:
         """Handle /copy command to copy another user's outfit"""
@@ -2123,10 +2481,10 @@ class Bot(BaseBot):
         try:
             result = await self.outfit_manager.copy_user_outfit_command(user, message)
             await self.highrise.send_whisper(user.id, result)
-            print(f"👔 /copy command executed by {user.username}")
+            log.action(user, f"👔 /copy command executed by {user.username}", command="/copy")
         except Exception as e:
             await self.highrise.chat(f"<#FF0000> ❌ Error in copy outfit command!")
-            print(f"Error in /copy command: {e}")
+            log.error("outfit", f"Error in /copy command: {e}", user=user)
 
     async def run(self, room_id, token) -> None:
         await __main__.main(self, room_id, token)
@@ -2146,255 +2504,450 @@ class FileWatcher(FileSystemEventHandler):
             # Prevent rapid restarts
             current_time = time.time()
             if current_time - self.last_restart > 2:  # 2 seconds cooldown
-                print(f"File {event.src_path} modified. Restarting bot...")
+                log.info("system", f"File {event.src_path} modified. Restarting bot...")
                 self.last_restart = current_time
                 self.restart_callback()
 
-class WebServer():
-    def __init__(self):
-        self.app = Flask(__name__)
-        self.app.secret_key = 'your-secret-key-here'
-        self.app.config['MAX_CONTENT_LENGTH'] = Config.MAX_FILE_SIZE
-
-        # Create upload folder if it doesn't exist
-        os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
-
-        self.setup_routes()
-
-    def setup_routes(self):
-        @self.app.route('/')
-        def index():
-            # Get list of Python files in current directory
-            files = [f for f in os.listdir('.') if f.endswith(('.py', '.json', '.txt', '.md'))]
-
-            message = request.args.get('message')
-            success = request.args.get('success') == 'true'
-
-            return render_template('index.html', files=files, message=message, success=success)
-
-        @self.app.route('/upload', methods=['POST'])
-        def upload_file():
-            if 'file' not in request.files:
-                return redirect(url_for('index', message='No file selected', success='false'))
-
-            file = request.files['file']
-            if file.filename == '':
-                return redirect(url_for('index', message='No file selected', success='false'))
-
-            if file and self.allowed_file(file.filename):
-                filename = secure_filename(file.filename)
-
-                # Create backup if file exists
-                if os.path.exists(filename):
-                    backup_name = f"{filename}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                    shutil.copy2(filename, backup_name)
-
-                file.save(filename)
-                return redirect(url_for('index', message=f'File {filename} uploaded successfully!', success='true'))
-
-            return redirect(url_for('index', message='Invalid file type', success='false'))
-
-        @self.app.route('/edit/<filename>')
-        def edit_file(filename):
-            if not self.safe_filename(filename):
-                return redirect(url_for('index', message='Invalid filename', success='false'))
-
-            try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                message = request.args.get('message')
-                success = request.args.get('success') == 'true'
-
-                return render_template('edit.html', filename=filename, content=content, 
-                                     message=message, success=success)
-            except Exception as e:
-                return redirect(url_for('index', message=f'Error reading file: {str(e)}', success='false'))
-
-        @self.app.route('/edit/<filename>', methods=['POST'])
-        def save_file(filename):
-            if not self.safe_filename(filename):
-                return redirect(url_for('index', message='Invalid filename', success='false'))
-
-            content = request.form['content']
-
-            try:
-                # Create backup
-                if os.path.exists(filename):
-                    backup_name = f"{filename}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                    shutil.copy2(filename, backup_name)
+class RunBot():
+    room_id = Config.ROOM_ID
+    bot_token = Config.BOT_TOKEN
+    bot_file = Config.BOT_FILE
+    bot_class = Config.BOT_CLASS
 
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(content)
+    def __init__(self, rooms: Optional[list] = None, watch_files: bool = True) -> None:
+        self.rooms = rooms or [(self.room_id, self.bot_token)]
+        self.should_restart = False
+        self.observer = None
+        self.supervisor = ConnectionSupervisor()
+        self.loop_monitor = LoopMonitor()
+        self.console_jobs = ConsoleJobs()
+        self.profiler = Profiler()
+        self.definitions = self.build_definitions()
+        if watch_files:
+            self.setup_file_watcher()
+
+    def build_definitions(self) -> list:
+        """Create fresh bot instances attached to the connection supervisor"""
+        definitions = []
+        for room_id, token in self.rooms:
+            bot = getattr(import_module(self.bot_file), self.bot_class)()
+            bot.supervisor = self.supervisor
+            bot.room_id = room_id
+            definitions.append(BotDefinition(bot, room_id, token))
+        return definitions
+
+    def snapshot(self) -> dict:
+        return {**self.supervisor.snapshot(), "loop": self.loop_monitor.snapshot(),
+                "rooms": [room_id for room_id, _ in self.rooms]}
+
+    def status(self, etag: Optional[str] = None) -> dict:
+        """Live state of every bot in this process, read from their published snapshots"""
+        connection = self.supervisor.snapshot()
+        # الحقول المتغيرة كل ثانية (مثل uptime) لا تدخل في الـ etag
+        connection_key = [connection[key] for key in
+                          ("connected", "attempts", "reconnect_count", "breaker_state", "last_error")]
+        rooms = []
+        for definition in self.definitions:
+            bot_etag, data = definition.bot.status_snapshot
+            rooms.append((definition.room_id, bot_etag, data))
+
+        combined = hashlib.md5(json.dumps([connection_key, [(room_id, bot_etag) for room_id, bot_etag, _ in rooms]],
+                                          default=str).encode()).hexdigest()
+        if etag == combined:
+            return {"etag": combined, "unchanged": True}
+        return {
+            "etag": combined,
+            "connection": connection,
+            "rooms": [{"room_id": room_id, **data} for room_id, _, data in rooms],
+        }
 
-                return redirect(url_for('edit_file', filename=filename, 
-                                      message='File saved successfully!', success='true'))
-            except Exception as e:
-                return redirect(url_for('edit_file', filename=filename, 
-                                      message=f'Error saving file: {str(e)}', success='false'))
+    def setup_file_watcher(self):
+        """Setup file watcher for auto-reload"""
+        try:
+            event_handler = FileWatcher(self.request_restart)
+            self.observer = Observer()
+            self.observer.schedule(event_handler, '.', recursive=False)
+            self.observer.start()
+            log.info("system", "📁 File watcher started - Auto-reload enabled!")
+        except Exception as e:
+            log.error("system", f"Could not start file watcher: {e}")
 
-        @self.app.route('/download/<filename>')
-        def download_file(filename):
-            if not self.safe_filename(filename):
-                return redirect(url_for('index', message='Invalid filename', success='false'))
+    def request_restart(self):
+        """Request a bot restart"""
+        self.should_restart = True
 
+    async def probe_session(self) -> bool:
+        """Health check for a quiet session - a cheap request must answer in time"""
+        for definition in self.definitions:
+            highrise = getattr(definition.bot, "highrise", None)
+            if highrise is None:
+                return False
             try:
-                return send_file(filename, as_attachment=True)
+                response = await asyncio.wait_for(highrise.get_room_users(), timeout=self.supervisor.probe_timeout)
+                if isinstance(response, Error):
+                    return False
             except Exception as e:
-                return redirect(url_for('index', message=f'Error downloading file: {str(e)}', success='false'))
+                log.error("connection", f"Session health check failed: {e}")
+                return False
+        self.supervisor.record_event()
+        return True
 
-        @self.app.route('/delete/<filename>')
-        def delete_file(filename):
-            if not self.safe_filename(filename) or filename in ['main.py', 'config.py']:
-                return redirect(url_for('index', message='Cannot delete core files', success='false'))
+    async def run_with_restart_check(self) -> Optional[BaseException]:
+        """Run one session; return the error that ended it (None for planned restarts)"""
+        main_task = asyncio.create_task(main(self.definitions))
+        monitor_task = asyncio.create_task(self.loop_monitor.run())
+        error = None
 
-            try:
-                # Create backup before deletion
-                backup_name = f"deleted_{filename}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                shutil.copy2(filename, backup_name)
-                os.remove(filename)
+        try:
+            while not self.should_restart:
+                try:
+                    await asyncio.wait_for(asyncio.shield(main_task), timeout=1.0)
+                    error = ConnectionError("session ended")
+                    break  # Bot finished - the SDK only returns when the connection is gone
+                except asyncio.TimeoutError:
+                    if main_task.done():
+                        error = main_task.exception() or ConnectionError("session ended")
+                        break
+                except Exception as e:
+                    error = e
+                    break
+
+                self.supervisor.refresh()
+                if self.supervisor.is_stale() and not await self.probe_session():
+                    error = TimeoutError(
+                        f"no inbound events for {self.supervisor.seconds_since_last_event():.0f}s")
+                    break
+        finally:
+            monitor_task.cancel()
+            # Loops, follow, greetings... belong to this session - nothing survives a restart
+            for definition in self.definitions:
+                try:
+                    cancelled = await definition.bot.tasks.shutdown()
+                    if cancelled:
+                        log.info("system", f"⏹️ Cancelled {cancelled} background tasks", room=definition.room_id)
+                except Exception as e:
+                    log.error("system", f"Error cancelling background tasks: {e}")
+            if not main_task.done():
+                main_task.cancel()
+                await asyncio.gather(main_task, return_exceptions=True)
+
+        return None if self.should_restart else error
+
+    def find_bot(self, room_id: Optional[str] = None):
+        for definition in self.definitions:
+            if not room_id or definition.room_id == room_id:
+                return definition.bot
+        raise ValueError(f"Unknown room: {room_id}")
+
+    def console_submit(self, command: str, room_id: Optional[str] = None, as_user: Optional[str] = None) -> str:
+        """Called on an IPC thread - hands the command to the bot loop and returns at once"""
+        command = (command or "").strip()
+        if not command:
+            raise ValueError("Empty command")
+        bot = self.find_bot(room_id)
+        if bot.loop is None or bot.loop.is_closed():
+            raise RuntimeError("Bot is not connected yet")
+
+        job = self.console_jobs.add(ConsoleJob(command))
+        asyncio.run_coroutine_threadsafe(bot.run_console_command(job, command, as_user), bot.loop)
+        return job.id
+
+    def console_poll(self, job_id: str, since: int = 0) -> dict:
+        return self.console_jobs.read(job_id, since)
+
+    def profile_start(self, kind: str = "sample", seconds: float = 30, worker: Optional[int] = None) -> dict:
+        if worker not in (None, 0):
+            raise ValueError(f"Unknown worker: {worker} (this process runs every room as worker 0)")
+        loop = self.definitions[0].bot.loop if self.definitions else None
+        return self.profiler.start(kind, seconds, loop, self.loop_monitor.loop_thread_id)
+
+    def profile_runs(self) -> list:
+        return self.profiler.list_runs()
+
+    def logs(self, **filters) -> list:
+        return log.query(**filters)
+
+    def clear_logs(self) -> int:
+        return log.clear()
+
+    def metrics(self) -> dict:
+        """Metrics snapshot of this process, with connection and room gauges refreshed"""
+        connection = self.supervisor.snapshot()
+        metrics.set("bot_connected", int(connection["connected"]))
+        metrics.set("bot_reconnects", connection["reconnect_count"])
+        metrics.set("bot_breaker_open", int(connection["breaker_state"] != "closed"))
+        for definition in self.definitions:
+            bot = definition.bot
+            metrics.set("bot_room_users", len(bot.room_users), room=definition.room_id)
+            metrics.set("bot_emote_loops", sum(1 for _ in bot.sessions.emote_loops()), room=definition.room_id)
+            metrics.set("bot_user_sessions", len(bot.sessions), room=definition.room_id)
+            for owner, count in bot.tasks.snapshot(limit=0)["by_owner"].items():
+                metrics.set("bot_background_tasks", count, room=definition.room_id, owner=owner)
+            if isinstance(bot._highrise, Outbox):
+                depth = bot._highrise.depth()
+                for priority in PRIORITY_NAMES:
+                    metrics.set("bot_outbox_depth", depth.get(priority, 0), room=definition.room_id, priority=priority)
+        return metrics.snapshot()
 
-                return redirect(url_for('index', message=f'File {filename} deleted successfully!', success='true'))
-            except Exception as e:
-                return redirect(url_for('index', message=f'Error deleting file: {str(e)}', success='false'))
+    def run_loop(self) -> None:
+        while True:
+            if not self.supervisor.breaker.allow():
+                wait = self.supervisor.breaker.remaining()
+                log.warning("connection", f"⛔ Circuit breaker open - next attempt in {wait:.0f}s")
+                time.sleep(wait)
+                continue
 
-        @self.app.route('/restart')
-        def restart_bot():
-            # This will trigger the file watcher to restart the bot
-            with open('main.py', 'a') as f:
-                f.write('\n# Restart trigger\n')
-            return redirect(url_for('index', message='Bot restart triggered!', success='true'))
+            self.should_restart = False
+            log.info("connection", "🤖 Starting bot...")
 
-        @self.app.route('/backup')
-        def create_backup():
             try:
-                backup_dir = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
-                os.makedirs(backup_dir, exist_ok=True)
-
-                # Backup important files
-                important_files = ['main.py', 'config.py']
-                for filename in important_files:
-                    if os.path.exists(filename):
-                        shutil.copy2(filename, os.path.join(backup_dir, filename))
-
-                return redirect(url_for('index', message=f'Backup created: {backup_dir}', success='true'))
+                error = asyncio.run(self.run_with_restart_check())
             except Exception as e:
-                return redirect(url_for('index', message=f'Backup failed: {str(e)}', success='false'))
-
-        @self.app.route('/config')
-        def edit_config():
-            return redirect(url_for('edit_file', filename='config.py'))
-
-        @self.app.route('/logs')
-        def view_logs():
-            return jsonify({"message": "Logs feature coming soon!"})
-
-        @self.app.route('/clear-logs')
-        def clear_logs():
-            return redirect(url_for('index', message='Logs cleared!', success='true'))
-
-    def allowed_file(self, filename):
-        return '.' in filename and \
-               filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
-
-    def safe_filename(self, filename):
-        # Prevent directory traversal attacks
-        return filename and not '..' in filename and not filename.startswith('/')
-
-    def run(self) -> None:
-        self.app.run(host=Config.WEB_HOST, port=Config.WEB_PORT, debug=False)
+                error = e
 
-    def keep_alive(self):
-        t = Thread(target=self.run)
-        t.start()
-
-class RunBot():
-    room_id = Config.ROOM_ID
-    bot_token = Config.BOT_TOKEN
-    bot_file = Config.BOT_FILE
-    bot_class = Config.BOT_CLASS
+            if error is None:
+                log.info("connection", "🔄 Restarting bot due to file changes...")
+                self.supervisor.on_restart()
+                try:
+                    # Recreate bot instance
+                    import importlib
+                    importlib.reload(sys.modules[__name__])
+                except Exception as e:
+                    log.error("connection", f"Reload error: {e}")
+                self.definitions = self.build_definitions()
+                continue
 
-    def __init__(self) -> None:
+            delay = self.supervisor.on_failure(error)
+            log.warning("connection", f"⚠️ Bot disconnected ({error}) - reconnect #{self.supervisor.reconnect_count} "
+                        f"in {delay:.1f}s [breaker: {self.supervisor.breaker.state}]",
+                        error=str(error), delay=round(delay, 2), breaker=self.supervisor.breaker.state)
+            time.sleep(delay)
+
+def run_room_worker(index: int, rooms: list, ipc_port: int) -> None:
+    """Entry point of a room worker process"""
+    log.add_file(f"worker-{index}")
+    runner = RunBot(rooms, watch_files=False)
+    start_control_channel(runner, ipc_port)
+    runner.run_loop()
+
+
+class MultiRoomSupervisor():
+    """Runs rooms spread over worker processes and restarts any worker that dies"""
+
+    def __init__(self, rooms: list) -> None:
+        self.rooms = rooms
+        processes = max(1, min(Config.MULTI_ROOM_PROCESSES or len(rooms), len(rooms)))
+        # توزيع الغرف على العمليات بالتناوب
+        self.groups = [rooms[i::processes] for i in range(processes)]
+        self.context = multiprocessing.get_context("spawn")
+        self.workers = {}
+        self.restart_policies = {i: ConnectionSupervisor() for i in range(processes)}
+        self.restart_at = {}
         self.should_restart = False
         self.observer = None
-        self.definitions = [
-            BotDefinition(
-                getattr(import_module(self.bot_file), self.bot_class)(),
-                self.room_id, self.bot_token)
-        ]
         self.setup_file_watcher()
 
     def setup_file_watcher(self):
-        """Setup file watcher for auto-reload"""
+        """One watcher for all rooms - workers are restarted together"""
         try:
-            event_handler = FileWatcher(self.request_restart)
             self.observer = Observer()
-            self.observer.schedule(event_handler, '.', recursive=False)
+            self.observer.schedule(FileWatcher(self.request_restart), '.', recursive=False)
             self.observer.start()
-            print("📁 File watcher started - Auto-reload enabled!")
+            log.info("system", "📁 File watcher started - Auto-reload enabled for all rooms!")
         except Exception as e:
-            print(f"Could not start file watcher: {e}")
+            log.error("system", f"Could not start file watcher: {e}")
 
     def request_restart(self):
-        """Request a bot restart"""
         self.should_restart = True
 
-    def run_loop(self) -> None:
-        while True:
+    def worker_port(self, index: int) -> int:
+        return Config.IPC_PORT + 1 + index
+
+    def start_worker(self, index: int) -> None:
+        process = self.context.Process(target=run_room_worker, args=(index, self.groups[index], self.worker_port(index)),
+                                       name=f"room-worker-{index}", daemon=True)
+        process.start()
+        self.workers[index] = process
+        self.restart_at.pop(index, None)
+        self.restart_policies[index].on_session_start()
+        log.info("connection", f"🏠 Worker {index} started (pid {process.pid}) for {len(self.groups[index])} room(s)")
+
+    def stop_worker(self, index: int) -> None:
+        process = self.workers.pop(index, None)
+        if process and process.is_alive():
+            process.terminate()
+            process.join(timeout=10)
+            if process.is_alive():
+                process.kill()
+
+    def snapshot(self) -> dict:
+        workers = []
+        for index, group in enumerate(self.groups):
+            process = self.workers.get(index)
+            workers.append({
+                "worker": index,
+                "pid": process.pid if process else None,
+                "alive": bool(process and process.is_alive()),
+                "rooms": [room_id for room_id, _ in group],
+                **self.restart_policies[index].snapshot(),
+            })
+        return {"mode": "multi_room", "workers": workers}
+
+    def worker_client(self, index: int) -> IPCClient:
+        return IPCClient((Config.IPC_HOST, self.worker_port(index)), timeout=2.0)
+
+    def console_submit(self, command: str, room_id: Optional[str] = None, as_user: Optional[str] = None) -> str:
+        """Forward to the worker that runs the room; job ids carry the worker index"""
+        index = 0
+        if room_id:
+            matches = [i for i, group in enumerate(self.groups) if room_id in (r for r, _ in group)]
+            if not matches:
+                raise ValueError(f"Unknown room: {room_id}")
+            index = matches[0]
+        job_id = self.worker_client(index).call("console_submit", command=command, room_id=room_id, as_user=as_user)
+        return f"{index}:{job_id}"
+
+    def console_poll(self, job_id: str, since: int = 0) -> dict:
+        index, inner_id = job_id.split(":", 1)
+        result = self.worker_client(int(index)).call("console_poll", job_id=inner_id, since=since)
+        return {**result, "id": job_id}
+
+    def profile_start(self, kind: str = "sample", seconds: float = 30, worker: Optional[int] = None) -> dict:
+        """Profiles run inside a room worker - the supervisor itself has no event loop"""
+        index = int(worker or 0)
+        if index not in range(len(self.groups)):
+            raise ValueError(f"Unknown worker: {index}")
+        return {**self.worker_client(index).call("profile_start", kind=kind, seconds=seconds), "worker": index}
+
+    def profile_runs(self) -> list:
+        runs = []
+        for index in range(len(self.groups)):
             try:
-                self.should_restart = False
-                print("🤖 Starting bot...")
+                runs.extend({**run, "worker": index} for run in self.worker_client(index).call("profile_runs"))
+            except Exception as e:
+                log.warning("connection", f"Could not read profiles from worker {index}: {e}")
+        return runs
 
-                # Run the bot using asyncio.run for proper event loop management
-                async def run_with_restart_check():
-                    try:
-                        # Create main task
-                        main_task = asyncio.create_task(main(self.definitions))
-
-                        # Check for restart every second
-                        while not self.should_restart:
-                            try:
-                                await asyncio.wait_for(asyncio.shield(main_task), timeout=1.0)
-                                break  # Bot finished normally
-                            except asyncio.TimeoutError:
-                                if main_task.done():
-                                    break
-                                continue
-                            except Exception as e:
-                                print(f"Bot error: {e}")
-                                break
+    def logs(self, limit: int = 200, **filters) -> list:
+        """Supervisor records plus every worker's, merged by time"""
+        records = [{**entry, "worker": None} for entry in log.query(limit=limit, **filters)]
+        for index in range(len(self.groups)):
+            try:
+                worker_records = self.worker_client(index).call("logs", limit=limit, **filters)
+                records.extend({**entry, "worker": index} for entry in worker_records)
+            except Exception as e:
+                log.warning("connection", f"Could not read logs from worker {index}: {e}")
+        records.sort(key=lambda entry: entry["ts"])
+        return records[-limit:]
+
+    def metrics(self) -> dict:
+        """Every worker's metrics with a worker label"""
+        snapshots = [metrics.snapshot()]
+        for index in range(len(self.groups)):
+            try:
+                snapshots.append(label_snapshot(self.worker_client(index).call("metrics"), worker=str(index)))
+            except Exception as e:
+                log.warning("connection", f"Could not read metrics from worker {index}: {e}")
+        return merge_snapshots(snapshots)
 
-                        if self.should_restart:
-                            print("🔄 Restarting bot due to file changes...")
-                            main_task.cancel()
-                            try:
-                                await main_task
-                            except asyncio.CancelledError:
-                                pass
+    def clear_logs(self) -> int:
+        cleared = log.clear()
+        for index in range(len(self.groups)):
+            try:
+                cleared += self.worker_client(index).call("clear_logs")
+            except Exception as e:
+                log.warning("connection", f"Could not clear logs of worker {index}: {e}")
+        return cleared
 
-                            # Recreate bot instance
-                            import importlib
-                            importlib.reload(sys.modules[__name__])
+    def status(self, etag: Optional[str] = None) -> dict:
+        """Collect the status of every worker over its own IPC port"""
+        results = []
+        for index in range(len(self.groups)):
+            try:
+                results.append(self.worker_client(index).call("status"))
+            except Exception as e:
+                results.append({"etag": None, "error": str(e),
+                                "rooms": [{"room_id": room_id} for room_id, _ in self.groups[index]]})
+
+        combined = hashlib.md5(json.dumps([(r.get("etag"), r.get("error")) for r in results]).encode()).hexdigest()
+        if etag == combined:
+            return {"etag": combined, "unchanged": True}
+        return {
+            "etag": combined,
+            "workers": [{"worker": index, "connection": r.get("connection"), "error": r.get("error")}
+                        for index, r in enumerate(results)],
+            "rooms": [room for r in results for room in r.get("rooms", [])],
+        }
 
-                            self.definitions = [
-                                BotDefinition(
-                                    getattr(import_module(self.bot_file), self.bot_class)(),
-                                    self.room_id, self.bot_token)
-                            ]
+    def run_loop(self) -> None:
+        for index in range(len(self.groups)):
+            self.start_worker(index)
 
-                    except Exception as e:
-                        print(f"Run error: {e}")
+        while True:
+            if self.should_restart:
+                self.should_restart = False
+                log.info("connection", "🔄 Restarting all room workers due to file changes...")
+                for index in range(len(self.groups)):
+                    self.stop_worker(index)
+                    self.restart_policies[index].on_restart()
+                    self.start_worker(index)
+
+            now = time.time()
+            for index in range(len(self.groups)):
+                process = self.workers.get(index)
+                if process and process.is_alive():
+                    self.restart_policies[index].refresh()
+                    continue
+
+                if index not in self.restart_at:
+                    exit_code = process.exitcode if process else None
+                    delay = self.restart_policies[index].on_failure(f"worker exited with code {exit_code}")
+                    self.restart_at[index] = now + delay
+                    log.warning("connection", f"⚠️ Worker {index} died (exit code {exit_code}) - restarting in {delay:.1f}s")
+                elif now >= self.restart_at[index] and self.restart_policies[index].breaker.allow():
+                    self.start_worker(index)
+
+            time.sleep(1)
+
+
+def start_control_channel(runner, port: Optional[int] = None) -> IPCServer:
+    """Expose status and control of this process to the web server"""
+    server = IPCServer((Config.IPC_HOST, port or Config.IPC_PORT))
+    server.register("supervisor", runner.snapshot)
+    server.register("restart", runner.request_restart)
+    server.register("status", runner.status)
+    server.register("console_submit", runner.console_submit)
+    server.register("console_poll", runner.console_poll)
+    server.register("logs", runner.logs)
+    server.register("clear_logs", runner.clear_logs)
+    server.register("metrics", runner.metrics)
+    server.register("profile_start", runner.profile_start)
+    server.register("profile_runs", runner.profile_runs)
+    server.start()
+    return server
+
+
+def keep_web_server_alive() -> None:
+    """Run the management UI in its own process so it never competes with the bot loop"""
+    from web import run_web_server  # the bot process itself never needs Flask
+    context = multiprocessing.get_context("spawn")
+
+    def watch():
+        while True:
+            process = context.Process(target=run_web_server, name="web-server", daemon=True)
+            process.start()
+            process.join()
+            log.warning("web", f"⚠️ Web server exited with code {process.exitcode} - restarting in 5s")
+            time.sleep(5)
 
-                # Run with proper event loop
-                asyncio.run(run_with_restart_check())
+    Thread(target=watch, name="web-server-watch", daemon=True).start()
 
-            except Exception as e:
-                import traceback
-                print("An error occurred:")
-                traceback.print_exc()
-                time.sleep(2)
-                continue
 
 if __name__ == "__main__":
-    WebServer().keep_alive()
-    RunBot().run_loop()
\ No newline at end of file
+    rooms = Config.get_rooms()
+    log.add_file("supervisor" if len(rooms) > 1 else "bot")
+    ensure_authkey()  # before any worker or the web server is spawned - they inherit it
+    runner = MultiRoomSupervisor(rooms) if len(rooms) > 1 else RunBot(rooms)
+    start_control_channel(runner)
+    keep_web_server_alive()
+    runner.run_loop()
@@ -0,0 +1,98 @@
+"""
+Packs lines of text into as few chat/whisper messages as the length limit allows
+Lines are joined with newlines while they fit; a line longer than the limit is split at
+spaces and fills whatever room the current message has left. Highrise color tags (<#RRGGBB>)
+apply until the next tag, so a message that starts in the middle of colored text reopens the
+active color, and tags are never cut in half.
+"""
+
+import re
+from typing import Awaitable, Callable, Iterable, List, Optional, Tuple
+
+from config import Config
+
+COLOR_TAG = re.compile(r"<#[0-9A-Fa-f]{6}>")
+TAG_LENGTH = len("<#000000>")
+
+
+def message_length(text: str) -> int:
+    """Length as the server counts it - UTF-16 code units, so most emojis count as two"""
+    return len(text.encode("utf-16-le")) // 2
+
+
+def active_color(text: str, default: Optional[str] = None) -> Optional[str]:
+    tags = COLOR_TAG.findall(text)
+    return tags[-1] if tags else default
+
+
+def _hard_split(word: str, limit: int) -> List[str]:
+    """Cut a single over-long word, never inside a color tag"""
+    pieces = []
+    current = ""
+    for token in re.split(f"({COLOR_TAG.pattern})", word):
+        units = [token] if COLOR_TAG.fullmatch(token) else list(token)
+        for unit in units:
+            if current and message_length(current + unit) > limit:
+                pieces.append(current)
+                current = ""
+            current += unit
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def take_words(text: str, room: int, force: bool) -> Tuple[str, str]:
+    """Longest run of whole words from the start of text that fits in room, and the rest.
+    With force, a first word too long for room is cut so the caller always makes progress"""
+    words = text.split(" ")
+    head = ""
+    taken = 0
+    for word in words:
+        candidate = f"{head} {word}" if taken else word
+        if message_length(candidate) > room:
+            break
+        head = candidate
+        taken += 1
+    if not taken and force:
+        first, *cut = _hard_split(words[0], room)
+        return first, " ".join(["".join(cut)] + words[1:]) if cut else " ".join(words[1:])
+    return head, " ".join(words[taken:])
+
+
+def pack_messages(lines: Iterable[str], limit: Optional[int] = None) -> List[str]:
+    """Fewest messages of at most limit characters holding every line, in order.
+    A line that fits in a message of its own is never split; a longer one fills the rest
+    of the current message and continues in the next"""
+    limit = limit or Config.MAX_MESSAGE_LENGTH
+    messages = []
+    current = ""
+    fresh = True  # current holds nothing but a reopened color tag
+    color = None  # color in effect at the end of the text packed so far
+    for line in lines:
+        rest = line
+        while rest:
+            joiner = "" if fresh else "\n"
+            if message_length(current + joiner + rest) <= limit:
+                current += joiner + rest
+                fresh = False
+                color = active_color(rest, color)
+                break
+            if fresh or message_length(rest) + TAG_LENGTH > limit:
+                head, rest = take_words(rest, limit - message_length(current + joiner), force=fresh)
+                if head:
+                    current += joiner + head
+                    color = active_color(head, color)
+            messages.append(current)
+            current = color if color and rest and not COLOR_TAG.match(rest) else ""
+            fresh = True
+    if not fresh:
+        messages.append(current)
+    return messages
+
+
+async def send_packed(send: Callable[[str], Awaitable], lines: Iterable[str], limit: Optional[int] = None) -> int:
+    """Send the packed messages one after the other; returns how many were sent"""
+    messages = pack_messages(lines, limit)
+    for message in messages:
+        await send(message)
+    return len(messages)
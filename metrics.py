@@ -0,0 +1,177 @@
+"""
+Lightweight in-process metrics - counters, gauges and latency histograms
+Everything is updated on the bot loop without locks; the IPC thread only copies it,
+and the web server renders it in Prometheus text format at /metrics
+"""
+
+import asyncio
+import time
+from bisect import bisect_left
+from typing import Dict, Iterable, Tuple
+
+from highrise.models import Error
+
+from config import Config
+
+# حدود الـ histogram بالثواني (من 5ms إلى 10s)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+HELP = {
+    "highrise_api_latency_seconds": ("histogram", "Latency of Highrise SDK calls"),
+    "highrise_api_errors_total": ("counter", "Highrise SDK calls that returned an Error or raised"),
+    "bot_command_latency_seconds": ("histogram", "Time to handle a routed chat command"),
+    "bot_command_errors_total": ("counter", "Routed chat commands that raised"),
+    "event_loop_lag_seconds": ("histogram", "How late the loop monitor woke up"),
+    "event_loop_stalls_total": ("counter", "Loop stalls caught by the watchdog, by blocking function"),
+    "bot_handler_seconds": ("histogram", "Wall time of Highrise event handlers"),
+    "bot_slow_handlers_total": ("counter", "Event handlers slower than slow_handler_seconds"),
+    "bot_rate_limited_total": ("counter", "Requests dropped by the per-user rate limits, by bucket"),
+    "bot_blocked_messages_total": ("counter", "Chat and whispers ignored by the word filter"),
+    "bot_outbox_wait_seconds": ("histogram", "Time outbound messages waited in the queue, by priority"),
+    "bot_outbox_depth": ("gauge", "Chat and whispers waiting to be sent, by priority"),
+    "bot_outbox_shed_total": ("counter", "Outbound messages dropped under backpressure, by priority"),
+    "bot_outbox_deduplicated_total": ("counter", "Repeated outbound lines merged into a queued copy or suppressed"),
+    "bot_outbox_merged_total": ("counter", "Announcements merged into an already queued message"),
+    "bot_task_failures_total": ("counter", "Background tasks that ended with an exception"),
+    "bot_background_tasks": ("gauge", "Running background tasks by owner"),
+    "bot_rejoins_suppressed_total": ("counter", "Joins not greeted because the user was here recently"),
+}
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "total", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    """Registry keyed by (name, sorted label pairs)"""
+
+    def __init__(self):
+        self.counters: Dict[tuple, float] = {}
+        self.gauges: Dict[tuple, float] = {}
+        self.histograms: Dict[tuple, Histogram] = {}
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        self.counters[key] = self.counters.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels) -> None:
+        self.gauges[(name, tuple(sorted(labels.items())))] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(value)
+
+    def snapshot(self) -> dict:
+        """Plain, picklable copy for IPC - list() of a dict is a single step under the GIL"""
+        return {
+            "counters": [[name, dict(labels), value] for (name, labels), value in list(self.counters.items())],
+            "gauges": [[name, dict(labels), value] for (name, labels), value in list(self.gauges.items())],
+            "histograms": [[name, dict(labels), list(h.buckets), list(h.counts), h.total, h.count]
+                           for (name, labels), h in list(self.histograms.items())],
+        }
+
+
+def label_snapshot(snapshot: dict, **labels) -> dict:
+    """Add labels (e.g. worker="0") to every series of a snapshot before merging"""
+    return {kind: [[entry[0], {**entry[1], **labels}, *entry[2:]] for entry in series]
+            for kind, series in snapshot.items()}
+
+
+def merge_snapshots(snapshots: Iterable[dict]) -> dict:
+    merged = {"counters": [], "gauges": [], "histograms": []}
+    for snapshot in snapshots:
+        for kind in merged:
+            merged[kind].extend(snapshot.get(kind, []))
+    return merged
+
+
+def _labels(labels: dict, **extra) -> str:
+    pairs = {**labels, **extra}
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in pairs.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(pairs, escaped, strict=True)) + "}"
+
+
+def render_prometheus(snapshot: dict) -> str:
+    """Prometheus text exposition format (version 0.0.4)"""
+    lines = []
+    described = set()
+
+    def describe(name: str, kind: str) -> None:
+        if name not in described:
+            described.add(name)
+            if name in HELP:
+                lines.append(f"# HELP {name} {HELP[name][1]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for name, labels, value in sorted(snapshot.get("counters", []), key=lambda entry: entry[0]):
+        describe(name, "counter")
+        lines.append(f"{name}{_labels(labels)} {value}")
+    for name, labels, value in sorted(snapshot.get("gauges", []), key=lambda entry: entry[0]):
+        describe(name, "gauge")
+        lines.append(f"{name}{_labels(labels)} {value}")
+    for name, labels, buckets, counts, total, count in sorted(snapshot.get("histograms", []),
+                                                               key=lambda entry: entry[0]):
+        describe(name, "histogram")
+        cumulative = 0
+        for bound, bucket_count in zip(list(buckets) + ["+Inf"], counts, strict=True):
+            cumulative += bucket_count
+            lines.append(f"{name}_bucket{_labels(labels, le=bound)} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {total}")
+        lines.append(f"{name}_count{_labels(labels)} {count}")
+    return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+class InstrumentedHighrise:
+    """Wraps the SDK connection - every coroutine method is timed per method name.
+    Wrappers are cached on the instance, so after the first call the only cost is two
+    perf_counter() calls and a histogram update"""
+
+    def __init__(self, highrise):
+        self._highrise = highrise
+
+    def __getattr__(self, name):
+        attr = getattr(self._highrise, name)
+        if not asyncio.iscoroutinefunction(attr):
+            return attr
+
+        async def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                result = await attr(*args, **kwargs)
+                if isinstance(result, Error):  # the SDK reports most failed requests this way
+                    metrics.inc("highrise_api_errors_total", method=name)
+                return result
+            except Exception:
+                metrics.inc("highrise_api_errors_total", method=name)
+                raise
+            finally:
+                metrics.observe("highrise_api_latency_seconds", time.perf_counter() - started, method=name)
+
+        self.__dict__[name] = timed
+        return timed
+
+
+def instrument(highrise):
+    """Wrap the connection when Config.ENABLE_METRICS is on"""
+    if highrise is None or not Config.ENABLE_METRICS or isinstance(highrise, InstrumentedHighrise):
+        return highrise
+    return InstrumentedHighrise(highrise)
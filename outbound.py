@@ -0,0 +1,274 @@
+"""
+Outbound chat and whispers - one paced queue with priority classes
+Every chat/whisper goes through the Outbox, which sends at the rate the server accepts
+(Config.OUTBOUND) instead of letting handlers race into the server's rate limit. Messages are
+served by class - moderation, reply, announcement, flavor - then in order. When the queue
+backs up, flavor lines (random movement jokes, VIP upsells) are dropped and announcements to
+the same channel are merged into one message, so command replies keep a short wait; anything
+but moderation that has waited longer than its max_wait is dropped instead of sent late.
+Repeats are collapsed by channel and text: a line identical to one still queued is sent once
+as "line (xN)", and one identical to a line sent less than dedup_window seconds ago is not
+sent again. Callers still await chat()/send_whisper() until their message is sent; a shed
+or suppressed message returns None.
+"""
+
+import asyncio
+import heapq
+import itertools
+from collections import Counter, OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from config import Config
+from logger import log
+from message_packer import message_length
+from metrics import metrics
+
+MODERATION, REPLY, ANNOUNCEMENT, FLAVOR = range(4)
+PRIORITY_NAMES = ("moderation", "reply", "announcement", "flavor")
+
+
+def dedup_key(target: Optional[str], text: str) -> tuple:
+    """Channel plus text with case and spacing ignored"""
+    return target, " ".join(text.casefold().split())
+
+
+class OutboundMessage:
+    __slots__ = ("priority", "seq", "target", "text", "future", "queued_at", "key", "repeats")
+
+    def __init__(self, priority: int, seq: int, target: Optional[str], text: str, future: asyncio.Future,
+                 queued_at: float):
+        self.priority = priority
+        self.seq = seq
+        self.target = target  # user id for a whisper, None for room chat
+        self.text = text
+        self.future = future
+        self.queued_at = queued_at
+        self.key: Optional[tuple] = None  # set while identical lines may still join it
+        self.repeats = 1
+
+    def outgoing_text(self) -> str:
+        if self.repeats > 1:
+            counted = f"{self.text} (x{self.repeats})"
+            if message_length(counted) <= Config.MAX_MESSAGE_LENGTH:
+                return counted
+        return self.text
+
+    def __lt__(self, other: "OutboundMessage") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class Outbox:
+    """Wraps the connection like InstrumentedHighrise - chat and send_whisper are queued,
+    every other call goes straight through"""
+
+    def __init__(self, highrise, spawn: Callable, settings: Optional[dict] = None):
+        settings = {**Config.OUTBOUND, **(settings or {})}
+        self._highrise = highrise
+        self.spawn = spawn
+        self.per_second = settings["per_second"]  # 0 = not paced
+        self.burst = settings["burst"]
+        self.concurrency = settings["concurrency"]
+        self.shed_depth = settings["shed_depth"]
+        self.max_queue = settings["max_queue"]
+        self.max_wait = settings["max_wait"]
+        self.dedup_window = settings["dedup_window"]  # 0 = no deduplication
+        self.dedup_size = settings["dedup_size"]
+
+        self.queue: List[OutboundMessage] = []  # heap
+        self.seq = itertools.count()
+        self.tokens = float(self.burst)
+        self.updated = None
+        self.wakeup: Optional[asyncio.Event] = None
+        self.workers = []
+        self.max_depth = 0
+        self.sent = Counter()
+        self.shed = Counter()
+        self.merged = 0
+        self.deduplicated = 0
+        self.pending: Dict[tuple, OutboundMessage] = {}         # queued lines by dedup key
+        self.recent: "OrderedDict[tuple, float]" = OrderedDict()  # dedup key -> sent at, LRU
+
+    async def chat(self, message: str, priority: int = REPLY):
+        return await self.enqueue(None, message, priority)
+
+    async def send_whisper(self, user_id: str, message: str, priority: int = REPLY):
+        return await self.enqueue(user_id, message, priority)
+
+    def __getattr__(self, name):
+        return getattr(self._highrise, name)
+
+    # === Queue ===
+
+    async def enqueue(self, target: Optional[str], text: str, priority: int):
+        loop = asyncio.get_running_loop()
+        if not self.workers:
+            self.wakeup = asyncio.Event()
+            self.updated = loop.time()
+            self.workers = [self.spawn(self._worker(), "outbox") for _ in range(self.concurrency)]
+
+        key = None
+        if self.dedup_window and priority != MODERATION:
+            key = dedup_key(target, text)
+            queued = self.pending.get(key)
+            if queued is not None and not queued.future.done():
+                queued.repeats += 1
+                self._count_deduplicated("merged")
+                return await asyncio.shield(queued.future)
+            sent_at = self.recent.get(key)
+            if sent_at is not None and loop.time() - sent_at < self.dedup_window:
+                self._count_deduplicated("suppressed")
+                return None
+
+        if len(self.queue) >= self.shed_depth:
+            if priority == ANNOUNCEMENT:
+                merged_into = self._merge(target, text)
+                if merged_into is not None:
+                    return await asyncio.shield(merged_into)
+            elif priority == FLAVOR:
+                self._count_shed(priority)
+                return None
+        if len(self.queue) >= self.max_queue:
+            worst = max(self.queue)
+            if worst.priority <= priority:
+                self._count_shed(priority)
+                return None
+            self.queue.remove(worst)
+            heapq.heapify(self.queue)
+            self._forget(worst)
+            self._drop(worst)
+
+        message = OutboundMessage(priority, next(self.seq), target, text, loop.create_future(), loop.time())
+        if key is not None:
+            message.key = key
+            self.pending[key] = message
+        heapq.heappush(self.queue, message)
+        self.max_depth = max(self.max_depth, len(self.queue))
+        self.wakeup.set()
+        return await message.future
+
+    def _merge(self, target: Optional[str], text: str) -> Optional[asyncio.Future]:
+        """Append to the newest queued announcement for the same channel if the result still fits -
+        only the newest, so announcements still go out in the order they were made"""
+        newest = None
+        for message in self.queue:  # heap order is not arrival order
+            if message.priority == ANNOUNCEMENT and message.target == target and not message.future.done() \
+                    and (newest is None or message.seq > newest.seq):
+                newest = message
+        if newest is None or newest.repeats > 1:
+            return None
+        combined = f"{newest.text}\n{text}"
+        if message_length(combined) > Config.MAX_MESSAGE_LENGTH:
+            return None
+        self._forget(newest)  # its text is no longer the line it was keyed by
+        newest.text = combined
+        self.merged += 1
+        metrics.inc("bot_outbox_merged_total")
+        return newest.future
+
+    def _forget(self, message: OutboundMessage) -> None:
+        if message.key is not None and self.pending.get(message.key) is message:
+            del self.pending[message.key]
+        message.key = None
+
+    def _remember(self, key: tuple, now: float) -> None:
+        self.recent[key] = now
+        self.recent.move_to_end(key)
+        while len(self.recent) > self.dedup_size:
+            self.recent.popitem(last=False)
+
+    def _count_deduplicated(self, how: str) -> None:
+        self.deduplicated += 1
+        metrics.inc("bot_outbox_deduplicated_total", how=how)
+
+    def _drop(self, message: OutboundMessage) -> None:
+        self._count_shed(message.priority)
+        if not message.future.done():
+            message.future.set_result(None)
+
+    def _count_shed(self, priority: int) -> None:
+        self.shed[PRIORITY_NAMES[priority]] += 1
+        metrics.inc("bot_outbox_shed_total", priority=PRIORITY_NAMES[priority])
+
+    # === Sending ===
+
+    async def _next(self) -> OutboundMessage:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self.queue:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+            if self.per_second:
+                now = loop.time()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.per_second)
+                self.updated = now
+                if self.tokens < 1:
+                    await asyncio.sleep((1 - self.tokens) / self.per_second)
+                    continue
+            message = heapq.heappop(self.queue)
+            key = message.key
+            self._forget(message)  # from here on an identical line is a new message
+            if message.future.done():
+                continue  # the caller was cancelled
+            name = PRIORITY_NAMES[message.priority]
+            waited = loop.time() - message.queued_at
+            if waited > self.max_wait.get(name, float("inf")):
+                self._drop(message)  # stale - better silent than late
+                continue
+            self.tokens -= 1
+            if key is not None:
+                self._remember(key, loop.time())
+            metrics.observe("bot_outbox_wait_seconds", waited, priority=name)
+            return message
+
+    async def _worker(self) -> None:
+        try:
+            while True:
+                message = await self._next()
+                try:
+                    if message.target is None:
+                        result = await self._highrise.chat(message.outgoing_text())
+                    else:
+                        result = await self._highrise.send_whisper(message.target, message.outgoing_text())
+                    self.sent[PRIORITY_NAMES[message.priority]] += 1
+                    if not message.future.done():
+                        message.future.set_result(result)
+                except Exception as e:
+                    if not message.future.done():
+                        message.future.set_exception(e)
+                    else:
+                        log.debug("messaging", f"Outbound message failed: {e}")
+                finally:
+                    if not message.future.done():
+                        message.future.set_result(None)  # cancelled mid-send
+        finally:
+            # the session is going away - nobody is left to send what is still queued
+            self._release()
+
+    def _release(self) -> None:
+        for message in self.queue:
+            if not message.future.done():
+                message.future.set_result(None)
+        self.queue.clear()
+        self.pending.clear()
+
+    def close(self) -> None:
+        """Connection replaced - stop the workers and release everyone still waiting (None)"""
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
+        self._release()
+
+    def depth(self) -> dict:
+        return dict(Counter(PRIORITY_NAMES[message.priority] for message in self.queue))
+
+    def snapshot(self) -> dict:
+        return {
+            "depth": len(self.queue),
+            "depth_by_priority": self.depth(),
+            "max_depth": self.max_depth,
+            "sent": dict(self.sent),
+            "shed": dict(self.shed),
+            "merged": self.merged,
+            "deduplicated": self.deduplicated,
+        }
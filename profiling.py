@@ -0,0 +1,150 @@
+"""
+On-demand profiling of the live bot process
+Nothing runs until a profile is requested from the management server, and only when
+Config.ENABLE_PROFILING is on. Results are written to PROFILE_DIR for download:
+- sample: stack sampling of the event loop thread, folded stacks (flamegraph.pl / speedscope)
+- cprofile: deterministic cProfile of the loop thread, pstats file (snakeviz, pstats)
+- memory: tracemalloc snapshot comparison over the window, text report
+"""
+
+import cProfile
+import os
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from collections import Counter, OrderedDict
+from typing import Optional
+
+from config import Config
+from logger import log
+
+EXTENSIONS = {"sample": "folded", "cprofile": "pstats", "memory": "txt"}
+
+
+class ProfileRun:
+    def __init__(self, kind: str, seconds: float):
+        self.id = uuid.uuid4().hex[:8]
+        self.kind = kind
+        self.seconds = seconds
+        self.started_at = time.time()
+        self.file = f"{kind}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.{EXTENSIONS[kind]}"
+        self.done = False
+        self.error = None
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "seconds": self.seconds,
+            "started_at": self.started_at,
+            "file": self.file,
+            "done": self.done,
+            "error": self.error,
+        }
+
+
+class Profiler:
+    """One profile at a time; each runs on its own short-lived thread"""
+
+    def __init__(self, directory: Optional[str] = None, history: int = 20):
+        self.directory = directory or Config.PROFILE_DIR
+        self.history = history
+        self.runs = OrderedDict()
+        self.active: Optional[ProfileRun] = None
+        self.loop = None  # loop and thread of the active profile
+        self.loop_thread_id: Optional[int] = None
+
+    def start(self, kind: str, seconds: float, loop, loop_thread_id: int) -> dict:
+        """Called on an IPC thread - returns at once, the result file appears when done"""
+        if not Config.ENABLE_PROFILING:
+            raise RuntimeError("Profiling is disabled (set ENABLE_PROFILING=true)")
+        if kind not in EXTENSIONS:
+            raise ValueError(f"Unknown profile kind: {kind} (use {', '.join(EXTENSIONS)})")
+        if self.active and not self.active.done:
+            raise RuntimeError(f"A {self.active.kind} profile is already running")
+        if loop is None or loop.is_closed() or loop_thread_id is None:
+            raise RuntimeError("Bot is not connected yet")
+
+        seconds = max(1.0, min(float(seconds), Config.PROFILE_MAX_SECONDS))
+        run = self.active = ProfileRun(kind, seconds)
+        self.loop, self.loop_thread_id = loop, loop_thread_id
+        self.runs[run.id] = run
+        while len(self.runs) > self.history:
+            self.runs.popitem(last=False)
+
+        os.makedirs(self.directory, exist_ok=True)
+        target = getattr(self, f"run_{kind}")
+        threading.Thread(target=self._run, args=(run, target),
+                         name=f"profile-{kind}", daemon=True).start()
+        log.info("performance", f"🔬 Started {kind} profile for {seconds:.0f}s", kind=kind, file=run.file)
+        return run.to_dict()
+
+    def _run(self, run: ProfileRun, target) -> None:
+        try:
+            target(run, os.path.join(self.directory, run.file))
+            log.info("performance", f"✅ {run.kind} profile written to {run.file}", kind=run.kind, file=run.file)
+        except Exception as e:
+            run.error = str(e)
+            log.error("performance", f"❌ {run.kind} profile failed: {e}", kind=run.kind)
+        finally:
+            run.done = True
+
+    def run_sample(self, run: ProfileRun, path: str) -> None:
+        stacks = Counter()
+        interval = Config.PROFILE_SAMPLE_INTERVAL
+        deadline = time.monotonic() + run.seconds
+        while time.monotonic() < deadline:
+            frame = sys._current_frames().get(self.loop_thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{getattr(code, 'co_qualname', code.co_name)} "
+                             f"({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                stacks[";".join(reversed(names))] += 1
+            time.sleep(interval)
+
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+    def run_cprofile(self, run: ProfileRun, path: str) -> None:
+        # cProfile only sees the thread that enabled it, so enable/disable run on the loop
+        profile = cProfile.Profile()
+        stopped = threading.Event()
+
+        def stop() -> None:
+            profile.disable()
+            stopped.set()
+
+        self.loop.call_soon_threadsafe(profile.enable)
+        time.sleep(run.seconds)
+        self.loop.call_soon_threadsafe(stop)
+        if not stopped.wait(timeout=10):
+            raise RuntimeError("Event loop did not respond to stop the profiler")
+        profile.dump_stats(path)
+
+    def run_memory(self, run: ProfileRun, path: str) -> None:
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start(Config.PROFILE_TRACEMALLOC_FRAMES)
+        try:
+            before = tracemalloc.take_snapshot()
+            time.sleep(run.seconds)
+            after = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            if started_here:
+                tracemalloc.stop()  # no tracing overhead once the window is over
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"# tracemalloc comparison over {run.seconds:.0f}s - "
+                    f"traced {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB\n")
+            for stat in after.compare_to(before, "lineno")[:Config.PROFILE_TOP_ALLOCATIONS]:
+                f.write(f"{stat}\n")
+
+    def list_runs(self) -> list:
+        return [run.to_dict() for run in reversed(self.runs.values())]
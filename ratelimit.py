@@ -0,0 +1,73 @@
+"""
+Per-user rate limits - token buckets kept on the UserSession
+Each kind of request (commands, reactions, emote changes, plain chat) has its own bucket
+per user, refilled continuously at the per-minute rate from Config.RATE_LIMITS. A check is
+O(1): refill by elapsed time, take one token. Requests over the limit are dropped before
+any API call or reply, so a flood costs the bot nothing but the check.
+"""
+
+import time
+from typing import Optional
+
+from config import Config
+from metrics import metrics
+
+REACTION_COMMANDS = {"/clap", "/heart", "/wink", "/thumbs", "/wave"}
+EMOTE_COMMANDS = {"/e", "/dance", "/all", "/sync"}
+
+
+class TokenBucket:
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, per_minute: float, now: float):
+        self.capacity = max(1.0, float(per_minute))  # a full minute's worth may arrive as a burst
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self.updated = now
+
+    def take(self, now: float) -> bool:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+
+def limits() -> dict:
+    """Requests per minute by bucket name"""
+    return {
+        "command": Config.RATE_LIMITS["commands_per_minute"],
+        "reaction": Config.RATE_LIMITS["reactions_per_minute"],
+        "emote": Config.RATE_LIMITS["emote_changes_per_minute"],
+        "chat": Config.MAX_MESSAGES_PER_MINUTE,
+    }
+
+
+def request_kind(message: str) -> str:
+    """Bucket a chat message counts against"""
+    if message.isdigit():
+        return "emote"
+    command = (message.lower().split() or [""])[0]
+    if command in REACTION_COMMANDS:
+        return "reaction"
+    if command in EMOTE_COMMANDS:
+        return "emote"
+    if command.startswith("/") or command in ("stop", "list", "unfollow", "rock", "paper", "scissors",
+                                              "توقف", "قائمة", "حجر", "ورقة", "مقص"):
+        return "command"
+    return "chat"
+
+
+def allow(session, kind: str, now: Optional[float] = None) -> bool:
+    """Take a token from the user's bucket; False (and counted) when they are over the limit"""
+    if not Config.SPAM_PROTECTION:
+        return True
+    now = time.monotonic() if now is None else now
+    bucket = session.buckets.get(kind)
+    if bucket is None:
+        bucket = session.buckets[kind] = TokenBucket(limits()[kind], now)
+    if bucket.take(now):
+        return True
+    metrics.inc("bot_rate_limited_total", kind=kind)
+    return False
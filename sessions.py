@@ -0,0 +1,134 @@
+"""
+Per-user state - one UserSession per user id
+Emote loop, game, rate-limit buckets and cooldowns live on the session instead of in
+separate bot-wide dicts, so a user's state can be torn down in one place. Leaving the room
+stops the emote loop and game (AUTO_STOP_EMOTES_ON_LEAVE); the session itself, with its
+buckets and cooldowns, stays until the idle sweeper drops it - leaving and rejoining does
+not reset a rate limit.
+"""
+
+import asyncio
+import time
+from typing import Dict, Iterator, Optional
+
+from config import Config
+from logger import log
+
+
+class UserSession:
+    __slots__ = ("user_id", "username", "in_room", "last_seen", "emote_name", "emote_task",
+                 "game", "buckets", "cooldowns")
+
+    def __init__(self, user_id: str, username: str):
+        self.user_id = user_id
+        self.username = username
+        self.in_room = True
+        self.last_seen = time.monotonic()
+        self.emote_name: Optional[str] = None
+        self.emote_task: Optional[asyncio.Task] = None
+        self.game: Optional[dict] = None          # rock paper scissors round in progress
+        self.buckets: Dict[str, object] = {}       # rate-limit buckets by name
+        self.cooldowns: Dict[str, float] = {}      # name -> monotonic time it ends
+
+    @property
+    def emoting(self) -> bool:
+        return self.emote_task is not None and not self.emote_task.done()
+
+    def stop_emote(self) -> bool:
+        """Cancel the emote loop; True if one was running"""
+        running = self.emoting
+        if running:
+            self.emote_task.cancel()
+        self.emote_task = None
+        self.emote_name = None
+        return running
+
+    def close(self) -> None:
+        self.stop_emote()
+        self.game = None
+        self.buckets.clear()
+        self.cooldowns.clear()
+
+    def idle_for(self, now: float) -> float:
+        return now - self.last_seen
+
+
+class UserSessions:
+    """user_id -> UserSession, owned by the bot loop"""
+
+    def __init__(self, settings: Optional[dict] = None):
+        settings = {**Config.USER_SESSIONS, **(settings or {})}
+        self.idle_seconds = settings["idle_seconds"]
+        self.game_timeout = settings["game_timeout"]
+        self.sweep_interval = settings["sweep_interval"]
+        self.sessions: Dict[str, UserSession] = {}
+
+    def get(self, user) -> UserSession:
+        """Session for a user, created on first use; marks the user as active now"""
+        session = self.sessions.get(user.id)
+        if session is None:
+            session = self.sessions[user.id] = UserSession(user.id, user.username)
+        session.username = user.username
+        session.in_room = True
+        session.last_seen = time.monotonic()
+        return session
+
+    def peek(self, user_id: str) -> Optional[UserSession]:
+        return self.sessions.get(user_id)
+
+    def left(self, user_id: str) -> None:
+        """User left the room - loop and game stop when AUTO_STOP_EMOTES_ON_LEAVE is on,
+        buckets and cooldowns are kept until the session goes idle"""
+        session = self.sessions.get(user_id)
+        if session is None:
+            return
+        session.in_room = False
+        session.last_seen = time.monotonic()
+        if Config.AUTO_STOP_EMOTES_ON_LEAVE:
+            session.stop_emote()
+            session.game = None
+
+    def end(self, user_id: str) -> None:
+        session = self.sessions.pop(user_id, None)
+        if session is not None:
+            session.close()
+
+    def close_all(self) -> None:
+        for user_id in list(self.sessions):
+            self.end(user_id)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Expire stale games and drop sessions with nothing running; returns sessions removed"""
+        now = time.monotonic() if now is None else now
+        removed = 0
+        for user_id, session in list(self.sessions.items()):
+            if session.game and now - session.game["started_at"] > self.game_timeout:
+                session.game = None
+            if session.emoting and session.in_room:
+                continue
+            if session.game is None and session.idle_for(now) > self.idle_seconds:
+                self.end(user_id)
+                removed += 1
+        return removed
+
+    async def sweeper_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            try:
+                removed = self.sweep()
+                if removed:
+                    log.debug("system", f"🧹 Removed {removed} idle user sessions", remaining=len(self.sessions))
+            except Exception as e:
+                log.error("system", f"Error sweeping user sessions: {e}")
+
+    def emote_loops(self) -> Iterator[UserSession]:
+        return (session for session in list(self.sessions.values()) if session.emoting)
+
+    def games(self) -> int:
+        return sum(1 for session in list(self.sessions.values()) if session.game)
+
+    def __len__(self) -> int:
+        return len(self.sessions)
+
+    def __iter__(self) -> Iterator[UserSession]:
+        return iter(list(self.sessions.values()))
@@ -0,0 +1,81 @@
+"""
+Local shared store - a JSON file that several bot processes can read and update safely
+Used for cross-room state such as detected moderators and VIP members
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+from logger import log
+
+try:
+    import fcntl
+except ImportError:  # Windows - no advisory locks, single process use only
+    fcntl = None
+
+
+class SharedStore:
+    """JSON document on disk with inter-process locking and atomic writes"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_path = f"{path}.lock"
+        self._cache = {}
+        self._mtime = None
+
+    @contextmanager
+    def _locked(self):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_disk(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self._mtime = os.path.getmtime(self.path)
+            return data if isinstance(data, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            log.error("system", f"Error reading shared store {self.path}: {e}")
+            return {}
+
+    def _write_disk(self, data: dict) -> None:
+        # الكتابة في ملف مؤقت ثم الاستبدال حتى لا يقرأ أي عملية ملفاً نصف مكتوب
+        tmp_path = f"{self.path}.tmp.{os.getpid()}"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    def changed(self) -> bool:
+        """Cheap check (one stat call) whether another process wrote the file"""
+        try:
+            return os.path.getmtime(self.path) != self._mtime
+        except OSError:
+            return False
+
+    def load(self) -> dict:
+        """Return the current document, re-reading the file only when it changed"""
+        if self._mtime is None or self.changed():
+            self._cache = self._read_disk()
+        return self._cache
+
+    def update(self, mutate) -> dict:
+        """Read-modify-write under the lock; mutate(data) edits the dict in place"""
+        with self._locked():
+            data = self._read_disk()
+            mutate(data)
+            data["last_updated"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            self._write_disk(data)
+            self._cache = data
+            return data
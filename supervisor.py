@@ -0,0 +1,150 @@
+"""
+Connection supervisor for the bot session
+Exponential backoff with jitter, circuit breaker and liveness tracking
+"""
+
+import random
+import time
+from typing import Optional
+
+from config import Config
+
+
+class CircuitBreaker:
+    """Stops reconnect attempts after too many consecutive failures"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._state = self.CLOSED
+
+    @property
+    def state(self) -> str:
+        # بعد انتهاء فترة التهدئة نسمح بمحاولة واحدة تجريبية
+        if self._state == self.OPEN and time.time() - self.opened_at >= self.cooldown:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Return True if a connection attempt may be made now"""
+        return self.state != self.OPEN
+
+    def remaining(self) -> float:
+        """Seconds left until the breaker lets an attempt through"""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.cooldown - (time.time() - self.opened_at))
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._state == self.HALF_OPEN or self.failures >= self.threshold:
+            self._state = self.OPEN
+            self.opened_at = time.time()
+
+
+class ConnectionSupervisor:
+    """Tracks session health and decides how long to wait before reconnecting"""
+
+    def __init__(self, settings: Optional[dict] = None):
+        settings = {**Config.RECONNECT_SETTINGS, **(settings or {})}
+        self.base_delay = settings["base_delay"]
+        self.max_delay = settings["max_delay"]
+        self.multiplier = settings["multiplier"]
+        self.jitter = settings["jitter"]
+        self.liveness_timeout = settings["liveness_timeout"]
+        self.probe_timeout = settings["probe_timeout"]
+        self.stable_after = settings["stable_after"]
+        self.breaker = CircuitBreaker(settings["breaker_threshold"], settings["breaker_cooldown"])
+
+        self.attempts = 0            # consecutive failed attempts
+        self.reconnect_count = 0     # total reconnects since process start
+        self.next_delay = 0.0
+        self.last_error = None
+        self.last_error_at = None
+        self.connected_at = None
+        self.last_event_at = None
+        self.started_at = time.time()
+
+    def compute_delay(self) -> float:
+        """Exponential backoff capped at max_delay, with proportional jitter"""
+        delay = min(self.max_delay, self.base_delay * (self.multiplier ** max(0, self.attempts - 1)))
+        spread = delay * self.jitter
+        return max(0.0, min(self.max_delay, delay + random.uniform(-spread, spread)))
+
+    def record_event(self) -> None:
+        """Called for every inbound event - keeps the session marked alive"""
+        self.last_event_at = time.time()
+
+    def on_session_start(self) -> None:
+        """Called from on_start once the server accepted the session"""
+        now = time.time()
+        self.connected_at = now
+        self.last_event_at = now
+
+    def seconds_since_last_event(self) -> Optional[float]:
+        if self.last_event_at is None:
+            return None
+        return time.time() - self.last_event_at
+
+    def is_stale(self) -> bool:
+        """True when the session is up but nothing arrived for liveness_timeout seconds"""
+        idle = self.seconds_since_last_event()
+        return self.connected_at is not None and idle is not None and idle > self.liveness_timeout
+
+    def refresh(self) -> None:
+        """Reset backoff once the current session has been up for stable_after seconds"""
+        # جلسة استمرت فترة كافية تعتبر ناجحة، فنبدأ العد من جديد
+        stable = self.connected_at and time.time() - self.connected_at >= self.stable_after
+        if stable and (self.attempts or self.breaker.state != CircuitBreaker.CLOSED):
+            self.attempts = 0
+            self.next_delay = 0.0
+            self.breaker.record_success()
+
+    def on_failure(self, error) -> float:
+        """Record a dropped/failed session and return the delay before the next attempt"""
+        self.refresh()
+
+        self.attempts += 1
+        self.reconnect_count += 1
+        self.last_error = str(error) if error else "session ended"
+        self.last_error_at = time.time()
+        self.connected_at = None
+        self.breaker.record_failure()
+
+        self.next_delay = max(self.compute_delay(), self.breaker.remaining())
+        return self.next_delay
+
+    def on_restart(self) -> None:
+        """Planned restart (file change) - not a failure, keeps backoff untouched"""
+        self.reconnect_count += 1
+        self.connected_at = None
+        self.next_delay = 0.0
+
+    def snapshot(self) -> dict:
+        """Plain dict view for the web UI and metrics"""
+        idle = self.seconds_since_last_event()
+        return {
+            "connected": self.connected_at is not None,
+            "connected_for": round(time.time() - self.connected_at, 1) if self.connected_at else None,
+            "seconds_since_last_event": round(idle, 1) if idle is not None else None,
+            "stale": self.is_stale(),
+            "attempts": self.attempts,
+            "reconnect_count": self.reconnect_count,
+            "next_delay": round(self.next_delay, 2),
+            "breaker_state": self.breaker.state,
+            "breaker_failures": self.breaker.failures,
+            "last_error": self.last_error,
+            "last_error_at": self.last_error_at,
+            "uptime": round(time.time() - self.started_at, 1),
+        }
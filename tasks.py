@@ -0,0 +1,99 @@
+"""
+Registry for the bot's background tasks
+Every long-lived coroutine is started through TaskRegistry.spawn with a name and an owner
+("user:<id>", "feature:follow", "system"...). Failures are logged instead of lost, owners
+can be cancelled as a group, and a session restart cancels everything that is left.
+"""
+
+import asyncio
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+from logger import log
+from metrics import metrics
+
+
+def user_owner(user_id: str) -> str:
+    return f"user:{user_id}"
+
+
+class TaskInfo:
+    __slots__ = ("name", "owner", "started")
+
+    def __init__(self, name: str, owner: str):
+        self.name = name
+        self.owner = owner
+        self.started = time.monotonic()
+
+
+class TaskRegistry:
+    """Tracks tasks of the current event loop; all methods run on that loop"""
+
+    def __init__(self):
+        self.tasks: Dict[asyncio.Task, TaskInfo] = {}
+        self.failures = 0
+
+    def spawn(self, coroutine, name: str, owner: str = "system") -> asyncio.Task:
+        task = asyncio.create_task(coroutine, name=name)
+        self.tasks[task] = TaskInfo(name, owner)
+        task.add_done_callback(self._finished)
+        return task
+
+    def _finished(self, task: asyncio.Task) -> None:
+        info = self.tasks.pop(task, None)
+        if info is None or task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            self.failures += 1
+            metrics.inc("bot_task_failures_total", task=info.name.split(":", 1)[0])
+            log.error("system", f"❌ Background task {info.name} failed: {error!r}", owner=info.owner,
+                      seconds=round(time.monotonic() - info.started, 1))
+
+    def cancel_owner(self, owner: str) -> int:
+        """Cancel every task of one owner (a user, a feature); returns how many"""
+        cancelled = 0
+        for task, info in list(self.tasks.items()):
+            if info.owner == owner and not task.done():
+                task.cancel()
+                cancelled += 1
+        return cancelled
+
+    def cancel_all(self) -> int:
+        cancelled = 0
+        for task in list(self.tasks):
+            if not task.done():
+                task.cancel()
+                cancelled += 1
+        return cancelled
+
+    async def shutdown(self, timeout: float = 5.0) -> int:
+        """Cancel everything and wait (bounded) for the tasks to finish their cleanup"""
+        tasks = [task for task in self.tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            if pending:
+                log.warning("system", f"⚠️ {len(pending)} background tasks ignored cancellation",
+                            tasks=[self.tasks[task].name for task in pending if task in self.tasks])
+        return len(tasks)
+
+    def count(self, owner: Optional[str] = None) -> int:
+        if owner is None:
+            return len(self.tasks)
+        return sum(1 for info in list(self.tasks.values()) if info.owner == owner)
+
+    def snapshot(self, limit: int = 20) -> dict:
+        """Counts by owner kind and the oldest running tasks with their ages"""
+        now = time.monotonic()
+        infos = sorted(self.tasks.values(), key=lambda info: info.started)
+        return {
+            "running": len(infos),
+            "failures": self.failures,
+            # users are summed up - one series per user would grow without bound
+            "by_owner": dict(Counter("user" if info.owner.startswith("user:") else info.owner for info in infos)),
+            "oldest": [{"name": info.name, "owner": info.owner, "age_seconds": round(now - info.started, 1)}
+                       for info in infos[:limit]],
+        }
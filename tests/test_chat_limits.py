@@ -0,0 +1,52 @@
+"""
+Rate limit and word filter on the chat path, against the in-process fake room
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import new_session, shutdown  # noqa: E402
+from config import Config  # noqa: E402
+from metrics import metrics  # noqa: E402
+
+
+def run(scenario):
+    Config.ENABLE_LOGGING = False
+    Config.ENABLE_RANDOM_MOVEMENT = False
+    Config.OUTBOUND["per_second"] = 0
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="bot-test-"))
+    try:
+        return asyncio.run(scenario())
+    finally:
+        os.chdir(cwd)
+
+
+def blocked_total() -> float:
+    return sum(value for name, _, value in metrics.snapshot()["counters"] if name == "bot_blocked_messages_total")
+
+
+def test_word_filter_runs_for_chat_over_the_rate_limit():
+    async def scenario():
+        Config.SPAM_PROTECTION = True
+        Config.ENABLE_WORD_FILTER = True
+        room, bot = await new_session()
+        bot.word_filter.update(["badword"])
+        user = await room.join("flooder")
+        await room.settle()
+        for _ in range(Config.MAX_MESSAGES_PER_MINUTE):
+            await bot.on_chat(user, "hello")
+        before = blocked_total()
+        await bot.on_chat(user, "a badword here")  # over the limit by now
+        after = blocked_total()
+        await shutdown(bot)
+        return after - before
+
+    try:
+        assert run(scenario) == 1
+    finally:
+        Config.ENABLE_WORD_FILTER = False
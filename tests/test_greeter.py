@@ -0,0 +1,93 @@
+"""
+Greeting batching and rejoin suppression against the in-process fake room
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from highrise.models import UserJoinedEvent  # noqa: E402
+
+from benchmarks import new_session, shutdown  # noqa: E402
+from config import Config  # noqa: E402
+
+WINDOW = 0.05
+
+
+def run(scenario):
+    Config.ENABLE_LOGGING = False
+    Config.ENABLE_RANDOM_MOVEMENT = False
+    Config.OUTBOUND["per_second"] = 0
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="bot-test-"))
+    try:
+        return asyncio.run(scenario())
+    finally:
+        os.chdir(cwd)
+
+
+async def greeted_session():
+    room, bot = await new_session()
+    bot.greeter.window = WINDOW
+    bot.greeter.line_delay = 0
+    return room, bot
+
+
+async def settle(room) -> None:
+    await room.settle()
+    await asyncio.sleep(WINDOW * 4)
+    await room.settle()
+
+
+async def rejoin(room, user) -> None:
+    """Same user back in the room - room.join would make a new user id"""
+    room.add_user(user.username, user_id=user.id)
+    await room.emit(UserJoinedEvent(user=user, position=room.users[user.id][1]))
+
+
+def chat_lines(room) -> list:
+    return [text for channel, _, text in room.transcript if channel == "chat"]
+
+
+def test_rejoin_within_ttl_cancels_pending_goodbye():
+    async def scenario():
+        room, bot = await greeted_session()
+        user = await room.join("flaky")
+        await settle(room)
+        room.transcript.clear()
+
+        # the flush of the leave is still waiting when they come back
+        await room.leave(user)
+        await room.settle()
+        await rejoin(room, user)
+        await settle(room)
+
+        lines = chat_lines(room)
+        await shutdown(bot)
+        return lines, user.id in bot.room_users
+
+    lines, present = run(scenario)
+    assert present
+    assert not any("Goodbye" in line for line in lines)
+    assert not any("Welcome" in line for line in lines)
+
+
+def test_user_who_left_before_welcome_is_welcomed_on_return():
+    async def scenario():
+        room, bot = await greeted_session()
+        user = await room.join("blink")
+        await room.leave(user)  # inside the same greeting window - never welcomed
+        await settle(room)
+        room.transcript.clear()
+
+        await rejoin(room, user)
+        await settle(room)
+        lines = chat_lines(room)
+        await shutdown(bot)
+        return lines
+
+    lines = run(scenario)
+    assert any("Welcome @blink" in line for line in lines)
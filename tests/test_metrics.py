@@ -0,0 +1,27 @@
+"""
+Metrics scrape of a room process
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from main import RunBot  # noqa: E402
+
+
+def test_metrics_before_first_connect():
+    Config.ENABLE_LOGGING = False
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="bot-test-"))
+    try:
+        runner = RunBot([("fake-room", "token")], watch_files=False)
+        snapshot = runner.metrics()
+    finally:
+        os.chdir(cwd)
+
+    gauges = {name: value for name, labels, value in snapshot["gauges"] if not labels}
+    assert runner.definitions[0].bot.highrise is None
+    assert gauges["bot_connected"] == 0
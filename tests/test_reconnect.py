@@ -0,0 +1,76 @@
+"""
+SDK-internal reconnects - the SDK assigns bot.highrise and calls on_start again on the same Bot
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import new_session, shutdown  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def run(scenario):
+    Config.ENABLE_LOGGING = False
+    Config.ENABLE_RANDOM_MOVEMENT = False
+    Config.OUTBOUND["per_second"] = 0
+    cwd = os.getcwd()
+    os.chdir(tempfile.mkdtemp(prefix="bot-test-"))
+    try:
+        return asyncio.run(scenario())
+    finally:
+        os.chdir(cwd)
+
+
+def task_names(bot) -> Counter:
+    return Counter(info.name for task, info in bot.tasks.tasks.items() if not task.done())
+
+
+async def reconnect(room, bot) -> None:
+    room.disconnect(bot)
+    await room.connect(bot)
+    await room.settle()
+
+
+def test_reconnect_replaces_outbox_workers():
+    async def scenario():
+        room, bot = await new_session()
+        await bot.highrise.chat("before")
+        old_outbox = bot._highrise
+        old_outbox.per_second, old_outbox.tokens = 0.001, 0  # the next line stays queued
+        queued = asyncio.create_task(bot.highrise.chat("never sent"))
+        await asyncio.sleep(0)
+
+        await reconnect(room, bot)
+        await bot.highrise.chat("after")
+        result = await asyncio.wait_for(queued, timeout=1)
+        names = task_names(bot)
+        await shutdown(bot)
+        return names, result
+
+    names, result = run(scenario)
+    assert names["outbox"] == Config.OUTBOUND["concurrency"]
+    assert result is None
+
+
+def test_on_start_twice_keeps_one_of_each_loop():
+    async def scenario():
+        Config.ENABLE_RANDOM_MOVEMENT = True
+        room, bot = await new_session()
+        await bot.highrise.chat("workers up")
+        await asyncio.sleep(0)
+        before = task_names(bot)
+        await reconnect(room, bot)  # on_start runs a second time
+        await bot.highrise.chat("workers up")
+        await asyncio.sleep(0)
+        after = task_names(bot)
+        await shutdown(bot)
+        return before, after
+
+    before, after = run(scenario)
+    assert before["status_publisher"] == before["session_sweeper"] == before["random_movement"] == 1
+    assert after == before
@@ -0,0 +1,29 @@
+"""
+User sessions and the rate-limit buckets kept on them
+"""
+
+import os
+import sys
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import ratelimit  # noqa: E402
+from config import Config  # noqa: E402
+from sessions import UserSessions  # noqa: E402
+
+
+def test_leaving_and_rejoining_keeps_the_rate_limit():
+    Config.SPAM_PROTECTION = True
+    Config.AUTO_STOP_EMOTES_ON_LEAVE = True
+    sessions = UserSessions()
+    user = SimpleNamespace(id="user-1", username="flooder")
+    limit = ratelimit.limits()["reaction"]
+
+    allowed = sum(ratelimit.allow(sessions.get(user), "reaction", now=0.0) for _ in range(limit))
+    sessions.left(user.id)
+    assert allowed == limit
+    assert not ratelimit.allow(sessions.get(user), "reaction", now=0.0)
+
+    sessions.left(user.id)
+    assert sessions.sweep(now=sessions.idle_seconds + 1e9) == 1  # gone once idle
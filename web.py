@@ -0,0 +1,343 @@
+"""
+Management web server - runs in its own process on a production WSGI server
+Talks to the bot process over the local IPC channel (ipc.py)
+"""
+
+import json
+import os
+import shutil
+from datetime import datetime
+
+from flask import (
+    Flask,
+    Response,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    send_file,
+    stream_with_context,
+    url_for,
+)
+from werkzeug.utils import secure_filename
+
+from config import Config
+from ipc import IPCClient, IPCError
+from logger import list_log_files, log, search_logs, tail_log
+from metrics import render_prometheus
+
+
+class WebServer():
+    def __init__(self):
+        self.bot = IPCClient()  # status and control of the bot process
+        self.app = Flask(__name__)
+        self.app.secret_key = Config.WEB_SECRET_KEY
+        self.app.config['MAX_CONTENT_LENGTH'] = Config.MAX_FILE_SIZE
+
+        # Create upload folder if it doesn't exist
+        os.makedirs(Config.UPLOAD_FOLDER, exist_ok=True)
+
+        self.setup_routes()
+
+    def setup_routes(self):
+        @self.app.route('/')
+        def index():
+            # Get list of Python files in current directory
+            files = [f for f in os.listdir('.') if f.endswith(('.py', '.json', '.txt', '.md'))]
+
+            message = request.args.get('message')
+            success = request.args.get('success') == 'true'
+
+            return render_template('index.html', files=files, message=message, success=success)
+
+        @self.app.route('/upload', methods=['POST'])
+        def upload_file():
+            if 'file' not in request.files:
+                return redirect(url_for('index', message='No file selected', success='false'))
+
+            file = request.files['file']
+            if file.filename == '':
+                return redirect(url_for('index', message='No file selected', success='false'))
+
+            if file and self.allowed_file(file.filename):
+                filename = secure_filename(file.filename)
+
+                # Create backup if file exists
+                if os.path.exists(filename):
+                    backup_name = f"{filename}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                    shutil.copy2(filename, backup_name)
+
+                file.save(filename)
+                return redirect(url_for('index', message=f'File {filename} uploaded successfully!', success='true'))
+
+            return redirect(url_for('index', message='Invalid file type', success='false'))
+
+        @self.app.route('/edit/<filename>')
+        def edit_file(filename):
+            if not self.safe_filename(filename):
+                return redirect(url_for('index', message='Invalid filename', success='false'))
+
+            try:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    content = f.read()
+
+                message = request.args.get('message')
+                success = request.args.get('success') == 'true'
+
+                return render_template('edit.html', filename=filename, content=content, 
+                                     message=message, success=success)
+            except Exception as e:
+                return redirect(url_for('index', message=f'Error reading file: {str(e)}', success='false'))
+
+        @self.app.route('/edit/<filename>', methods=['POST'])
+        def save_file(filename):
+            if not self.safe_filename(filename):
+                return redirect(url_for('index', message='Invalid filename', success='false'))
+
+            content = request.form['content']
+
+            try:
+                # Create backup
+                if os.path.exists(filename):
+                    backup_name = f"{filename}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                    shutil.copy2(filename, backup_name)
+
+                with open(filename, 'w', encoding='utf-8') as f:
+                    f.write(content)
+
+                return redirect(url_for('edit_file', filename=filename, 
+                                      message='File saved successfully!', success='true'))
+            except Exception as e:
+                return redirect(url_for('edit_file', filename=filename, 
+                                      message=f'Error saving file: {str(e)}', success='false'))
+
+        @self.app.route('/download/<filename>')
+        def download_file(filename):
+            if not self.safe_filename(filename):
+                return redirect(url_for('index', message='Invalid filename', success='false'))
+
+            try:
+                return send_file(filename, as_attachment=True)
+            except Exception as e:
+                return redirect(url_for('index', message=f'Error downloading file: {str(e)}', success='false'))
+
+        @self.app.route('/delete/<filename>')
+        def delete_file(filename):
+            if not self.safe_filename(filename) or filename in ['main.py', 'config.py']:
+                return redirect(url_for('index', message='Cannot delete core files', success='false'))
+
+            try:
+                # Create backup before deletion
+                backup_name = f"deleted_{filename}.backup.{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                shutil.copy2(filename, backup_name)
+                os.remove(filename)
+
+                return redirect(url_for('index', message=f'File {filename} deleted successfully!', success='true'))
+            except Exception as e:
+                return redirect(url_for('index', message=f'Error deleting file: {str(e)}', success='false'))
+
+        @self.app.route('/restart')
+        def restart_bot():
+            try:
+                self.bot.call("restart")
+            except IPCError as e:
+                # Bot process not reachable - fall back to triggering the file watcher
+                log.warning("web", f"IPC restart failed: {e}")
+                with open('main.py', 'a') as f:
+                    f.write('\n# Restart trigger\n')
+            return redirect(url_for('index', message='Bot restart triggered!', success='true'))
+
+        @self.app.route('/backup')
+        def create_backup():
+            try:
+                backup_dir = f"backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                os.makedirs(backup_dir, exist_ok=True)
+
+                # Backup important files
+                important_files = ['main.py', 'config.py']
+                for filename in important_files:
+                    if os.path.exists(filename):
+                        shutil.copy2(filename, os.path.join(backup_dir, filename))
+
+                return redirect(url_for('index', message=f'Backup created: {backup_dir}', success='true'))
+            except Exception as e:
+                return redirect(url_for('index', message=f'Backup failed: {str(e)}', success='false'))
+
+        @self.app.route('/config')
+        def edit_config():
+            return redirect(url_for('edit_file', filename='config.py'))
+
+        @self.app.route('/supervisor')
+        def supervisor_status():
+            try:
+                return jsonify(self.bot.call("supervisor"))
+            except IPCError as e:
+                return jsonify({"error": str(e)}), 503
+
+        @self.app.route('/api/status')
+        def api_status():
+            # The bot answers "unchanged" without rebuilding the payload when the etag matches
+            client_etag = request.headers.get('If-None-Match', '').strip('"') or None
+            try:
+                status = self.bot.call("status", etag=client_etag)
+            except IPCError as e:
+                return jsonify({"error": str(e), "connection": {"connected": False}}), 503
+
+            if status.get("unchanged"):
+                response = Response(status=304)
+            else:
+                response = jsonify(status)
+            response.headers['ETag'] = f'"{status["etag"]}"'
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        @self.app.route('/api/console', methods=['POST'])
+        def console_submit():
+            data = request.get_json(silent=True) or request.form
+            try:
+                job_id = self.bot.call("console_submit", command=data.get('command', ''),
+                                       room_id=data.get('room_id') or None, as_user=data.get('as_user') or None)
+            except IPCError as e:
+                return jsonify({"error": str(e)}), 400
+            return jsonify({"job": job_id})
+
+        @self.app.route('/api/console/<job_id>')
+        def console_poll(job_id):
+            try:
+                return jsonify(self.bot.call("console_poll", job_id=job_id, since=request.args.get('since', 0, type=int)))
+            except IPCError as e:
+                return jsonify({"error": str(e)}), 404
+
+        @self.app.route('/dashboard')
+        def dashboard():
+            return render_template('dashboard.html', interval=Config.STATUS_PUBLISH_INTERVAL)
+
+        @self.app.route('/metrics')
+        def prometheus_metrics():
+            try:
+                snapshot = self.bot.call("metrics")
+            except IPCError as e:
+                return Response(f"# bot unreachable: {e}\n", status=503, mimetype='text/plain')
+            return Response(render_prometheus(snapshot), mimetype='text/plain; version=0.0.4; charset=utf-8')
+
+        @self.app.route('/profile')
+        def profile_runs():
+            if not Config.ENABLE_PROFILING:
+                return jsonify({"error": "Profiling is disabled (set ENABLE_PROFILING=true)"}), 404
+            try:
+                return jsonify({"runs": self.bot.call("profile_runs")})
+            except IPCError as e:
+                return jsonify({"error": str(e)}), 503
+
+        @self.app.route('/profile/start', methods=['POST'])
+        def profile_start():
+            # ?kind=sample|cprofile|memory&seconds=30&worker=0
+            if not Config.ENABLE_PROFILING:
+                return jsonify({"error": "Profiling is disabled (set ENABLE_PROFILING=true)"}), 404
+            try:
+                run = self.bot.call("profile_start",
+                                    kind=request.values.get('kind', 'sample'),
+                                    seconds=request.values.get('seconds', 30, type=float),
+                                    worker=request.values.get('worker', None, type=int))
+            except IPCError as e:
+                return jsonify({"error": str(e)}), 400
+            return jsonify(run), 202
+
+        @self.app.route('/profile/download/<filename>')
+        def profile_download(filename):
+            if not Config.ENABLE_PROFILING:
+                return jsonify({"error": "Profiling is disabled (set ENABLE_PROFILING=true)"}), 404
+            path = os.path.join(Config.PROFILE_DIR, secure_filename(filename))
+            if not os.path.isfile(path):
+                return jsonify({"error": f"Profile not found: {filename}"}), 404
+            return send_file(os.path.abspath(path), as_attachment=True)
+
+        @self.app.route('/logs')
+        def view_logs():
+            # ?level=warning&event=chat&user=@name&q=text&after=<unix ts>&limit=200
+            filters = {
+                "level": request.args.get('level'),
+                "event": request.args.get('event'),
+                "user": request.args.get('user'),
+                "search": request.args.get('q'),
+                "after": request.args.get('after', 0, type=float),
+                "limit": min(request.args.get('limit', 200, type=int), Config.LOG_BUFFER_SIZE),
+            }
+            try:
+                records = self.bot.call("logs", **filters)
+            except IPCError as e:
+                return jsonify({"error": str(e)}), 503
+            return jsonify({"count": len(records), "records": records})
+
+        @self.app.route('/logs/files')
+        def log_files():
+            files = [{"name": os.path.basename(path), "size": os.path.getsize(path),
+                      "modified": datetime.fromtimestamp(os.path.getmtime(path)).strftime('%Y-%m-%d %H:%M:%S')}
+                     for path in list_log_files()]
+            return jsonify({"directory": Config.LOG_DIR, "files": files})
+
+        @self.app.route('/logs/tail')
+        def log_tail():
+            # ?file=bot.log&lines=200 - reads backwards from the end of the file, the bot is not involved
+            name = request.args.get('file', 'bot.log')
+            path = os.path.join(Config.LOG_DIR, name)
+            if not self.safe_filename(name) or not name.endswith('.log') or not os.path.isfile(path):
+                return jsonify({"error": f"Log file not found: {name}"}), 404
+            lines = max(1, min(request.args.get('lines', 200, type=int), 5000))
+            records = tail_log(path, lines)
+            return jsonify({"file": name, "count": len(records), "records": records})
+
+        @self.app.route('/logs/search')
+        def log_search():
+            # ?q=text&user=@name&event=chat&level=warning&limit=500 - streamed as JSON lines,
+            # current files and .gz archives are read line by line
+            matches = search_logs(
+                text=request.args.get('q', ''),
+                user=request.args.get('user', ''),
+                event=request.args.get('event', ''),
+                level=request.args.get('level', ''),
+                limit=max(1, min(request.args.get('limit', 500, type=int), 10000)))
+            lines = (json.dumps(entry, ensure_ascii=False) + "\n" for entry in matches)
+            return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+        @self.app.route('/clear-logs')
+        def clear_logs():
+            try:
+                cleared = self.bot.call("clear_logs")
+            except IPCError as e:
+                return redirect(url_for('index', message=f'Could not clear logs: {e}', success='false'))
+            return redirect(url_for('index', message=f'Logs cleared! ({cleared} records)', success='true'))
+
+    def allowed_file(self, filename):
+        return '.' in filename and \
+               filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
+
+    def safe_filename(self, filename):
+        # Prevent directory traversal attacks
+        return filename and '..' not in filename and not filename.startswith('/')
+
+    def run(self) -> None:
+        try:
+            from waitress import serve
+        except ImportError:
+            log.warning("web", "⚠️ waitress is not installed - using the Flask development server")
+            self.app.run(host=Config.WEB_HOST, port=Config.WEB_PORT, debug=False)
+            return
+        log.info("web", f"🌐 Web server running on {Config.WEB_HOST}:{Config.WEB_PORT} (waitress)")
+        serve(self.app, host=Config.WEB_HOST, port=Config.WEB_PORT, threads=Config.WEB_THREADS)
+
+
+def create_app():
+    """WSGI entry point, e.g. gunicorn 'web:create_app()'"""
+    return WebServer().app
+
+
+def run_web_server() -> None:
+    """Entry point of the web server process"""
+    log.add_file("web")
+    WebServer().run()
+
+
+if __name__ == "__main__":
+    run_web_server()
+
@@ -0,0 +1,103 @@
+"""
+Word filter for BLOCKED_WORDS - every term compiled into one Aho-Corasick automaton
+A message is normalized (NFKC, case folded, Arabic diacritics and tatweel removed, alef and
+yeh forms unified) and scanned once, whatever the number of terms. Terms match whole words;
+a "*" at either end lets the term continue into a longer word ("*word" also catches "badword",
+handy for Arabic prefixes like ال and و). update() builds the new automaton aside and swaps
+it in with one assignment, so a check never sees a half-built filter.
+"""
+
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# harakat, superscript alef and Quranic marks, plus tatweel (ـ)
+_REMOVED = [*range(0x064B, 0x0660), 0x0670, *range(0x06D6, 0x06EE), 0x0640]
+_NORMALIZE = {**dict.fromkeys(_REMOVED),
+              **{ord(char): "ا" for char in "أإآٱ"}, ord("ى"): "ي"}
+
+
+def normalize(text: str) -> str:
+    return unicodedata.normalize("NFKC", text).casefold().translate(_NORMALIZE)
+
+
+class Automaton:
+    """Goto/fail/output tables; nodes are list indexes, node 0 is the root"""
+
+    def __init__(self, terms: Iterable[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        # per node: (term, length, open_start, open_end) for every term ending here
+        self.output: List[List[Tuple[str, int, bool, bool]]] = [[]]
+        for term in terms:
+            self._add(term)
+        self._link()
+
+    def _add(self, term: str) -> None:
+        open_start, open_end = term.startswith("*"), term.endswith("*")
+        key = normalize(term.strip("*").strip())
+        if not key:
+            return
+        node = 0
+        for char in key:
+            next_node = self.goto[node].get(char)
+            if next_node is None:
+                next_node = len(self.goto)
+                self.goto[node][char] = next_node
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = next_node
+        self.output[node].append((term, len(key), open_start, open_end))
+
+    def _link(self) -> None:
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                fallback = self.fail[node]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def find(self, text: str) -> Optional[str]:
+        """First blocked term in an already normalized text, None when it is clean"""
+        goto, fail, output = self.goto, self.fail, self.output
+        node = 0
+        for end, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for term, length, open_start, open_end in output[node]:
+                start = end - length + 1
+                if (open_start or start == 0 or not text[start - 1].isalnum()) and \
+                        (open_end or end + 1 == len(text) or not text[end + 1].isalnum()):
+                    return term
+        return None
+
+
+class WordFilter:
+    def __init__(self, terms: Iterable[str] = ()):
+        self.terms: Tuple[str, ...] = ()
+        self.automaton = Automaton(())
+        self.update(terms)
+
+    def update(self, terms: Iterable[str]) -> bool:
+        """Rebuild for a new list; True if it changed"""
+        terms = tuple(terms)
+        if terms == self.terms:
+            return False
+        automaton = Automaton(terms)
+        self.automaton, self.terms = automaton, terms
+        return True
+
+    def check(self, message: str) -> Optional[str]:
+        """The blocked term the message contains, if any"""
+        if not self.terms:
+            return None
+        return self.automaton.find(normalize(message))
+
+    def __len__(self) -> int:
+        return len(self.terms)